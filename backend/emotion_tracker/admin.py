@@ -1,12 +1,86 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.cache import cache
+from django.db.models import Max, Min
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from .analytics import count_subquery
 from .models import (
     Company, Cluster, Service, Team, Collaborator, 
     EmotionType, Emotion, EmotionTrend, Alert
 )
+from .pagination import EstimatedCountPaginator
+
+
+# Filtres adaptés aux grosses tables : les valeurs proposées ne sont pas obtenues
+# par un DISTINCT sur la table filtrée mais par une source bornée, mise en cache
+
+class CachedFacetFilter(admin.SimpleListFilter):
+    """Filtre dont les valeurs proposées sont calculées par load_choices() et mises en cache"""
+    lookup_field = None
+
+    def load_choices(self):
+        raise NotImplementedError
+
+    def lookups(self, request, model_admin):
+        key = f'emotion_tracker:admin:facets:{self.parameter_name}'
+        return cache.get_or_set(key, self.load_choices, settings.ADMIN_FACET_CACHE_TIMEOUT)
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup_field: self.value()})
+        return queryset
+
+
+class YearFilter(CachedFacetFilter):
+    title = 'année'
+    parameter_name = 'year'
+    lookup_field = 'year'
+
+    def load_choices(self):
+        # Bornes lues sur l'index de date plutôt qu'un DISTINCT sur toute la table
+        bounds = Emotion.objects.aggregate(first=Min('date'), last=Max('date'))
+        if bounds['first'] is None:
+            return []
+        return [(year, str(year)) for year in range(bounds['last'].year, bounds['first'].year - 1, -1)]
+
+
+class MonthFilter(CachedFacetFilter):
+    title = 'mois'
+    parameter_name = 'month'
+    lookup_field = 'month'
+
+    def load_choices(self):
+        return [(month, f'{month:02d}') for month in range(1, 13)]
+
+
+class WeekNumberFilter(CachedFacetFilter):
+    title = 'semaine'
+    parameter_name = 'week_number'
+    lookup_field = 'week_number'
+
+    def load_choices(self):
+        return [(week, str(week)) for week in range(1, 54)]
+
+
+class ServiceFilter(CachedFacetFilter):
+    title = 'service'
+    parameter_name = 'service'
+    lookup_field = 'collaborator__service'
+
+    def load_choices(self):
+        return [(str(pk), name) for pk, name in Service.objects.order_by('service_name').values_list('id', 'service_name')]
+
+
+class TeamFilter(CachedFacetFilter):
+    title = 'équipe'
+    parameter_name = 'team'
+    lookup_field = 'collaborator__team'
+
+    def load_choices(self):
+        return [(str(pk), name) for pk, name in Team.objects.order_by('team_name').values_list('id', 'team_name')]
 
 
 @admin.register(Company)
@@ -15,61 +89,96 @@ class CompanyAdmin(admin.ModelAdmin):
     search_fields = ['name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_clusters_count=count_subquery(Cluster, 'company'),
+            annotated_services_count=count_subquery(Service, 'company'),
+            annotated_collaborators_count=count_subquery(Collaborator, 'company'),
+        )
+    
     def clusters_count(self, obj):
-        return obj.clusters.count()
+        return obj.annotated_clusters_count
     clusters_count.short_description = 'Clusters'
+    clusters_count.admin_order_field = 'annotated_clusters_count'
     
     def services_count(self, obj):
-        return obj.services.count()
+        return obj.annotated_services_count
     services_count.short_description = 'Services'
+    services_count.admin_order_field = 'annotated_services_count'
     
     def collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return obj.annotated_collaborators_count
     collaborators_count.short_description = 'Collaborateurs'
+    collaborators_count.admin_order_field = 'annotated_collaborators_count'
 
 
 @admin.register(Cluster)
 class ClusterAdmin(admin.ModelAdmin):
     list_display = ['name', 'company', 'services_count', 'collaborators_count', 'created_at']
     list_filter = ['company', 'created_at']
+    list_select_related = ['company']
     search_fields = ['name', 'company__name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_services_count=count_subquery(Service, 'cluster'),
+            annotated_collaborators_count=count_subquery(Collaborator, 'cluster'),
+        )
+    
     def services_count(self, obj):
-        return obj.services.count()
+        return obj.annotated_services_count
     services_count.short_description = 'Services'
+    services_count.admin_order_field = 'annotated_services_count'
     
     def collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return obj.annotated_collaborators_count
     collaborators_count.short_description = 'Collaborateurs'
+    collaborators_count.admin_order_field = 'annotated_collaborators_count'
 
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ['service_name', 'cluster', 'company', 'teams_count', 'collaborators_count', 'created_at']
     list_filter = ['company', 'cluster', 'created_at']
+    list_select_related = ['cluster', 'company']
     search_fields = ['service_name', 'company__name', 'cluster__name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_teams_count=count_subquery(Team, 'service'),
+            annotated_collaborators_count=count_subquery(Collaborator, 'service'),
+        )
+    
     def teams_count(self, obj):
-        return obj.teams.count()
+        return obj.annotated_teams_count
     teams_count.short_description = 'Équipes'
+    teams_count.admin_order_field = 'annotated_teams_count'
     
     def collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return obj.annotated_collaborators_count
     collaborators_count.short_description = 'Collaborateurs'
+    collaborators_count.admin_order_field = 'annotated_collaborators_count'
 
 
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
     list_display = ['team_name', 'service', 'company', 'collaborators_count', 'created_at']
     list_filter = ['company', 'service', 'created_at']
+    list_select_related = ['service', 'company']
     search_fields = ['team_name', 'service__service_name', 'company__name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_collaborators_count=count_subquery(Collaborator, 'team'),
+        )
+    
     def collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return obj.annotated_collaborators_count
     collaborators_count.short_description = 'Collaborateurs'
+    collaborators_count.admin_order_field = 'annotated_collaborators_count'
 
 
 @admin.register(Collaborator)
@@ -79,6 +188,7 @@ class CollaboratorAdmin(UserAdmin):
         'team', 'service', 'manager', 'emotion_status', 'is_active'
     ]
     list_filter = ['role', 'company', 'service', 'team', 'is_active', 'date_joined']
+    list_select_related = ['team', 'service', 'manager']
     search_fields = ['collaborator_id', 'first_name', 'last_name', 'email']
     readonly_fields = ['id', 'date_joined', 'last_login']
     
@@ -132,9 +242,15 @@ class EmotionTypeAdmin(admin.ModelAdmin):
     readonly_fields = ['id', 'created_at']
     ordering = ['degree', 'name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_usage_count=count_subquery(Emotion, 'emotion_type'),
+        )
+    
     def usage_count(self, obj):
-        return obj.emotion_entries.count()
+        return obj.annotated_usage_count
     usage_count.short_description = 'Utilisations'
+    usage_count.admin_order_field = 'annotated_usage_count'
 
 
 @admin.register(Emotion)
@@ -144,9 +260,14 @@ class EmotionAdmin(admin.ModelAdmin):
         'period', 'emotion_degree', 'team', 'has_comment'
     ]
     list_filter = [
-        'emotion_type', 'period', 'date', 'week_number', 'month', 'year',
-        'collaborator__service', 'collaborator__team'
+        'emotion_type', 'period', 'date', WeekNumberFilter, MonthFilter, YearFilter,
+        ServiceFilter, TeamFilter
     ]
+    list_select_related = ['collaborator', 'emotion_type']
+    # Tables de plusieurs millions de lignes : total estimé, pas de second COUNT
+    # du total non filtré, pas de date_hierarchy (agrégation DISTINCT des dates)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = [
         'emotion_id', 'collaborator__first_name', 'collaborator__last_name',
         'collaborator__collaborator_id', 'comment'
@@ -155,7 +276,6 @@ class EmotionAdmin(admin.ModelAdmin):
         'id', 'emotion_id', 'week_number', 'month', 'year', 
         'creation_date', 'full_name', 'team', 'company', 'cluster'
     ]
-    date_hierarchy = 'date'
     
     fieldsets = (
         ('Informations principales', {
@@ -198,6 +318,7 @@ class EmotionTrendAdmin(admin.ModelAdmin):
         'average_emotion_score', 'dominant_emotion', 'participation_rate'
     ]
     list_filter = ['period_type', 'start_date', 'team__service', 'service']
+    list_select_related = ['team', 'service', 'cluster', 'company']
     search_fields = ['team__team_name', 'service__service_name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     date_hierarchy = 'start_date'
@@ -207,6 +328,10 @@ class EmotionTrendAdmin(admin.ModelAdmin):
             return f"Équipe: {obj.team.team_name}"
         elif obj.service:
             return f"Service: {obj.service.service_name}"
+        elif obj.cluster:
+            return f"Cluster: {obj.cluster.name}"
+        elif obj.company:
+            return f"Entreprise: {obj.company.name}"
         return "Global"
     entity_name.short_description = 'Entité'
 
@@ -221,6 +346,7 @@ class AlertAdmin(admin.ModelAdmin):
         'alert_type', 'severity', 'is_resolved', 'created_at',
         'collaborator__service', 'team__service'
     ]
+    list_select_related = ['collaborator', 'team', 'service', 'resolved_by']
     search_fields = ['title', 'message', 'collaborator__full_name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     date_hierarchy = 'created_at'
@@ -0,0 +1,345 @@
+"""
+Détection incrémentale des alertes émotionnelles, au fil des déclarations.
+
+Chaque déclaration met à jour en temps constant l'état glissant de son
+collaborateur (série de déclarations négatives) ainsi que celui de son équipe
+et de son service (humeur moyenne sur ALERT_MOOD_WINDOW_DAYS jours,
+participation du jour). Une alerte est levée quand un seuil est franchi et
+résolue automatiquement au retour sous le seuil : lire les alertes revient à
+lire la table Alert, sans recalcul ni parcours périodique des déclarations.
+
+Les déclarations antérieures à la dernière déclaration connue (rattrapage)
+ne modifient que l'humeur glissante ; la commande rebuild_alert_states
+recalcule les états depuis l'historique.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import (
+    Alert, Collaborator, CollaboratorAlertState, Emotion, EmotionDailyAggregate, GroupAlertState
+)
+
+PERIOD_ORDER = {'morning': 0, 'evening': 1}
+
+# Historique relu par rebuild_alert_states pour reconstituer les séries négatives
+REBUILD_LOOKBACK_DAYS = 60
+
+AUTO_RESOLUTION_NOTE = 'Résolue automatiquement : retour sous le seuil.'
+
+
+def _position(date, period):
+    """Position chronologique d'une déclaration (le matin précède le soir)"""
+    return date, PERIOD_ORDER.get(period, 0)
+
+
+def _group_keys(organization):
+    keys = []
+    if organization.get('team_id'):
+        keys.append(('team', organization['team_id']))
+    if organization.get('service_id'):
+        keys.append(('service', organization['service_id']))
+    return keys
+
+
+class AlertEngine:
+    """Met à jour les états d'alerte et lève ou résout les alertes correspondantes"""
+
+    def __init__(self):
+        self.negative_streak = settings.ALERT_NEGATIVE_STREAK
+        self.window_days = settings.ALERT_MOOD_WINDOW_DAYS
+        self.mood_threshold = settings.ALERT_MOOD_THRESHOLD
+        self.mood_min_declarations = settings.ALERT_MOOD_MIN_DECLARATIONS
+        self.participation_threshold = settings.ALERT_PARTICIPATION_THRESHOLD
+
+    def record(self, emotion, organization, previous=None):
+        """
+        Prend en compte une déclaration créée, ou modifiée (previous : date, période,
+        degré et rattachement avant modification, voir Emotion.save).
+        organization : voir EmotionDailyAggregate.get_organization
+        """
+        self._process([(emotion, organization, previous)])
+
+    def record_many(self, emotions, organizations):
+        """Prend en compte un lot de nouvelles déclarations, dans l'ordre chronologique"""
+        items = sorted(
+            ((emotion, organizations[emotion.collaborator_id], None) for emotion in emotions),
+            key=lambda item: _position(item[0].date, item[0].period)
+        )
+        self._process(items)
+
+    def forget(self, emotion, organization):
+        """Retire une déclaration supprimée des états (organization : rattachement sous lequel elle a été comptée)"""
+        with transaction.atomic():
+            # Pas de création d'état : le collaborateur peut être en cours de suppression
+            states = CollaboratorAlertState.objects.lock([emotion.collaborator_id], create=False)
+            groups = self._lock_groups([organization], create=False)
+
+            state = states.get(emotion.collaborator_id)
+            if state and (state.last_date, state.last_period) == (emotion.date, emotion.period):
+                if emotion.emotion_degree < 0:
+                    state.negative_streak = max(0, state.negative_streak - 1)
+                state.last_degree = None
+                self._check_streak(state)
+
+            for group in groups.values():
+                if group.add_mood(emotion.date, emotion.emotion_degree, self.window_days, sign=-1):
+                    self._check_mood(group)
+
+            self._save(states.values(), groups.values())
+
+    def _lock_groups(self, organizations, create=True):
+        keys = {key for organization in organizations for key in _group_keys(organization)}
+        return GroupAlertState.objects.lock(
+            team_ids=[pk for field, pk in keys if field == 'team'],
+            service_ids=[pk for field, pk in keys if field == 'service'],
+            create=create
+        )
+
+    def _process(self, items):
+        if not items:
+            return
+        with transaction.atomic():
+            states = CollaboratorAlertState.objects.lock({emotion.collaborator_id for emotion, _, _ in items})
+            groups = self._lock_groups(
+                [organization for _, organization, _ in items]
+                + [previous['organization'] for _, _, previous in items if previous]
+            )
+
+            for emotion, organization, previous in items:
+                state = states[emotion.collaborator_id]
+                emotion_groups = [groups[key] for key in _group_keys(organization)]
+                if previous:
+                    # Le collaborateur a pu changer d'équipe depuis la version précédente
+                    previous_groups = [groups[key] for key in _group_keys(previous['organization'])]
+                    self._apply_change(emotion, previous, state, previous_groups, emotion_groups)
+                else:
+                    self._apply_new(emotion, state, emotion_groups)
+
+            self._save(states.values(), groups.values())
+
+    def _save(self, states, groups):
+        CollaboratorAlertState.objects.bulk_update(
+            list(states), CollaboratorAlertState.STATE_FIELDS, batch_size=500
+        )
+        GroupAlertState.objects.bulk_update(
+            list(groups), GroupAlertState.STATE_FIELDS, batch_size=500
+        )
+
+    def _apply_new(self, emotion, state, groups):
+        is_latest = state.last_date is None or (
+            _position(emotion.date, emotion.period) > _position(state.last_date, state.last_period)
+        )
+        first_of_day = is_latest and state.last_date != emotion.date
+
+        if is_latest:
+            state.negative_streak = state.negative_streak + 1 if emotion.emotion_degree < 0 else 0
+            state.last_date = emotion.date
+            state.last_period = emotion.period
+            state.last_degree = emotion.emotion_degree
+            self._check_streak(state)
+
+        for group in groups:
+            self._roll_day(group, emotion.date)
+            if first_of_day and group.current_date == emotion.date:
+                group.participant_count += 1
+                self._check_participation(group, closed=False)
+            if group.add_mood(emotion.date, emotion.emotion_degree, self.window_days):
+                self._check_mood(group)
+
+    def _apply_change(self, emotion, previous, state, previous_groups, groups):
+        # Seule la modification de la dernière déclaration change la série en cours
+        latest = (state.last_date, state.last_period)
+        if latest == (previous['date'], previous['period']) == (emotion.date, emotion.period):
+            was_negative = previous['emotion_degree'] < 0
+            is_negative = emotion.emotion_degree < 0
+            if was_negative and not is_negative:
+                state.negative_streak = 0
+            elif is_negative and not was_negative:
+                state.negative_streak = 1
+            state.last_degree = emotion.emotion_degree
+            self._check_streak(state)
+
+        for group in previous_groups:
+            group.add_mood(previous['date'], previous['emotion_degree'], self.window_days, sign=-1)
+        for group in groups:
+            group.add_mood(emotion.date, emotion.emotion_degree, self.window_days)
+        for group in {id(group): group for group in previous_groups + groups}.values():
+            self._check_mood(group)
+
+    def _roll_day(self, group, date):
+        """Clôt la journée en cours de l'équipe ou du service quand une déclaration d'un jour suivant arrive"""
+        if group.current_date is not None and date <= group.current_date:
+            return
+        if group.current_date is not None:
+            self._check_participation(group, closed=True)
+        group.current_date = date
+        group.participant_count = 0
+        group.member_count = Collaborator.objects.filter(
+            **{group.target_field: group.target}, is_active=True
+        ).count()
+
+    def _check_streak(self, state):
+        streak = state.negative_streak
+        self._sync_alert(state, 'streak_alert', streak >= self.negative_streak, lambda: {
+            'collaborator': state.collaborator,
+            'alert_type': 'consecutive_negative',
+            'severity': 'high' if streak >= 2 * self.negative_streak else 'medium',
+            'title': 'Émotions négatives consécutives',
+            'message': f"{state.collaborator.full_name} a déclaré {streak} émotions négatives consécutives",
+            'trigger_data': {
+                'negative_streak': streak,
+                'last_date': state.last_date.isoformat() if state.last_date else None,
+                'last_period': state.last_period,
+            },
+        })
+
+    def _check_mood(self, group):
+        average, count = group.mood_average()
+        breached = count >= self.mood_min_declarations and average < self.mood_threshold
+        team = bool(group.team_id)
+        self._sync_alert(group, 'mood_alert', breached, lambda: {
+            group.target_field: group.target,
+            'alert_type': 'low_team_morale' if team else 'negative_emotions',
+            'severity': 'high' if average <= -2 else 'medium',
+            'title': 'Moral d\'équipe faible' if team else 'Tendance émotionnelle négative',
+            'message': (
+                f"Humeur moyenne de {average} sur {self.window_days} jours "
+                f"({count} déclarations) dans {group.target_label}"
+            ),
+            'trigger_data': {
+                'average_emotion_degree': average,
+                'emotion_count': count,
+                'window_days': self.window_days,
+            },
+        })
+
+    def _check_participation(self, group, closed):
+        """
+        Évalue la participation du jour en cours : une journée close sous le seuil
+        lève l'alerte ; le passage au-dessus du seuil la résout, même en cours de journée
+        """
+        rate = group.participation_rate()
+        if rate is None:
+            return
+        breached = rate < self.participation_threshold
+        if breached and not closed:
+            return
+        self._sync_alert(group, 'participation_alert', breached, lambda: {
+            group.target_field: group.target,
+            'alert_type': 'low_participation',
+            'severity': 'medium' if rate < self.participation_threshold / 2 else 'low',
+            'title': 'Faible participation',
+            'message': (
+                f"Faible taux de participation ({rate}%) le {group.current_date:%d/%m/%Y} "
+                f"dans {group.target_label}"
+            ),
+            'trigger_data': {
+                'participation_rate': rate,
+                'participant_count': group.participant_count,
+                'member_count': group.member_count,
+                'date': group.current_date.isoformat(),
+            },
+        })
+
+    def _sync_alert(self, state, attribute, breached, build):
+        """
+        Lève l'alerte au franchissement du seuil et la résout au retour sous le seuil.
+        Une alerte résolue manuellement n'est pas relevée avant le prochain franchissement.
+        """
+        alert = getattr(state, attribute)
+        if not breached:
+            if alert is not None:
+                if not alert.is_resolved:
+                    alert.resolve(notes=AUTO_RESOLUTION_NOTE)
+                setattr(state, attribute, None)
+            return
+
+        fields = build()
+        if alert is None:
+            setattr(state, attribute, Alert.objects.create(**fields))
+        elif not alert.is_resolved and alert.severity != fields['severity']:
+            alert.severity = fields['severity']
+            alert.message = fields['message']
+            alert.trigger_data = fields['trigger_data']
+            alert.save(update_fields=['severity', 'message', 'trigger_data', 'updated_at'])
+
+
+def rebuild_alert_states(reference_date=None):
+    """
+    Recalcule les états d'alerte depuis l'historique récent : séries négatives
+    (sur REBUILD_LOOKBACK_DAYS jours), fenêtre d'humeur des équipes et services
+    (depuis le cube journalier), et rattachement aux alertes encore ouvertes.
+    Aucune alerte n'est levée ni résolue ; la participation repart du prochain jour déclaré.
+    """
+    today = reference_date or timezone.now().date()
+    window_days = settings.ALERT_MOOD_WINDOW_DAYS
+
+    declarations = defaultdict(list)
+    rows = Emotion.objects.filter(
+        date__gt=today - timezone.timedelta(days=REBUILD_LOOKBACK_DAYS), date__lte=today
+    ).order_by().values_list('collaborator_id', 'date', 'period', 'emotion_degree')
+    for collaborator_id, date, period, emotion_degree in rows.iterator(chunk_size=5000):
+        declarations[collaborator_id].append((_position(date, period), period, emotion_degree))
+
+    open_alerts = defaultdict(dict)
+    for alert_id, alert_type, collaborator_id, team_id, service_id in Alert.objects.filter(
+        is_resolved=False
+    ).order_by('created_at').values_list('id', 'alert_type', 'collaborator_id', 'team_id', 'service_id'):
+        target = ('collaborator', collaborator_id) if collaborator_id else (
+            ('team', team_id) if team_id else ('service', service_id)
+        )
+        open_alerts[target][alert_type] = alert_id
+
+    states = []
+    for collaborator_id, entries in declarations.items():
+        entries.sort()
+        streak = 0
+        for _, _, emotion_degree in reversed(entries):
+            if emotion_degree >= 0:
+                break
+            streak += 1
+        (last_date, _), last_period, last_degree = entries[-1]
+        states.append(CollaboratorAlertState(
+            collaborator_id=collaborator_id,
+            negative_streak=streak,
+            last_date=last_date,
+            last_period=last_period,
+            last_degree=last_degree,
+            streak_alert_id=open_alerts[('collaborator', collaborator_id)].get('consecutive_negative'),
+        ))
+
+    windows = defaultdict(list)
+    window_start = today - timezone.timedelta(days=window_days - 1)
+    for field in ('team', 'service'):
+        cells = EmotionDailyAggregate.objects.filter(
+            **{f'{field}__isnull': False}, date__range=(window_start, today)
+        ).order_by(field, 'date').values(field, 'date').annotate(
+            degree_total=Sum('degree_sum'), emotion_total=Sum('emotion_count')
+        )
+        for cell in cells:
+            if cell['emotion_total']:
+                windows[(field, cell[field])].append(
+                    [cell['date'].isoformat(), cell['degree_total'], cell['emotion_total']]
+                )
+
+    groups = []
+    for (field, pk), mood_window in windows.items():
+        alerts = open_alerts[(field, pk)]
+        groups.append(GroupAlertState(
+            **{f'{field}_id': pk},
+            mood_window=mood_window,
+            mood_alert_id=alerts.get('low_team_morale' if field == 'team' else 'negative_emotions'),
+            participation_alert_id=alerts.get('low_participation'),
+        ))
+
+    with transaction.atomic():
+        CollaboratorAlertState.objects.all().delete()
+        GroupAlertState.objects.all().delete()
+        CollaboratorAlertState.objects.bulk_create(states, batch_size=1000)
+        GroupAlertState.objects.bulk_create(groups, batch_size=1000)
+
+    return {'collaborators': len(states), 'groups': len(groups)}
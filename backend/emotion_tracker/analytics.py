@@ -0,0 +1,290 @@
+"""
+Moteurs d'agrégation des statistiques émotionnelles.
+Chaque moteur récupère ses données en une requête groupée puis construit
+les dictionnaires de statistiques en Python.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, fk_field):
+    """Sous-requête corrélée comptant les lignes de model rattachées à la ligne courante"""
+    counts = model.objects.filter(**{fk_field: OuterRef('pk')}).order_by().values(fk_field).annotate(
+        total=Count('*')
+    ).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def fetch_half_day_rows(emotions):
+    """
+    Une seule requête GROUP BY (half_day, type d'émotion) avec le nombre
+    de déclarations et la somme des degrés
+    """
+    return list(
+        emotions.order_by()
+        .values('half_day', 'emotion_type__emotion')
+        .annotate(count=Count('id'), degree_sum=Sum('emotion_degree'))
+        .values_list('half_day', 'emotion_type__emotion', 'count', 'degree_sum')
+    )
+
+
+def count_participants(emotions):
+    """Nombre de collaborateurs distincts ayant déclaré au moins une émotion"""
+    return emotions.aggregate(participants=Count('collaborator', distinct=True))['participants'] or 0
+
+
+def build_daily_stats(rows):
+    """
+    Construit le dictionnaire de statistiques journalières à partir de lignes
+    (half_day, type d'émotion, nombre, somme des degrés)
+    """
+    stats = {
+        'total_emotions': 0,
+        'morning_emotions': 0,
+        'evening_emotions': 0,
+        'participation_rate': 0,
+        'emotion_distribution': {},
+        'average_emotion_degree': 0,
+        'emotion_trends': {
+            'morning': {},
+            'evening': {}
+        }
+    }
+
+    degree_sum = 0
+    for half_day, emotion, count, row_degree_sum in rows:
+        period = 'evening' if half_day else 'morning'
+        stats['total_emotions'] += count
+        stats[f'{period}_emotions'] += count
+        stats['emotion_distribution'][emotion] = stats['emotion_distribution'].get(emotion, 0) + count
+        stats['emotion_trends'][period][emotion] = stats['emotion_trends'][period].get(emotion, 0) + count
+        degree_sum += row_degree_sum or 0
+
+    if stats['total_emotions']:
+        stats['average_emotion_degree'] = round(degree_sum / stats['total_emotions'], 2)
+
+    return stats
+
+
+def daily_emotion_stats(emotions):
+    """
+    Statistiques de base d'un QuerySet d'émotions en deux requêtes :
+    l'agrégation conditionnelle par demi-journée et type, puis le comptage des participants.
+    Retourne (stats, nombre de participants).
+    """
+    return build_daily_stats(fetch_half_day_rows(emotions)), count_participants(emotions)
+
+
+GRANULARITIES = ['day', 'week', 'month', 'quarter']
+
+
+def get_bucket_start(day, granularity):
+    """Premier jour du bucket (jour, semaine ISO, mois, trimestre) contenant la date"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+    raise ValueError(f"Granularité inconnue: {granularity}")
+
+
+def fetch_daily_rows(emotions):
+    """
+    Une seule requête GROUP BY (date, type d'émotion) avec le nombre
+    de déclarations et la somme des degrés
+    """
+    return list(
+        emotions.order_by()
+        .values('date', 'emotion_type__emotion')
+        .annotate(count=Count('id'), degree_sum=Sum('emotion_degree'))
+        .values_list('date', 'emotion_type__emotion', 'count', 'degree_sum')
+    )
+
+
+class EmotionTimeSeries:
+    """
+    Série temporelle dense (un point par jour, jours vides compris) construite
+    à partir de lignes (date, type d'émotion, nombre, somme des degrés),
+    ré-échantillonnable par jour, semaine, mois ou trimestre sans nouvelle requête.
+    """
+
+    def __init__(self, rows, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = {}
+        day = start_date
+        while day <= end_date:
+            self.days[day] = self._empty_point(day)
+            day += timedelta(days=1)
+
+        for date, emotion, count, degree_sum in rows:
+            point = self.days.get(date)
+            if point is None:
+                continue
+            point['count'] += count
+            point['degree_sum'] += degree_sum or 0
+            point['distribution'][emotion] = point['distribution'].get(emotion, 0) + count
+
+    @classmethod
+    def from_queryset(cls, emotions, start_date, end_date):
+        """Construit la série en une requête groupée sur la plage de dates"""
+        return cls(fetch_daily_rows(emotions.filter(date__range=[start_date, end_date])), start_date, end_date)
+
+    @staticmethod
+    def _empty_point(start):
+        return {'start': start, 'count': 0, 'degree_sum': 0, 'distribution': {}}
+
+    @staticmethod
+    def average(point):
+        return point['degree_sum'] / point['count'] if point['count'] else None
+
+    def points(self, granularity='day'):
+        """Liste dense et ordonnée des points à la granularité demandée"""
+        if granularity == 'day':
+            return list(self.days.values())
+
+        buckets = {}
+        for day, point in self.days.items():
+            start = get_bucket_start(day, granularity)
+            bucket = buckets.setdefault(start, self._empty_point(start))
+            bucket['count'] += point['count']
+            bucket['degree_sum'] += point['degree_sum']
+            for emotion, count in point['distribution'].items():
+                bucket['distribution'][emotion] = bucket['distribution'].get(emotion, 0) + count
+        return list(buckets.values())
+
+    @property
+    def total(self):
+        return sum(point['count'] for point in self.days.values())
+
+    @property
+    def distribution(self):
+        distribution = {}
+        for point in self.days.values():
+            for emotion, count in point['distribution'].items():
+                distribution[emotion] = distribution.get(emotion, 0) + count
+        return distribution
+
+    @property
+    def average_degree(self):
+        total = self.total
+        if not total:
+            return 0
+        return round(sum(point['degree_sum'] for point in self.days.values()) / total, 2)
+
+    def evolution(self, granularity='day'):
+        """Points non vides avec leur nombre de déclarations et leur degré moyen arrondi"""
+        return [
+            {
+                'date': point['start'].strftime('%Y-%m-%d'),
+                'count': point['count'],
+                'average_degree': round(self.average(point), 2)
+            }
+            for point in self.points(granularity) if point['count']
+        ]
+
+    def peaks(self, granularity='day'):
+        """Points de degré moyen le plus haut et le plus bas (parmi les points non vides)"""
+        active = [point for point in self.points(granularity) if point['count']]
+        if not active:
+            return {'highest': None, 'lowest': None}
+
+        highest = max(active, key=self.average)
+        lowest = min(active, key=self.average)
+        return {
+            'highest': {'date': highest['start'].strftime('%Y-%m-%d'), 'degree': round(self.average(highest), 2)},
+            'lowest': {'date': lowest['start'].strftime('%Y-%m-%d'), 'degree': round(self.average(lowest), 2)}
+        }
+
+
+class EmotionSource:
+    """
+    Source de statistiques d'une entité sur une plage de dates,
+    lue directement sur les déclarations d'émotions
+    """
+    dimension_fields = {
+        'service': 'collaborator__service__service_name',
+        'cluster': 'collaborator__cluster__name',
+        'team': 'collaborator__team__team_name',
+        'role': 'collaborator__role',
+    }
+
+    def __init__(self, emotions, start_date, end_date):
+        self.emotions = emotions
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def half_day_rows(self):
+        return fetch_half_day_rows(self.emotions)
+
+    def time_series(self):
+        return EmotionTimeSeries(fetch_daily_rows(self.emotions), self.start_date, self.end_date)
+
+    def count_participants(self):
+        return count_participants(self.emotions)
+
+    def breakdown(self, dimension):
+        """Nombre de déclarations par valeur de la dimension (service, cluster, équipe, rôle)"""
+        field = EmotionSource.dimension_fields[dimension]
+        return dict(
+            self.emotions.values(field)
+            .annotate(count=Count('id'))
+            .values_list(field, 'count')
+        )
+
+
+class AggregateSource(EmotionSource):
+    """
+    Source de statistiques lue sur le cube journalier pré-agrégé, avec roll-up
+    vers l'entité : le coût dépend du nombre de jours et d'entités, pas du nombre de déclarations.
+    Les participants distincts sont comptés sur les déclarations des cellules lues (même
+    rattachement déclaré que le cube) : participant_count n'est distinct que par (date, période).
+    Les dimensions absentes du cube (rôle) sont calculées sur les déclarations.
+    """
+    dimension_fields = {
+        'service': 'service__service_name',
+        'cluster': 'cluster__name',
+        'team': 'team__team_name',
+    }
+
+    def __init__(self, aggregates, declared_emotions, emotions, start_date, end_date):
+        super().__init__(emotions, start_date, end_date)
+        self.aggregates = aggregates
+        self.declared_emotions = declared_emotions
+
+    def half_day_rows(self):
+        # Même demi-journée que la lecture sur les déclarations (Emotion.half_day, conservé dans le cube)
+        return list(
+            self.aggregates.order_by()
+            .values('half_day', 'emotion_type')
+            .annotate(count=Sum('emotion_count'), degree_sum=Sum('degree_sum'))
+            .values_list('half_day', 'emotion_type', 'count', 'degree_sum')
+        )
+
+    def time_series(self):
+        rows = (
+            self.aggregates.order_by()
+            .values('date', 'emotion_type')
+            .annotate(count=Sum('emotion_count'), degree_sum=Sum('degree_sum'))
+            .values_list('date', 'emotion_type', 'count', 'degree_sum')
+        )
+        return EmotionTimeSeries(list(rows), self.start_date, self.end_date)
+
+    def count_participants(self):
+        return count_participants(self.declared_emotions)
+
+    def breakdown(self, dimension):
+        field = self.dimension_fields.get(dimension)
+        if field is None:
+            return super().breakdown(dimension)
+        return dict(
+            self.aggregates.order_by()
+            .values(field)
+            .annotate(count=Sum('emotion_count'))
+            .values_list(field, 'count')
+        )
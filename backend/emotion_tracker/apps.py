@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class EmotionTrackerConfig(AppConfig):
+    name = 'emotion_tracker'
+    verbose_name = "Emotion Tracker"
+
+    def ready(self):
+        # Enregistrer les signaux de maintenance des agrégats
+        from . import signals  # noqa: F401
+        # Application Celery chargée aussi côté web, pour l'envoi des tâches
+        from . import celery  # noqa: F401
@@ -0,0 +1,11 @@
+"""
+Point d'entrée ASGI (gunicorn_asgi.conf.py) : sert toute l'API, dont le
+dashboard asynchrone /api/dashboard/data-async/.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emotion_tracker.settings')
+
+application = get_asgi_application()
@@ -0,0 +1,227 @@
+"""
+Authentification par jeton avec cache à deux niveaux.
+
+Les champs du collaborateur utiles aux vérifications de droits et de périmètre
+(AUTH_USER_FIELDS : identité, rôle, rattachement, statut ; jamais le mot de passe)
+sont conservés dans un LRU local au processus puis dans Redis, sous l'empreinte
+SHA-256 du jeton : une requête authentifiée n'exécute aucune requête SQL tant que
+l'entrée est valide. Les autres champs sont chargés à la demande (champs différés).
+
+Invalidation : suppression du jeton (déconnexion), modification ou suppression
+du collaborateur (désactivation, rattachement), déclaration d'émotion (champs
+d'humeur) et modification de l'organisation. L'entrée Redis est supprimée et la
+révision du collaborateur (ou la génération globale) incrémentée immédiatement et
+à nouveau après la validation de la transaction. Une entrée locale n'est utilisée
+qu'après vérification de la génération et de la révision dans Redis (une lecture) :
+la révocation est immédiate pour tous les processus.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .cache import KEY_PREFIX
+
+AUTH_PREFIX = f'{KEY_PREFIX}:auth'
+GENERATION_KEY = f'{AUTH_PREFIX}:generation'
+# Champs du collaborateur mis en cache (attributs, dans l'ordre des champs du modèle attendu par from_db)
+AUTH_USER_FIELDS = (
+    'is_superuser', 'is_staff', 'id', 'collaborator_id', 'first_name', 'last_name', 'email', 'role',
+    'team_id', 'service_id', 'cluster_id', 'company_id', 'manager_id', 'is_active', 'username',
+)
+
+
+def _digest(key):
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _token_key(digest):
+    return f'{AUTH_PREFIX}:token:{digest}'
+
+
+def _user_key(user_id):
+    return f'{AUTH_PREFIX}:user:{user_id}'
+
+
+def _revision_key(user_id):
+    return f'{AUTH_PREFIX}:revision:{user_id}'
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class LocalTokenCache:
+    """LRU borné et à durée de vie courte, propre au processus (partagé entre ses threads)"""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, digest):
+        timeout = settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT
+        if timeout <= 0:
+            return None
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                return None
+            stored_at, _, payload = entry
+            if time.monotonic() - stored_at > timeout:
+                del self.entries[digest]
+                return None
+            self.entries.move_to_end(digest)
+            return payload
+
+    def set(self, digest, user_id, payload):
+        if settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT <= 0:
+            return
+        with self.lock:
+            self.entries[digest] = (time.monotonic(), user_id, payload)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > settings.AUTH_TOKEN_LOCAL_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def discard(self, digests=(), user_ids=()):
+        user_ids = set(user_ids)
+        with self.lock:
+            for digest in digests:
+                self.entries.pop(digest, None)
+            if user_ids:
+                for digest in [digest for digest, (_, user_id, _) in self.entries.items() if user_id in user_ids]:
+                    del self.entries[digest]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalTokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication dont le collaborateur résolu est mis en cache (LRU local puis Redis).
+    Entrée : (génération, révision du collaborateur, identifiant, valeurs d'AUTH_USER_FIELDS)
+    """
+
+    def authenticate_credentials(self, key):
+        digest = _digest(key)
+        entry = local_cache.get(digest)
+        if entry is not None and not self._is_current(entry):
+            # Révoquée depuis un autre processus
+            local_cache.discard(digests=[digest])
+            entry = None
+
+        if entry is None:
+            # Entrée et génération globale en un seul aller-retour Redis
+            values = cache.get_many([_token_key(digest), GENERATION_KEY])
+            generation = values.get(GENERATION_KEY, 0)
+            entry = values.get(_token_key(digest))
+            if entry is None or entry[0] != generation:
+                user = self._load_user(key)
+                # Révision lue après le chargement : une invalidation concurrente la rend obsolète
+                entry = (
+                    generation, cache.get(_revision_key(user.pk), 0), user.pk,
+                    tuple(getattr(user, field) for field in AUTH_USER_FIELDS)
+                )
+                cache.set_many({
+                    _token_key(digest): entry,
+                    _user_key(user.pk): digest,
+                }, timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            local_cache.set(digest, entry[2], entry)
+
+        # Une instance distincte par requête (attributs mémorisés sur l'utilisateur, ex. périmètre)
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, AUTH_USER_FIELDS, entry[3])
+        return user, Token(key=key, user=user)
+
+    def _is_current(self, entry):
+        generation, revision, user_id, _ = entry
+        values = cache.get_many([GENERATION_KEY, _revision_key(user_id)])
+        return values.get(GENERATION_KEY, 0) == generation and values.get(_revision_key(user_id), 0) == revision
+
+    def _load_user(self, key):
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user
+
+
+def authenticate_request(request):
+    """
+    Utilisateur d'une requête Django hors vue DRF (middleware, vue asynchrone),
+    selon DEFAULT_AUTHENTICATION_CLASSES ; None si les identifiants sont refusés
+    """
+    from rest_framework.exceptions import APIException
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    drf_request = Request(request, authenticators=[cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user
+    except APIException:
+        return None
+
+
+def _now_and_on_commit(func):
+    # Après la validation aussi : une requête concurrente a pu remettre en cache l'ancien état
+    func()
+    transaction.on_commit(func)
+
+
+def invalidate_tokens(keys, user_ids=()):
+    """Invalide les entrées des jetons donnés et de leurs collaborateurs (déconnexion, suppression du jeton)"""
+    digests = [_digest(key) for key in keys]
+    if not digests:
+        return
+
+    def invalidate():
+        cache.delete_many([_token_key(digest) for digest in digests])
+        for user_id in user_ids:
+            _bump(_revision_key(user_id))
+        local_cache.discard(digests=digests)
+
+    _now_and_on_commit(invalidate)
+
+
+def invalidate_collaborators(collaborator_ids):
+    """Invalide les entrées des collaborateurs donnés, sans requête SQL (index collaborateur -> jeton)"""
+    collaborator_ids = set(collaborator_ids)
+    user_keys = [_user_key(collaborator_id) for collaborator_id in collaborator_ids]
+    if not user_keys:
+        return
+
+    def invalidate():
+        digests = list(cache.get_many(user_keys).values())
+        cache.delete_many(user_keys + [_token_key(digest) for digest in digests])
+        for collaborator_id in collaborator_ids:
+            _bump(_revision_key(collaborator_id))
+        local_cache.discard(digests=digests, user_ids=collaborator_ids)
+
+    _now_and_on_commit(invalidate)
+
+
+def invalidate_all():
+    """Invalide toutes les entrées (changement de génération), ex. après la bascule nocturne des humeurs"""
+
+    def invalidate():
+        _bump(GENERATION_KEY)
+        local_cache.clear()
+
+    _now_and_on_commit(invalidate)
@@ -0,0 +1,698 @@
+"""
+Scénarios de benchmark des chemins critiques de l'API.
+Chaque scénario s'exécute dans une transaction annulée à la fin : la base n'est pas modifiée.
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import Company, Team, Collaborator, EmotionType, Emotion, EmotionRollup
+
+BENCHMARKS = {}
+
+BENCHMARK_EMOTION_TYPES = [
+    ('Heureux', 'happy'),
+    ('Triste', 'sad'),
+    ('Neutre', 'neutral'),
+    ('Stressé', 'stressed'),
+    ('Excité', 'excited'),
+    ('Fatigué', 'tired'),
+]
+
+
+def register(name):
+    """Enregistre un scénario de benchmark sous le nom donné"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class _Rollback(Exception):
+    pass
+
+
+def run_benchmark(name, **options):
+    """Exécute un scénario et annule toutes ses écritures"""
+    results = []
+    try:
+        with transaction.atomic():
+            results = BENCHMARKS[name](**options)
+            raise _Rollback
+    except _Rollback:
+        pass
+    return results
+
+
+def measure(func, *args, **kwargs):
+    """Exécute func et retourne (résultat, durée en ms, nombre de requêtes SQL)"""
+    with CaptureQueriesContext(connection) as context:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+    return result, elapsed, len(context.captured_queries)
+
+
+def percentile(values, ratio):
+    """Percentile simple (plus proche rang) d'une liste de mesures"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def create_emotion_types():
+    return [
+        EmotionType.objects.get_or_create(emotion=code, defaults={'name': name, 'degree': 0})[0]
+        for name, code in BENCHMARK_EMOTION_TYPES
+    ]
+
+
+def create_collaborator(company, team, index, role='employee', **fields):
+    return Collaborator.objects.create(
+        collaborator_id=f'BENCH{index:06d}',
+        email=f'bench{index}@benchmark.local',
+        first_name='Bench',
+        last_name=f'{index:06d}',
+        role=role,
+        company=company,
+        team=team,
+        **fields
+    )
+
+
+def seed_history(collaborator, emotion_types, declarations, end_date=None):
+    """
+    Insère directement un historique de déclarations (matin et soir) se terminant à end_date,
+    sans passer par Emotion.save()
+    """
+    end_date = end_date or timezone.now().date() - timedelta(days=1)
+    emotions = []
+    for index in range(declarations):
+        date = end_date - timedelta(days=index // 2)
+        period = 'morning' if index % 2 == 0 else 'evening'
+        emotion_type = emotion_types[index % len(emotion_types)]
+        emotions.append(Emotion(
+            emotion_id=f'{collaborator.collaborator_id}-{date}-{period}',
+            collaborator=collaborator,
+            emotion_type=emotion_type,
+            date=date,
+            period=period,
+            week_number=date.isocalendar()[1],
+            month=date.month,
+            year=date.year,
+            full_name=collaborator.full_name,
+            emotion_degree=emotion_type.degree,
+            half_day=period == 'evening',
+        ))
+    Emotion.objects.bulk_create(emotions, batch_size=1000)
+    return emotions
+
+
+@register('emotion_write')
+def bench_emotion_write(sizes=(0, 200, 2000, 10000), writes=20, **options):
+    """Latence d'une déclaration d'émotion en fonction de la taille de l'historique du collaborateur"""
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    first_date = timezone.now().date() + timedelta(days=1)
+
+    results = []
+    for index, size in enumerate(sizes):
+        collaborator = create_collaborator(company, team, index)
+        seed_history(collaborator, emotion_types, size)
+        EmotionRollup.objects.rebuild(collaborator_ids=[collaborator.pk])
+
+        timings, queries = [], []
+        for offset in range(writes):
+            emotion = Emotion(
+                collaborator=collaborator,
+                emotion_type=emotion_types[offset % len(emotion_types)],
+                date=first_date + timedelta(days=offset),
+                period='morning'
+            )
+            _, elapsed, query_count = measure(emotion.save)
+            timings.append(elapsed)
+            queries.append(query_count)
+
+        results.append({
+            'history': size,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'max_queries': max(queries),
+        })
+    return results
+
+
+def build_declarations(collaborators, emotion_types, count, end_date):
+    """Construit `count` déclarations (format API) réparties sur les collaborateurs, en remontant depuis end_date"""
+    items = []
+    for index in range(count):
+        collaborator = collaborators[index % len(collaborators)]
+        slot = index // len(collaborators)
+        items.append({
+            'collaborator': str(collaborator.pk),
+            'emotion_type': str(emotion_types[index % len(emotion_types)].pk),
+            'date': (end_date - timedelta(days=slot // 2)).isoformat(),
+            'period': 'morning' if slot % 2 == 0 else 'evening',
+        })
+    return items
+
+
+@register('emotion_bulk_ingest')
+def bench_emotion_bulk_ingest(sizes=(200, 2000), collaborators=50, **options):
+    """Débit (lignes/s) de l'ingestion en masse comparé à une boucle sur EmotionCreateSerializer"""
+    from .ingestion import BulkEmotionIngestor
+    from .serializers import EmotionCreateSerializer
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    members = [create_collaborator(company, team, index) for index in range(collaborators)]
+
+    def serializer_loop(items):
+        for item in items:
+            serializer = EmotionCreateSerializer(data=item)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+    results = []
+    end_date = timezone.now().date() - timedelta(days=1)
+    for size in sizes:
+        # Deux fenêtres de dates disjointes pour que chaque méthode insère des lignes neuves
+        loop_items = build_declarations(members, emotion_types, size, end_date)
+        end_date -= timedelta(days=size // collaborators + 1)
+        bulk_items = build_declarations(members, emotion_types, size, end_date)
+        end_date -= timedelta(days=size // collaborators + 1)
+
+        _, loop_ms, loop_queries = measure(serializer_loop, loop_items)
+        result, bulk_ms, bulk_queries = measure(BulkEmotionIngestor().ingest, bulk_items)
+
+        results.append({
+            'rows': size,
+            'serializer_rows_per_s': round(size / (loop_ms / 1000)),
+            'bulk_rows_per_s': round(result['created'] / (bulk_ms / 1000)),
+            'speedup': round(loop_ms / bulk_ms, 1),
+            'serializer_queries': loop_queries,
+            'bulk_queries': bulk_queries,
+        })
+    return results
+
+
+@register('dashboard_cache')
+def bench_dashboard_cache(members=20, history=60, repeats=10, **options):
+    """Coût d'un appel au dashboard d'un manager : cache froid puis cache chaud"""
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from .views import DashboardViewSet
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    manager = create_collaborator(company, team, 0, role='manager')
+    for index in range(1, members + 1):
+        seed_history(create_collaborator(company, team, index, manager=manager), emotion_types, history)
+
+    view = DashboardViewSet.as_view({'get': 'data'})
+    factory = APIRequestFactory()
+
+    def call(days):
+        request = factory.get('/api/dashboard/data/', {'days': days})
+        force_authenticate(request, user=manager)
+        return view(request)
+
+    results = []
+    for days in (7, 30):
+        _, cold_ms, cold_queries = measure(call, days)
+        timings, queries = [], []
+        for _ in range(repeats):
+            _, elapsed, query_count = measure(call, days)
+            timings.append(elapsed)
+            queries.append(query_count)
+        results.append({
+            'days': days,
+            'cold_ms': round(cold_ms, 2),
+            'cold_queries': cold_queries,
+            'warm_p50_ms': round(statistics.median(timings), 2),
+            'warm_max_queries': max(queries),
+        })
+    return results
+
+
+@register('user_scope')
+def bench_user_scope(sizes=(100, 1000), repeats=20, **options):
+    """Résolution du périmètre d'un directeur de pôle : calcul initial puis lecture du cache"""
+    from .models import Cluster, Service
+    from .scopes import get_user_scope
+
+    company = Company.objects.create(name='Benchmark')
+    results = []
+    offset = 0
+    for size in sizes:
+        cluster = Cluster.objects.create(name=f'Benchmark {size}', company=company)
+        service = Service.objects.create(service_name=f'Benchmark {size}', cluster=cluster, company=company)
+        team = Team.objects.create(team_name=f'Benchmark {size}', company=company)
+        director = create_collaborator(company, team, offset, role='pole_director', cluster=cluster, service=service)
+        members = [
+            Collaborator(
+                collaborator_id=f'BENCH{offset + index:06d}', email=f'bench{offset + index}@benchmark.local',
+                first_name='Bench', last_name=f'{offset + index:06d}', company=company,
+                team=team, service=service, cluster=cluster
+            )
+            for index in range(1, size + 1)
+        ]
+        Collaborator.objects.bulk_create(members, batch_size=1000)
+        offset += size + 1
+
+        director._user_scope = None
+        _, cold_ms, cold_queries = measure(get_user_scope, director)
+        timings, queries = [], []
+        for _ in range(repeats):
+            director._user_scope = None
+            _, elapsed, query_count = measure(get_user_scope, director)
+            timings.append(elapsed)
+            queries.append(query_count)
+
+        results.append({
+            'members': size,
+            'cold_ms': round(cold_ms, 2),
+            'cold_queries': cold_queries,
+            'warm_p50_ms': round(statistics.median(timings), 2),
+            'warm_max_queries': max(queries),
+        })
+    return results
+
+
+@register('emotion_export')
+def bench_emotion_export(sizes=(1000, 100000), format_type='csv', **options):
+    """Mémoire consommée par l'export en flux selon le nombre de lignes (pic Python et RSS)"""
+    import resource
+    import tracemalloc
+    from .exports import DEFAULT_COLUMNS, StreamingEmotionExport
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    # Au plus deux ans d'historique par collaborateur
+    per_collaborator = 1460
+
+    results = []
+    index = 0
+    for size in sizes:
+        members = []
+        remaining = size
+        while remaining > 0:
+            collaborator = create_collaborator(company, team, index)
+            seed_history(collaborator, emotion_types, min(per_collaborator, remaining))
+            members.append(collaborator.pk)
+            remaining -= per_collaborator
+            index += 1
+
+        queryset = Emotion.objects.filter(collaborator_id__in=members).order_by('-date', '-creation_date')
+        response = StreamingEmotionExport(queryset, DEFAULT_COLUMNS).response(format_type)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        start = time.perf_counter()
+        exported = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        results.append({
+            'rows': size,
+            'mb_exported': round(exported / 1024 / 1024, 1),
+            'rows_per_s': round(size / elapsed),
+            'python_peak_kb': round(peak / 1024),
+            'max_rss_growth_kb': rss_after - rss_before,
+        })
+    return results
+
+
+@register('emotion_pagination')
+def bench_emotion_pagination(sizes=(10000, 100000), page_size=20, **options):
+    """Coût d'une page profonde : pagination par numéro (COUNT + OFFSET) contre pagination par curseur"""
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from .views import EmotionViewSet
+    from .pagination import EmotionCursorPagination
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    admin = create_collaborator(company, team, 0, role='admin')
+    view = EmotionViewSet.as_view({'get': 'list'})
+    factory = APIRequestFactory()
+
+    def call(params):
+        request = factory.get('/api/emotions/', dict(params, page_size=page_size))
+        force_authenticate(request, user=admin)
+        return view(request)
+
+    results = []
+    index, seeded = 1, 0
+    for size in sizes:
+        while seeded < size:
+            collaborator = create_collaborator(company, team, index)
+            declarations = min(1460, size - seeded)
+            seed_history(collaborator, emotion_types, declarations)
+            seeded += declarations
+            index += 1
+
+        deep_page = max(1, seeded // page_size - 1)
+        _, number_ms, number_queries = measure(call, {'page': deep_page})
+
+        # Curseur positionné sur la même profondeur
+        anchor = Emotion.objects.order_by(*EmotionCursorPagination.ordering)[(deep_page - 1) * page_size]
+        cursor = EmotionCursorPagination().encode_cursor(
+            [anchor.date, anchor.creation_date, anchor.pk]
+        )
+        _, cursor_ms, cursor_queries = measure(call, {'cursor': cursor})
+
+        results.append({
+            'rows': seeded,
+            'page': deep_page,
+            'page_number_ms': round(number_ms, 2),
+            'page_number_queries': number_queries,
+            'cursor_ms': round(cursor_ms, 2),
+            'cursor_queries': cursor_queries,
+        })
+    return results
+
+
+@register('org_list_queries')
+def bench_org_list_queries(sizes=(5, 20), **options):
+    """Nombre de requêtes des listes de l'organisation : doit rester constant quel que soit le nombre de lignes"""
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from .models import Cluster, Service
+    from . import views
+
+    endpoints = [
+        ('companies', views.CompanyViewSet),
+        ('clusters', views.ClusterViewSet),
+        ('services', views.ServiceViewSet),
+        ('teams', views.TeamViewSet),
+        ('collaborators', views.CollaboratorViewSet),
+        ('emotion-types', views.EmotionTypeViewSet),
+    ]
+    factory = APIRequestFactory()
+    create_emotion_types()
+
+    results = []
+    index = 0
+    for size in sizes:
+        for position in range(size):
+            company = Company.objects.create(name=f'Benchmark {size}-{position}')
+            cluster = Cluster.objects.create(name=f'Benchmark {size}-{position}', company=company)
+            service = Service.objects.create(
+                service_name=f'Benchmark {size}-{position}', cluster=cluster, company=company
+            )
+            team = Team.objects.create(team_name=f'Benchmark {size}-{position}', service=service, company=company)
+            create_collaborator(company, team, index, role='admin', service=service, cluster=cluster)
+            index += 1
+        admin = Collaborator.objects.get(collaborator_id=f'BENCH{index - 1:06d}')
+
+        row = {'objects': index}
+        for name, viewset in endpoints:
+            request = factory.get(f'/api/{name}/')
+            force_authenticate(request, user=admin)
+            _, _, queries = measure(viewset.as_view({'get': 'list'}), request)
+            row[f'{name}_queries'] = queries
+        results.append(row)
+    return results
+
+
+@register('emotion_serialization')
+def bench_emotion_serialization(sizes=(1000, 10000), **options):
+    """Lignes sérialisées par seconde : EmotionSerializer contre la projection values() des listes"""
+    from .serializers import EmotionReadProjection, EmotionSerializer
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+
+    results = []
+    index, seeded = 0, 0
+    for size in sizes:
+        while seeded < size:
+            collaborator = create_collaborator(company, team, index)
+            declarations = min(1460, size - seeded)
+            seed_history(collaborator, emotion_types, declarations)
+            seeded += declarations
+            index += 1
+
+        queryset = Emotion.objects.order_by('-date', '-creation_date')[:size]
+        serializer_data, serializer_ms, serializer_queries = measure(
+            lambda: EmotionSerializer(queryset, many=True).data
+        )
+        projection_data, projection_ms, projection_queries = measure(EmotionReadProjection.serialize, queryset)
+
+        results.append({
+            'rows': len(projection_data),
+            'serializer_rows_per_s': round(len(serializer_data) / (serializer_ms / 1000)),
+            'projection_rows_per_s': round(len(projection_data) / (projection_ms / 1000)),
+            'speedup': round(serializer_ms / projection_ms, 1),
+            'serializer_queries': serializer_queries,
+            'projection_queries': projection_queries,
+        })
+    return results
+
+
+@register('emotion_partition_pruning')
+def bench_emotion_partition_pruning(sizes=(1, 3), collaborators=30, **options):
+    """
+    Requête mensuelle (agrégat par type d'émotion) sur un historique de N années :
+    table partitionnée par mois contre une copie non partitionnée (PostgreSQL)
+    """
+    import json
+    from django.db.models import Avg, Count
+    from .partitioning import DEFAULT_PARTITION, TABLE, create_partitions, is_partitioned
+
+    if not is_partitioned():
+        return [{'skipped': 'table non partitionnée (manage.py partition_emotions --convert)'}]
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    emotion_types = create_emotion_types()
+    end_date = timezone.now().date() - timedelta(days=1)
+
+    def explain(cursor, sql, params):
+        cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        relations = []
+
+        def walk(node):
+            if 'Relation Name' in node:
+                relations.append(node['Relation Name'])
+            for child in node.get('Plans', []):
+                walk(child)
+        walk(plan[0]['Plan'])
+        return plan[0]['Execution Time'], relations
+
+    results = []
+    index = 0
+    for years in sizes:
+        create_partitions(end_date - timedelta(days=365 * years), end_date)
+        for _ in range(collaborators):
+            seed_history(create_collaborator(company, team, index), emotion_types, 730 * years, end_date)
+            index += 1
+
+        # Mois complet au milieu de l'historique
+        month_start = (end_date - timedelta(days=180)).replace(day=1)
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        queryset = Emotion.objects.filter(date__range=(month_start, month_end)).values(
+            'emotion_type__emotion'
+        ).annotate(count=Count('id'), average=Avg('emotion_degree')).order_by()
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMP TABLE bench_emotion_flat AS SELECT * FROM "{TABLE}"')
+            cursor.execute('CREATE INDEX ON bench_emotion_flat (date, period)')
+            cursor.execute(f'ANALYZE "{TABLE}"')
+            cursor.execute('ANALYZE bench_emotion_flat')
+            cursor.execute(f'SELECT COUNT(*) FROM "{TABLE}"')
+            rows = cursor.fetchone()[0]
+
+            partitioned_ms, relations = explain(cursor, sql, params)
+            flat_ms, _ = explain(cursor, sql.replace(f'"{TABLE}"', 'bench_emotion_flat'), params)
+            cursor.execute('DROP TABLE bench_emotion_flat')
+
+        results.append({
+            'years': years,
+            'rows': rows,
+            'partitions_scanned': len({
+                name for name in relations if name.startswith(f'{TABLE}_p') or name == DEFAULT_PARTITION
+            }),
+            'partitioned_ms': round(partitioned_ms, 2),
+            'flat_ms': round(flat_ms, 2),
+            'speedup': round(flat_ms / partitioned_ms, 1) if partitioned_ms else None,
+        })
+    return results
+
+
+@register('token_auth')
+def bench_token_auth(repeats=200, **options):
+    """Authentification par jeton : TokenAuthentication (SQL) contre CachedTokenAuthentication (LRU local, Redis)"""
+    from django.test.utils import override_settings
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from .authentication import CachedTokenAuthentication, invalidate_collaborators, local_cache
+
+    company = Company.objects.create(name='Benchmark')
+    team = Team.objects.create(team_name='Benchmark', company=company)
+    user = create_collaborator(company, team, 0)
+    key = Token.objects.create(user=user).key
+
+    def authenticate(backend):
+        authenticated, _ = backend.authenticate_credentials(key)
+        # Champs lus par les vérifications de droits et de périmètre
+        return authenticated.role, authenticated.team_id, authenticated.service_id
+
+    def run(backend, before=None):
+        timings, queries = [], []
+        for _ in range(repeats):
+            if before:
+                before()
+            _, elapsed, query_count = measure(authenticate, backend)
+            timings.append(elapsed)
+            queries.append(query_count)
+        return {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'max_queries': max(queries),
+        }
+
+    results = [{'backend': 'token', **run(TokenAuthentication())}]
+    invalidate_collaborators([user.pk])
+    with override_settings(AUTH_TOKEN_LOCAL_CACHE_TIMEOUT=0):
+        results.append({'backend': 'cached (redis)', **run(CachedTokenAuthentication())})
+    results.append({'backend': 'cached (local)', **run(CachedTokenAuthentication())})
+    results.append({
+        'backend': 'cached (invalidé)',
+        **run(CachedTokenAuthentication(), before=lambda: invalidate_collaborators([user.pk]))
+    })
+    local_cache.clear()
+    return results
+
+
+@register('dashboard_async')
+def bench_dashboard_async(sizes=(1, 8, 32), repeats=5, **options):
+    """
+    Latence p50/p95 de la construction du dashboard (hors cache) sous charge concurrente :
+    sections séquentielles (workers WSGI simulés par des threads) contre sections
+    parallèles (abuild_dashboard_data). Lit les données existantes sans les modifier
+    (les threads ne voient pas les écritures non validées du benchmark)
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import close_old_connections
+    from .dashboard import TEAM_ROLES, abuild_dashboard_data, build_dashboard_data
+
+    users = list(Collaborator.objects.filter(role__in=TEAM_ROLES).order_by('collaborator_id')[:max(sizes)])
+    if not users:
+        return [{'skipped': 'aucun manager en base (manage.py generate_organization)'}]
+
+    def timed_sync(user):
+        start = time.perf_counter()
+        try:
+            build_dashboard_data(user, 30)
+        finally:
+            close_old_connections()
+        return (time.perf_counter() - start) * 1000
+
+    async def run_async(concurrency, requests):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(user):
+            async with semaphore:
+                start = time.perf_counter()
+                await abuild_dashboard_data(user, 30)
+                return (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(timed(user) for user in requests))
+
+    results = []
+    for concurrency in sizes:
+        requests = [users[index % len(users)] for index in range(concurrency * repeats)]
+        with ThreadPoolExecutor(concurrency) as executor:
+            sync_timings = list(executor.map(timed_sync, requests))
+        async_timings = asyncio.run(run_async(concurrency, requests))
+        results.append({
+            'concurrency': concurrency,
+            'requests': len(requests),
+            'sync_p50_ms': round(percentile(sync_timings, 0.5), 2),
+            'sync_p95_ms': round(percentile(sync_timings, 0.95), 2),
+            'async_p50_ms': round(percentile(async_timings, 0.5), 2),
+            'async_p95_ms': round(percentile(async_timings, 0.95), 2),
+        })
+    return results
+
+
+@register('member_stats')
+def bench_member_stats(sizes=(50, 200), history=60, days=30, **options):
+    """Statistiques par membre d'un service : get_emotion_stats par collaborateur contre une requête groupée"""
+    from .dashboard import get_emotion_stats, get_member_stats
+    from .models import Service
+
+    company = Company.objects.create(name='Benchmark')
+    emotion_types = create_emotion_types()
+    results = []
+    offset = 0
+    for size in sizes:
+        service = Service.objects.create(service_name=f'Benchmark {size}', company=company)
+        team = Team.objects.create(team_name=f'Benchmark {size}', service=service, company=company)
+        director = create_collaborator(company, team, offset, role='director', service=service)
+        members = [
+            create_collaborator(company, team, offset + index, service=service)
+            for index in range(1, size + 1)
+        ]
+        for member in members:
+            seed_history(member, emotion_types, history)
+        offset += size + 1
+
+        director._user_scope = None
+        _, per_member_ms, per_member_queries = measure(
+            lambda: [get_emotion_stats(member, days) for member in members]
+        )
+        director._user_scope = None
+        rows, grouped_ms, grouped_queries = measure(get_member_stats, director, days)
+        results.append({
+            'members': size,
+            'per_member_ms': round(per_member_ms, 2),
+            'per_member_queries': per_member_queries,
+            'grouped_ms': round(grouped_ms, 2),
+            'grouped_queries': grouped_queries,
+            'rows': len(rows),
+        })
+    return results
+
+
+@register('emotion_heatmap')
+def bench_emotion_heatmap(sizes=(100, 500), days=90, **options):
+    """Construction de la carte de chaleur (projection et matrice numpy) sur `days` jours"""
+    from .heatmap import build_heatmap
+
+    company = Company.objects.create(name='Benchmark')
+    emotion_types = create_emotion_types()
+    end_date = timezone.now().date() - timedelta(days=1)
+    results = []
+    offset = 0
+    for size in sizes:
+        team = Team.objects.create(team_name=f'Benchmark {size}', company=company)
+        for index in range(size):
+            seed_history(create_collaborator(company, team, offset + index), emotion_types, days * 2, end_date)
+        offset += size
+
+        collaborators = Collaborator.objects.filter(team=team)
+        data, elapsed, queries = measure(build_heatmap, collaborators, days, end_date)
+        results.append({
+            'collaborators': size,
+            'days': days,
+            'cells': len(data['cells']['value']),
+            'ms': round(elapsed, 2),
+            'queries': queries,
+        })
+    return results
@@ -0,0 +1,167 @@
+"""
+Cache des réponses du dashboard (Redis, via le cache Django par défaut).
+
+Chaque réponse est stockée sous une clé qui embarque la version des périmètres
+(« scopes ») dont elle dépend : le collaborateur lui-même, l'équipe qu'il
+manage, son service ou son cluster selon le rôle, et les tendances.
+Une écriture ne supprime aucune entrée : elle incrémente la version des
+périmètres touchés, ce qui rend les clés correspondantes inaccessibles
+(elles expirent ensuite d'elles-mêmes).
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+KEY_PREFIX = 'emotion_tracker'
+TRENDS_SCOPE = 'trends'
+METRICS = ('hits', 'misses', 'invalidations')
+
+
+def collaborator_scope(collaborator_id):
+    return f'collab:{collaborator_id}'
+
+
+def manager_scope(manager_id):
+    return f'manager:{manager_id}'
+
+
+def service_scope(service_id):
+    return f'service:{service_id}'
+
+
+def cluster_scope(cluster_id):
+    return f'cluster:{cluster_id}'
+
+
+def scopes_for_collaborator(collaborator_id, manager_id=None, service_id=None, cluster_id=None):
+    """Périmètres affectés par un changement sur les données d'un collaborateur"""
+    scopes = [collaborator_scope(collaborator_id)]
+    if manager_id:
+        scopes.append(manager_scope(manager_id))
+    if service_id:
+        scopes.append(service_scope(service_id))
+    if cluster_id:
+        scopes.append(cluster_scope(cluster_id))
+    return scopes
+
+
+def dashboard_scopes(user):
+    """Périmètres lus par le dashboard d'un utilisateur, selon son rôle"""
+    scopes = [collaborator_scope(user.pk), TRENDS_SCOPE]
+    if user.role == 'manager':
+        scopes.append(manager_scope(user.pk))
+    elif user.role == 'director' and user.service_id:
+        scopes.append(service_scope(user.service_id))
+    elif user.role == 'pole_director' and user.cluster_id:
+        scopes.append(cluster_scope(user.cluster_id))
+    return scopes
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def _metric_key(name):
+    return f'{KEY_PREFIX}:metrics:dashboard:{name}'
+
+
+def _new_version():
+    # Une version perdue (éviction) repart d'une valeur inédite,
+    # jamais d'une valeur déjà utilisée par une ancienne entrée
+    return time.time_ns()
+
+
+def get_versions(scopes):
+    """Versions courantes des périmètres, en un seul aller-retour Redis"""
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(list(keys))
+    result = {}
+    for key, scope in keys.items():
+        version = versions.get(key)
+        if version is None:
+            version = _new_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        result[scope] = version
+    return result
+
+
+def _bump(scopes):
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+    _increment_metric('invalidations', len(set(scopes)))
+
+
+def invalidate_scopes(scopes):
+    """Invalide les périmètres, une fois la transaction courante validée"""
+    scopes = list(scopes)
+    if scopes:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def _increment_metric(name, delta=1):
+    key = _metric_key(name)
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+
+
+def get_metrics():
+    """Compteurs hits/misses/invalidations du cache du dashboard"""
+    values = cache.get_many([_metric_key(name) for name in METRICS])
+    metrics = {name: values.get(_metric_key(name), 0) for name in METRICS}
+    lookups = metrics['hits'] + metrics['misses']
+    metrics['hit_rate'] = round(metrics['hits'] / lookups * 100, 1) if lookups else 0
+    return metrics
+
+
+def reset_metrics():
+    cache.delete_many([_metric_key(name) for name in METRICS])
+
+
+def _dashboard_key(user, days):
+    versions = get_versions(dashboard_scopes(user))
+    version_part = ':'.join(f'{scope}={versions[scope]}' for scope in sorted(versions))
+    return f'{KEY_PREFIX}:dashboard:{user.pk}:{days}:{timezone.now().date().isoformat()}:{version_part}'
+
+
+def get_or_build_dashboard(user, days, builder):
+    """
+    Retourne la réponse du dashboard depuis le cache, ou la construit via builder()
+    et la met en cache. La date du jour fait partie de la clé : les fenêtres
+    glissantes (« les N derniers jours ») changent à minuit.
+    """
+    key = _dashboard_key(user, days)
+    data = cache.get(key)
+    if data is not None:
+        _increment_metric('hits')
+        return data
+
+    _increment_metric('misses')
+    data = builder()
+    cache.set(key, data, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_or_build_dashboard(user, days, builder):
+    """Variante asynchrone de get_or_build_dashboard : builder est une fonction coroutine"""
+    key = await sync_to_async(_dashboard_key)(user, days)
+    data = await cache.aget(key)
+    if data is not None:
+        await sync_to_async(_increment_metric)('hits')
+        return data
+
+    await sync_to_async(_increment_metric)('misses')
+    data = await builder()
+    await cache.aset(key, data, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return data
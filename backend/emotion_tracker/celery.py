@@ -0,0 +1,13 @@
+"""
+Application Celery du projet (worker : celery -A emotion_tracker.celery worker,
+planificateur : celery -A emotion_tracker.celery beat).
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emotion_tracker.settings')
+
+app = Celery('emotion_tracker')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks(['emotion_tracker'])
@@ -0,0 +1,234 @@
+"""
+Construction des données du dashboard.
+
+La réponse est composée de sections indépendantes (profil, émotions récentes,
+statistiques personnelles et d'équipe, alertes, tendances). build_dashboard_data
+les calcule l'une après l'autre (vue DRF, WSGI) ; abuild_dashboard_data les
+exécute en parallèle sous ASGI, chaque section dans un thread d'un pool dédié avec
+sa propre connexion à la base : la latence est celle de la section la plus lente.
+Le pool compte DASHBOARD_ASYNC_MAX_CONNECTIONS threads par processus, ce qui borne
+les connexions ouvertes par les sections, quel que soit le nombre de requêtes en cours.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Avg, Count, FilteredRelation, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Alert, Emotion, EmotionTrend
+from .scopes import get_user_scope
+from .serializers import AlertSerializer, CollaboratorSerializer, EmotionReadProjection, EmotionTrendSerializer
+
+TEAM_ROLES = ('manager', 'director', 'pole_director')
+
+# Fenêtres proposées par le dashboard (les jours font partie de la clé de cache)
+DASHBOARD_DAYS = (7, 14, 30, 90)
+DEFAULT_DASHBOARD_DAYS = 7
+
+# Threads des sections du dashboard asynchrone : une connexion PostgreSQL au plus par thread
+SECTION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.DASHBOARD_ASYNC_MAX_CONNECTIONS, thread_name_prefix='dashboard-section'
+)
+
+
+def dashboard_days(value):
+    """
+    Fenêtre du dashboard à partir du paramètre days : la plus petite fenêtre
+    proposée qui le couvre (90 au-delà). ValueError si days n'est pas un entier positif.
+    """
+    if value in (None, ''):
+        return DEFAULT_DASHBOARD_DAYS
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('days doit être un entier')
+    if days < 1:
+        raise ValueError('days doit être un entier positif')
+    return next((allowed for allowed in DASHBOARD_DAYS if allowed >= days), DASHBOARD_DAYS[-1])
+
+
+def bounded_days(value, default, max_days):
+    """
+    Nombre de jours d'une période glissante (statistiques des membres, carte de chaleur).
+    ValueError si days n'est pas un entier compris entre 1 et max_days.
+    """
+    if value in (None, ''):
+        return default
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('days doit être un entier')
+    if not 1 <= days <= max_days:
+        raise ValueError(f'days doit être compris entre 1 et {max_days}')
+    return days
+
+
+def get_user_info(user, days):
+    return CollaboratorSerializer(user).data
+
+
+def get_recent_emotions(user, days):
+    recent_emotions = Emotion.objects.filter(
+        collaborator=user,
+        date__gte=timezone.now().date() - timedelta(days=days)
+    ).order_by('-date', '-creation_date')[:10]
+    return EmotionReadProjection.serialize(recent_emotions)
+
+
+def _compute_stats(emotions, expected, days):
+    stats = {
+        'total': emotions.count(),
+        'happy': emotions.filter(emotion_type__emotion='happy').count(),
+        'sad': emotions.filter(emotion_type__emotion='sad').count(),
+        'neutral': emotions.filter(emotion_type__emotion='neutral').count(),
+        'stressed': emotions.filter(emotion_type__emotion='stressed').count(),
+        'excited': emotions.filter(emotion_type__emotion='excited').count(),
+        'tired': emotions.filter(emotion_type__emotion='tired').count(),
+    }
+
+    participation_rate = (stats['total'] / expected * 100) if expected > 0 else 0
+    avg_score = emotions.aggregate(avg=Avg('emotion_degree'))['avg'] or 0
+
+    stats.update({
+        'participation_rate': round(participation_rate, 1),
+        'average_score': round(avg_score, 1),
+        'period_start': timezone.now().date() - timedelta(days=days),
+        'period_end': timezone.now().date()
+    })
+    return stats
+
+
+def get_emotion_stats(user, days):
+    """Calcule les statistiques d'émotions pour un utilisateur"""
+    emotions = Emotion.objects.filter(
+        collaborator=user,
+        date__gte=timezone.now().date() - timedelta(days=days)
+    )
+    return _compute_stats(emotions, days * 2, days)
+
+
+def get_team_stats(user, days):
+    """Calcule les statistiques d'équipe selon le rôle"""
+    if user.role not in TEAM_ROLES:
+        return None
+
+    scope = get_user_scope(user)
+    emotions = scope.filter_emotions(Emotion.objects.filter(
+        date__gte=timezone.now().date() - timedelta(days=days)
+    ))
+    return _compute_stats(emotions, scope.member_count * days * 2, days)
+
+
+def get_member_stats(user, days):
+    """
+    Statistiques de chaque collaborateur du périmètre (comptes par émotion,
+    participation, score moyen, dernière déclaration) en une seule requête
+    groupée par (collaborateur, type d'émotion). La jointure filtrée sur la
+    période (FilteredRelation) conserve les membres sans déclaration.
+    """
+    today = timezone.now().date()
+    start = today - timedelta(days=days)
+    scope = get_user_scope(user)
+    if not scope.member_count:
+        return []
+
+    rows = scope.members().annotate(
+        period_emotions=FilteredRelation(
+            'emotions', condition=Q(emotions__date__gte=start, emotions__date__lte=today)
+        )
+    ).values(
+        'id', 'collaborator_id', 'first_name', 'last_name', 'team_id', 'period_emotions__emotion_type__emotion'
+    ).annotate(
+        count=Count('period_emotions__id'),
+        degree_sum=Sum('period_emotions__emotion_degree'),
+        last_date=Max('period_emotions__date'),
+    ).order_by()
+
+    members = {}
+    for row in rows:
+        member = members.get(row['id'])
+        if member is None:
+            member = members[row['id']] = {
+                'id': row['id'],
+                'collaborator_id': row['collaborator_id'],
+                'full_name': f"{row['first_name']} {row['last_name']}",
+                'team_id': row['team_id'],
+                'total': 0,
+                'emotions': {},
+                'degree_sum': 0,
+                'last_declaration': None,
+            }
+        if not row['count']:
+            continue
+        member['total'] += row['count']
+        member['emotions'][row['period_emotions__emotion_type__emotion']] = row['count']
+        member['degree_sum'] += row['degree_sum'] or 0
+        if member['last_declaration'] is None or row['last_date'] > member['last_declaration']:
+            member['last_declaration'] = row['last_date']
+
+    expected = days * 2
+    results = []
+    for member in sorted(members.values(), key=lambda item: item['full_name']):
+        degree_sum = member.pop('degree_sum')
+        member['participation_rate'] = round(member['total'] / expected * 100, 1) if expected > 0 else 0
+        member['average_score'] = round(degree_sum / member['total'], 1) if member['total'] else 0
+        results.append(member)
+    return results
+
+
+def get_alerts(user, days):
+    alerts = Alert.objects.filter(
+        collaborator=user,
+        is_resolved=False
+    )[:5]
+    return AlertSerializer(alerts, many=True).data
+
+
+def get_trends(user, days):
+    trends = EmotionTrend.objects.filter(
+        start_date__gte=timezone.now().date() - timedelta(days=30)
+    )[:5]
+    return EmotionTrendSerializer(trends, many=True).data
+
+
+SECTIONS = {
+    'user_info': get_user_info,
+    'recent_emotions': get_recent_emotions,
+    'emotion_stats': get_emotion_stats,
+    'team_stats': get_team_stats,
+    'alerts': get_alerts,
+    'trends': get_trends,
+}
+
+
+def build_dashboard_data(user, days):
+    """Construit la réponse complète du dashboard (hors cache), section par section"""
+    return {name: section(user, days) for name, section in SECTIONS.items()}
+
+
+def _run_section(section, user, days):
+    # Thread du pool : connexion propre au thread, fermée selon CONN_MAX_AGE
+    # comme en fin de requête (request_started / request_finished)
+    close_old_connections()
+    try:
+        return section(user, days)
+    finally:
+        close_old_connections()
+
+
+async def abuild_dashboard_data(user, days):
+    """Construit la réponse du dashboard en exécutant les sections en parallèle"""
+    # Périmètre résolu une fois, avant que les sections ne le lisent depuis plusieurs threads
+    if user.role in TEAM_ROLES:
+        await sync_to_async(get_user_scope)(user)
+
+    names = list(SECTIONS)
+    results = await asyncio.gather(*(
+        sync_to_async(_run_section, thread_sensitive=False, executor=SECTION_EXECUTOR)(SECTIONS[name], user, days)
+        for name in names
+    ))
+    return dict(zip(names, results))
@@ -0,0 +1,153 @@
+"""
+Export en flux des déclarations d'émotions (CSV, NDJSON, JSON).
+Les lignes sont lues par paquets via un curseur côté serveur sur une projection
+values_list, puis écrites au fil de l'eau dans une StreamingHttpResponse :
+la mémoire consommée ne dépend pas du nombre de lignes exportées.
+"""
+import csv
+import json
+import uuid
+from datetime import date, datetime
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+# Colonne exportée -> champ lu en base
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'emotion_id': 'emotion_id',
+    'collaborator': 'collaborator_id',
+    'collaborator_name': 'full_name',
+    'emotion_type': 'emotion_type_id',
+    'emotion_type_name': 'emotion_type__name',
+    'emotion_type_degree': 'emotion_type__degree',
+    'date': 'date',
+    'period': 'period',
+    'week_number': 'week_number',
+    'month': 'month',
+    'year': 'year',
+    'team': 'team',
+    'company': 'company',
+    'cluster': 'cluster',
+    'full_name': 'full_name',
+    'emotion_degree': 'emotion_degree',
+    'comment': 'comment',
+    'half_day': 'half_day',
+    'weekly_emotion_summary': 'weekly_emotion_summary',
+    'monthly_emotion_insights': 'monthly_emotion_insights',
+    'creation_date': 'creation_date',
+}
+
+# Les résumés JSON sont volumineux : exportés seulement sur demande
+DEFAULT_COLUMNS = [
+    column for column in EXPORT_COLUMNS
+    if column not in ('weekly_emotion_summary', 'monthly_emotion_insights')
+]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+class CSVExportRenderer(BaseRenderer):
+    """Active ?format=csv sur l'action d'export (le contenu est produit par StreamingEmotionExport)"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Utilisé uniquement pour les réponses d'erreur
+        return json.dumps(data, default=str).encode('utf-8')
+
+
+class NDJSONExportRenderer(CSVExportRenderer):
+    """Active ?format=ndjson sur l'action d'export"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def parse_columns(value):
+    """Valide la liste de colonnes demandée (séparées par des virgules)"""
+    if not value:
+        return list(DEFAULT_COLUMNS), None
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        return None, f"Colonnes inconnues: {', '.join(unknown)}"
+    return columns, None
+
+
+def format_value(value):
+    """Valeur prête pour JSON/CSV, formatée comme les champs DRF (DATE_FORMAT, DATETIME_FORMAT)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        if api_settings.DATETIME_FORMAT == ISO_8601:
+            return value.isoformat()
+        return value.strftime(api_settings.DATETIME_FORMAT)
+    if isinstance(value, date):
+        if api_settings.DATE_FORMAT == ISO_8601:
+            return value.isoformat()
+        return value.strftime(api_settings.DATE_FORMAT)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+class _LineBuffer:
+    """Pseudo-fichier pour csv.writer : retourne la ligne écrite au lieu de la stocker"""
+
+    def write(self, value):
+        return value
+
+
+class StreamingEmotionExport:
+    """Export en flux d'un queryset d'émotions"""
+
+    def __init__(self, queryset, columns, chunk_size=None):
+        self.queryset = queryset
+        self.columns = columns
+        self.chunk_size = chunk_size or settings.EMOTION_EXPORT_CHUNK_SIZE
+
+    def rows(self):
+        """Lignes formatées, lues par paquets via un curseur côté serveur"""
+        fields = [EXPORT_COLUMNS[column] for column in self.columns]
+        for row in self.queryset.values_list(*fields).iterator(chunk_size=self.chunk_size):
+            yield [format_value(value) for value in row]
+
+    def csv_lines(self):
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(self.columns)
+        for row in self.rows():
+            yield writer.writerow(
+                json.dumps(value) if isinstance(value, (dict, list)) else value
+                for value in row
+            )
+
+    def ndjson_lines(self):
+        for row in self.rows():
+            yield json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n'
+
+    def json_lines(self):
+        yield '['
+        separator = ''
+        for row in self.rows():
+            yield separator + json.dumps(dict(zip(self.columns, row)), ensure_ascii=False)
+            separator = ','
+        yield ']'
+
+    def response(self, format_type):
+        """StreamingHttpResponse au format demandé (csv, ndjson ou json)"""
+        lines = getattr(self, f'{format_type}_lines')()
+        response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[format_type])
+        filename = f"emotions_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{format_type}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
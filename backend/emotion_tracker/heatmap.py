@@ -0,0 +1,130 @@
+"""
+Carte de chaleur collaborateurs × jours de l'humeur et de la participation (NumPy).
+
+Les déclarations du périmètre sont lues en une projection (values_list) puis
+placées dans une matrice dense collaborateurs × jours × période (matin, soir),
+NaN pour une demi-journée sans déclaration. Les agrégats par ligne, par jour
+et globaux sont calculés sur la matrice ; seules les cellules renseignées sont
+renvoyées, en encodage compact : tableaux d'indices (ligne, jour, période) et
+tableau plat des valeurs.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .models import Emotion
+
+PERIODS = ('morning', 'evening')
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImproperlyConfigured(
+            "La carte de chaleur nécessite numpy (pip install numpy)"
+        ) from exc
+    return numpy
+
+
+def _to_list(np, values, decimals=2):
+    """Tableau flottant -> liste JSON (None pour NaN)"""
+    rounded = np.round(values, decimals)
+    return [None if value != value else float(value) for value in rounded.tolist()]
+
+
+def _aggregates(np, sums, counts, slots):
+    """Humeur moyenne et taux de participation (%) à partir des sommes et nombres de déclarations"""
+    average = np.divide(sums, counts, out=np.full(np.shape(sums), np.nan), where=counts > 0)
+    participation = counts / slots * 100 if slots else np.zeros(np.shape(counts))
+    return average, participation
+
+
+def build_heatmap(collaborators, days, end_date=None):
+    """
+    Carte de chaleur des `days` derniers jours (jusqu'à end_date inclus, aujourd'hui par défaut)
+    pour un queryset de collaborateurs
+    """
+    np = _import_numpy()
+    end_date = end_date or timezone.now().date()
+    start_date = end_date - timedelta(days=days - 1)
+
+    members = list(collaborators.order_by('last_name', 'first_name').values_list('id', 'first_name', 'last_name'))
+    row_of = {pk: index for index, (pk, _, _) in enumerate(members)}
+    shape = (len(members), days, len(PERIODS))
+
+    # Sous-requête sur les collaborateurs plutôt que la liste de leurs identifiants
+    rows = list(Emotion.objects.filter(
+        collaborator__in=collaborators.order_by().values('pk'), date__range=(start_date, end_date)
+    ).order_by().values_list('collaborator_id', 'date', 'period', 'emotion_degree'))
+
+    # Indices calculés par colonne (vectorisés), pas ligne à ligne
+    collaborator_ids, dates, periods, degrees = zip(*rows) if rows else ((), (), (), ())
+    row_index = np.fromiter((row_of[pk] for pk in collaborator_ids), dtype=np.int32, count=len(rows))
+    day_index = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start_date, 'D')).astype(np.int32)
+    period_index = (np.array(periods, dtype=object) == PERIODS[1]).astype(np.int8)
+    values = np.array(degrees, dtype=np.float32)
+
+    matrix = np.full(shape, np.nan, dtype=np.float32)
+    matrix[row_index, day_index, period_index] = values
+
+    declared = ~np.isnan(matrix)
+    filled = np.where(declared, matrix, 0)
+
+    row_average, row_participation = _aggregates(
+        np, filled.sum(axis=(1, 2)), declared.sum(axis=(1, 2)), days * len(PERIODS)
+    )
+    day_average, day_participation = _aggregates(
+        np, filled.sum(axis=(0, 2)), declared.sum(axis=(0, 2)), len(members) * len(PERIODS)
+    )
+    period_average, period_participation = _aggregates(
+        np, filled.sum(axis=(0, 1)), declared.sum(axis=(0, 1)), len(members) * days
+    )
+    total_average, total_participation = _aggregates(
+        np, filled.sum(), declared.sum(), matrix.size
+    )
+
+    # Cellules renseignées, dans l'ordre de la matrice (ligne, jour, période)
+    cells = np.nonzero(declared)
+
+    return {
+        'period_start': start_date,
+        'period_end': end_date,
+        'periods': list(PERIODS),
+        'rows': [
+            {'id': pk, 'full_name': f'{first_name} {last_name}'} for pk, first_name, last_name in members
+        ],
+        'columns': [(start_date + timedelta(days=offset)).isoformat() for offset in range(days)],
+        'cells': {
+            'row': cells[0].tolist(),
+            'column': cells[1].tolist(),
+            'period': cells[2].tolist(),
+            'value': matrix[cells].astype(np.int16).tolist(),
+        },
+        'row_aggregates': {
+            'average': _to_list(np, row_average),
+            'participation_rate': _to_list(np, row_participation, 1),
+        },
+        'column_aggregates': {
+            'average': _to_list(np, day_average),
+            'participation_rate': _to_list(np, day_participation, 1),
+        },
+        'period_aggregates': {
+            'average': _to_list(np, period_average),
+            'participation_rate': _to_list(np, period_participation, 1),
+        },
+        'total': {
+            'declarations': int(declared.sum()),
+            'average': _to_list(np, np.atleast_1d(total_average))[0],
+            'participation_rate': _to_list(np, np.atleast_1d(total_participation), 1)[0],
+        },
+    }
+
+
+def scoped_collaborators(scope, team_id=None):
+    """Collaborateurs de la carte : membres du périmètre, éventuellement d'une seule équipe"""
+    queryset = scope.members()
+    if team_id:
+        queryset = queryset.filter(team_id=team_id)
+    return queryset
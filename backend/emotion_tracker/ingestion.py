@@ -0,0 +1,197 @@
+"""
+Ingestion en masse des déclarations d'émotions (bornes, rattrapage hors ligne, imports SIRH).
+Les champs dérivés sont calculés pour tout le lot en mémoire, puis les lignes sont
+insérées avec bulk_create au lieu de passer par Emotion.save() ligne par ligne.
+"""
+import uuid
+from datetime import date as date_type
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .alerting import AlertEngine
+from .authentication import invalidate_collaborators
+from .cache import invalidate_scopes, scopes_for_collaborator
+from .models import Collaborator, EmotionType, Emotion, EmotionDailyAggregate, EmotionRollup, get_date_period
+
+REQUIRED_FIELDS = ['collaborator', 'emotion_type', 'date', 'period']
+PERIODS = {choice for choice, _ in Emotion.PERIOD_CHOICES}
+
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _parse_date(value):
+    if isinstance(value, date_type):
+        return value
+    try:
+        return date_type.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class BulkEmotionIngestor:
+    """Valide et insère un lot de déclarations d'émotions en un nombre fixe de requêtes"""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'EMOTION_BULK_BATCH_SIZE', 1000)
+
+    def ingest(self, items, scope=None):
+        """
+        Insère les déclarations valides du lot et retourne
+        {'created': <nombre>, 'errors': [{'index': i, 'status': 400|403, 'errors': {champ: [messages]}}]}.
+        scope (voir scopes.UserScope) : collaborateurs pour le compte desquels l'appelant peut déclarer,
+        les autres déclarations sont refusées (403)
+        """
+        errors = {}
+        forbidden = set()
+        parsed = self._parse_items(items, errors)
+
+        collaborators = self._load_collaborators({row['collaborator'] for row in parsed.values()})
+        emotion_types = EmotionType.objects.in_bulk({row['emotion_type'] for row in parsed.values()})
+        existing = self._load_existing_keys(parsed.values())
+
+        now = timezone.now()
+        today = now.date()
+        seen = set()
+        emotions = []
+        for index, row in parsed.items():
+            collaborator = collaborators.get(row['collaborator'])
+            emotion_type = emotion_types.get(row['emotion_type'])
+            if collaborator is None:
+                errors[index] = {'collaborator': ['Collaborateur introuvable.']}
+                continue
+            if scope is not None and not scope.includes(collaborator):
+                errors[index] = {'collaborator': ['Déclaration hors de votre périmètre.']}
+                forbidden.add(index)
+                continue
+            if emotion_type is None:
+                errors[index] = {'emotion_type': ['Type d\'émotion introuvable.']}
+                continue
+
+            # Respect de unique_together (collaborator, date, period), en base et dans le lot
+            key = (row['collaborator'], row['date'], row['period'])
+            if key in existing or key in seen:
+                errors[index] = {
+                    'non_field_errors': [f"Une émotion a déjà été déclarée pour {row['period']} le {row['date']}"]
+                }
+                continue
+            seen.add(key)
+
+            emotions.append(self._build_emotion(row, collaborator, emotion_type, now, today))
+
+        created = 0
+        if emotions:
+            try:
+                with transaction.atomic():
+                    EmotionRollup.objects.record_emotions(emotions)
+                    Emotion.objects.bulk_create(emotions, batch_size=self.batch_size)
+                    EmotionDailyAggregate.objects.record_many(emotions, collaborators)
+                    AlertEngine().record_many(emotions, collaborators)
+                    collaborator_ids = {emotion.collaborator_id for emotion in emotions}
+                    Collaborator.objects.refresh_moods(collaborator_ids)
+                    # bulk_create n'émet pas de signaux : invalider les caches explicitement
+                    invalidate_scopes(self._cache_scopes(emotions, collaborators))
+                    invalidate_collaborators(collaborator_ids)
+                created = len(emotions)
+            except IntegrityError:
+                # Déclaration concurrente insérée entre la vérification et l'insertion
+                errors[None] = {'non_field_errors': ['Conflit avec des déclarations existantes, lot annulé.']}
+
+        return {
+            'created': created,
+            'errors': [
+                {'index': index, 'status': 403 if index in forbidden else 400, 'errors': row_errors}
+                for index, row_errors in sorted(errors.items(), key=lambda item: (item[0] is None, item[0] or 0))
+            ]
+        }
+
+    def _parse_items(self, items, errors):
+        parsed = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[index] = {'non_field_errors': ['Format invalide, objet attendu.']}
+                continue
+
+            row_errors = {
+                field: ['Ce champ est obligatoire.']
+                for field in REQUIRED_FIELDS if item.get(field) in (None, '')
+            }
+            row = {
+                'collaborator': _parse_uuid(item.get('collaborator')),
+                'emotion_type': _parse_uuid(item.get('emotion_type')),
+                'date': _parse_date(item.get('date')),
+                'period': item.get('period'),
+                'comment': item.get('comment') or None,
+            }
+            for field in ['collaborator', 'emotion_type', 'date']:
+                if field not in row_errors and row[field] is None:
+                    row_errors[field] = ['Valeur invalide.']
+            if 'period' not in row_errors and row['period'] not in PERIODS:
+                row_errors['period'] = [f"\"{row['period']}\" n'est pas un choix valide."]
+
+            if row_errors:
+                errors[index] = row_errors
+            else:
+                parsed[index] = row
+        return parsed
+
+    def _load_collaborators(self, collaborator_ids):
+        rows = Collaborator.objects.filter(id__in=collaborator_ids).values(
+            'id', 'collaborator_id', 'first_name', 'last_name',
+            'team_id', 'service_id', 'cluster_id', 'company_id', 'manager_id',
+            'team__team_name', 'company__name', 'cluster__name'
+        )
+        return {row['id']: row for row in rows}
+
+    def _cache_scopes(self, emotions, collaborators):
+        scopes = set()
+        for collaborator_id in {emotion.collaborator_id for emotion in emotions}:
+            collaborator = collaborators[collaborator_id]
+            scopes.update(scopes_for_collaborator(
+                collaborator_id, collaborator['manager_id'],
+                collaborator['service_id'], collaborator['cluster_id']
+            ))
+        return scopes
+
+    def _load_existing_keys(self, rows):
+        rows = list(rows)
+        if not rows:
+            return set()
+        dates = [row['date'] for row in rows]
+        return set(
+            Emotion.objects.filter(
+                collaborator_id__in={row['collaborator'] for row in rows},
+                date__range=(min(dates), max(dates))
+            ).values_list('collaborator_id', 'date', 'period')
+        )
+
+    def _build_emotion(self, row, collaborator, emotion_type, now, today):
+        date = row['date']
+        return Emotion(
+            emotion_id=f"{collaborator['collaborator_id']}-{date}-{row['period']}",
+            collaborator_id=collaborator['id'],
+            emotion_type=emotion_type,
+            date=date,
+            period=row['period'],
+            week_number=date.isocalendar()[1],
+            month=date.month,
+            year=date.year,
+            team=collaborator['team__team_name'] or '',
+            company=collaborator['company__name'] or '',
+            cluster=collaborator['cluster__name'] or '',
+            full_name=f"{collaborator['first_name']} {collaborator['last_name']}",
+            emotion_degree=emotion_type.degree,
+            half_day=now.hour >= 12,
+            date_period=get_date_period(date, today),
+            comment=row['comment'],
+            declared_team_id=collaborator['team_id'],
+            declared_service_id=collaborator['service_id'],
+            declared_cluster_id=collaborator['cluster_id'],
+            declared_company_id=collaborator['company_id'],
+        )
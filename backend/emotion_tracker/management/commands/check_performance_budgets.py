@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from emotion_tracker.perf_budgets import (
+    DEFAULT_SCALES, SCALES, compare, load_baseline, measurement_environment, run_suite, save_baseline
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mesure requêtes SQL, latences p50/p95 et pic mémoire des endpoints et des tendances '
+        'sur des organisations synthétiques, et échoue si un budget est dépassé (écritures annulées)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default=','.join(DEFAULT_SCALES),
+            help=f"Échelles à mesurer, séparées par des virgules ({', '.join(SCALES)})"
+        )
+        parser.add_argument('--repeats', type=int, default=10, help='Exécutions mesurées par scénario')
+        parser.add_argument(
+            '--only', action='append',
+            help='Limite aux scénarios correspondant au motif (ex: "trend.*", répétable)'
+        )
+        parser.add_argument('--baseline', help='Fichier de référence (PERF_BASELINE_PATH par défaut)')
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Enregistre les mesures comme nouvelle référence au lieu de les comparer'
+        )
+        parser.add_argument(
+            '--allow-new', action='store_true',
+            help='Tolère les scénarios absents de la référence (sinon la vérification échoue)'
+        )
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = [scale for scale in scales if scale not in SCALES]
+        if unknown:
+            raise CommandError(f"Échelle(s) inconnue(s): {', '.join(unknown)}")
+        if options['repeats'] < 1:
+            raise CommandError('--repeats doit être supérieur ou égal à 1')
+
+        results = run_suite(scales, repeats=options['repeats'], only=options['only'])
+        if not results:
+            raise CommandError('Aucun scénario mesuré')
+
+        if options['update_baseline']:
+            command = (
+                f"python manage.py check_performance_budgets --scales {','.join(scales)} "
+                f"--repeats {options['repeats']} --update-baseline"
+                + ''.join(f' --only "{pattern}"' for pattern in options['only'] or ())
+            )
+            save_baseline(results, options['baseline'], environment=measurement_environment(command))
+            self._write_table(results)
+            self.stdout.write(self.style.SUCCESS(f'Référence mise à jour ({len(results)} scénario(s))'))
+            return
+
+        rows = compare(results, load_baseline(options['baseline']))
+        self._write_table(rows)
+
+        # Un scénario sans référence n'est pas vérifié : échec, sauf --allow-new
+        new = [row for row in rows if row['status'] == 'new']
+        style = self.style.WARNING if options['allow_new'] else self.style.ERROR
+        for row in new:
+            self.stdout.write(style(f"{row['scale']} {row['scenario']}: aucune référence"))
+
+        over = [row for row in rows if row['status'] == 'over']
+        for row in over:
+            self.stdout.write(self.style.ERROR(
+                f"{row['scale']} {row['scenario']}: {'; '.join(row['violations'])}"
+            ))
+
+        errors = []
+        if over:
+            errors.append(f'{len(over)} budget(s) de performance dépassé(s)')
+        if new and not options['allow_new']:
+            errors.append(f'{len(new)} scénario(s) sans référence (--update-baseline pour les enregistrer)')
+        if errors:
+            raise CommandError(' ; '.join(errors))
+
+        self.stdout.write(self.style.SUCCESS('Budgets de performance respectés'))
+
+    def _write_table(self, rows):
+        columns = ['scale', 'scenario', 'queries', 'p50_ms', 'p95_ms', 'peak_kb']
+        if 'status' in rows[0]:
+            columns.append('status')
+        widths = {
+            column: max(len(column), *(len(str(row.get(column, ''))) for row in rows))
+            for column in columns
+        }
+        self.stdout.write('  '.join(column.ljust(widths[column]) for column in columns))
+        for row in rows:
+            self.stdout.write('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
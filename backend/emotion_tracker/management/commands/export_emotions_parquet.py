@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from emotion_tracker.models import Emotion
+from emotion_tracker.parquet import ParquetEmotionExporter
+
+
+def _parse_month(value):
+    year, month = value.split('-')
+    return int(year), int(month)
+
+
+class Command(BaseCommand):
+    help = 'Exporte l\'historique des émotions en Parquet, partitionné par année/mois (year=AAAA/month=MM)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Répertoire racine du jeu de données Parquet')
+        parser.add_argument('--since', help='Premier mois exporté (AAAA-MM)')
+        parser.add_argument('--until', help='Dernier mois exporté (AAAA-MM)')
+        parser.add_argument('--company', help='Nom de l\'entreprise à exporter (toutes par défaut)')
+        parser.add_argument(
+            '--overwrite', action='store_true',
+            help='Réécrit aussi les mois clos déjà exportés'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Emotion.objects.all()
+        try:
+            if options['since']:
+                year, month = _parse_month(options['since'])
+                queryset = queryset.filter(Q(year__gt=year) | Q(year=year, month__gte=month))
+            if options['until']:
+                year, month = _parse_month(options['until'])
+                queryset = queryset.filter(Q(year__lt=year) | Q(year=year, month__lte=month))
+        except ValueError:
+            raise CommandError('Les mois doivent être au format AAAA-MM')
+        if options['company']:
+            queryset = queryset.filter(collaborator__company__name=options['company'])
+
+        results = ParquetEmotionExporter().export_partitions(
+            queryset, options['output'], overwrite=options['overwrite']
+        )
+        for result in results:
+            if result['rows'] is None:
+                self.stdout.write(f"{result['year']}-{result['month']:02d}: déjà exporté, ignoré")
+            else:
+                self.stdout.write(f"{result['year']}-{result['month']:02d}: {result['rows']} ligne(s) -> {result['path']}")
+
+        written = [result for result in results if result['rows'] is not None]
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(written)} partition(s) écrite(s), {sum(result["rows"] for result in written)} ligne(s)'
+        ))
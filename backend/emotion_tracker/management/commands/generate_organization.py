@@ -0,0 +1,74 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from emotion_tracker.alerting import rebuild_alert_states
+from emotion_tracker.models import Collaborator, EmotionDailyAggregate, EmotionRollup
+from emotion_tracker.synthetic import DeclarationGenerator, OrganizationGenerator, OrganizationSpec
+
+
+class Command(BaseCommand):
+    help = 'Génère une organisation synthétique à grande échelle avec son historique de déclarations (tests de charge)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=1, help='Nombre d\'entreprises')
+        parser.add_argument('--clusters', type=int, default=2, help='Clusters par entreprise')
+        parser.add_argument('--services', type=int, default=3, help='Services par cluster')
+        parser.add_argument('--teams', type=int, default=4, help='Équipes par service')
+        parser.add_argument('--employees', type=int, default=10, help='Collaborateurs par équipe')
+        parser.add_argument('--manager-depth', type=int, default=2, help='Niveaux de managers dans une équipe')
+        parser.add_argument('--years', type=float, default=1, help='Années d\'historique de déclarations')
+        parser.add_argument('--end-date', help='Dernier jour d\'historique (AAAA-MM-JJ, hier par défaut)')
+        parser.add_argument('--seed', type=int, default=42, help='Graine (données identiques pour une même graine)')
+        parser.add_argument('--prefix', default='GEN', help='Préfixe des identifiants collaborateurs')
+        parser.add_argument('--workers', type=int, help='Processus de génération (nombre de CPU par défaut)')
+        parser.add_argument('--method', choices=['copy', 'bulk'], help='Écriture par COPY (PostgreSQL) ou bulk_create')
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Ne pas reconstruire les agrégats, le cube, les humeurs et les états d\'alerte'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else None
+        except ValueError as exc:
+            raise CommandError(f'Date invalide: {exc}')
+
+        spec = OrganizationSpec(
+            companies=options['companies'],
+            clusters=options['clusters'],
+            services=options['services'],
+            teams=options['teams'],
+            employees=options['employees'],
+            manager_depth=options['manager_depth'],
+            years=options['years'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+        )
+        if Collaborator.objects.filter(collaborator_id__startswith=spec.prefix).exists():
+            raise CommandError(f'Des collaborateurs {spec.prefix}* existent déjà (choisir un autre --prefix)')
+
+        started = time.perf_counter()
+        self.stdout.write(f'Création de l\'organisation ({spec.collaborators} collaborateurs)...')
+        organization = OrganizationGenerator(spec)
+        counts = organization.generate()
+        self.stdout.write(', '.join(f'{name}: {count}' for name, count in counts.items()))
+
+        generator = DeclarationGenerator(spec, workers=options['workers'], method=options['method'], end_date=end_date)
+        self.stdout.write(
+            f'Génération des déclarations du {generator.start_date} au {generator.end_date} '
+            f'({generator.workers} processus, {generator.method})...'
+        )
+        declarations_started = time.perf_counter()
+        total = generator.generate(organization.teams)
+        elapsed = time.perf_counter() - declarations_started
+        self.stdout.write(f'{total} déclarations en {elapsed:.1f} s ({total / max(elapsed, 0.001):.0f} lignes/s)')
+
+        if not options['skip_derived']:
+            self.stdout.write('Reconstruction des données dérivées...')
+            EmotionRollup.objects.rebuild()
+            EmotionDailyAggregate.objects.rebuild()
+            Collaborator.objects.refresh_moods()
+            rebuild_alert_states()
+
+        self.stdout.write(self.style.SUCCESS(f'Terminé en {time.perf_counter() - started:.1f} s'))
@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from emotion_tracker.partitioning import (
+    convert_to_partitioned, detach_partitions, ensure_partitions, is_partitioned, list_partitions
+)
+
+
+class Command(BaseCommand):
+    help = 'Partitionnement mensuel de la table des émotions (PostgreSQL) : conversion, partitions à venir, détachement'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Convertit la table existante en table partitionnée (copie des données, ancienne table conservée)'
+        )
+        parser.add_argument('--drop-legacy', action='store_true', help='Avec --convert : supprime l\'ancienne table')
+        parser.add_argument('--months-ahead', type=int, help='Nombre de mois à venir à créer à l\'avance')
+        parser.add_argument('--detach-before', help='Détache les partitions antérieures à ce mois (AAAA-MM)')
+        parser.add_argument('--drop', action='store_true', help='Avec --detach-before : supprime les partitions détachées')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Le partitionnement nécessite PostgreSQL')
+
+        if options['convert']:
+            self.stdout.write('Conversion de la table des émotions...')
+            copied = convert_to_partitioned(options['months_ahead'], drop_legacy=options['drop_legacy'])
+            self.stdout.write(self.style.SUCCESS(f'{copied} ligne(s) copiée(s)'))
+        elif not is_partitioned():
+            raise CommandError('La table des émotions n\'est pas partitionnée (utiliser --convert)')
+
+        created = ensure_partitions(options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'Partition créée : {name}')
+
+        if options['detach_before']:
+            try:
+                before = date.fromisoformat(f"{options['detach_before']}-01")
+            except ValueError as exc:
+                raise CommandError(f'Mois invalide: {exc}')
+            for name in detach_partitions(before, drop=options['drop']):
+                action = 'supprimée' if options['drop'] else 'détachée'
+                self.stdout.write(f'Partition {action} : {name}')
+
+        partitions = list_partitions()
+        self.stdout.write(self.style.SUCCESS(f'{len(partitions)} partition(s) attachée(s)'))
@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from emotion_tracker.alerting import rebuild_alert_states
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les états du moteur d\'alertes (séries négatives, humeur des équipes et services) depuis l\'historique'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Date de référence (AAAA-MM-JJ, aujourd\'hui par défaut)')
+
+    def handle(self, *args, **options):
+        try:
+            reference_date = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError as exc:
+            raise CommandError(f'Date invalide: {exc}')
+
+        self.stdout.write('Reconstruction des états d\'alerte...')
+        counts = rebuild_alert_states(reference_date)
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['collaborators']} collaborateur(s), {counts['groups']} équipe(s)/service(s)"
+        ))
@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from emotion_tracker.models import EmotionDailyAggregate
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit le cube journalier des émotions (EmotionDailyAggregate) à partir de l\'historique'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Date de début incluse (AAAA-MM-JJ)')
+        parser.add_argument('--end', help='Date de fin incluse (AAAA-MM-JJ)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start']) if options['start'] else None
+            end_date = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as exc:
+            raise CommandError(f'Date invalide: {exc}')
+
+        self.stdout.write('Reconstruction du cube journalier des émotions...')
+        count = EmotionDailyAggregate.objects.rebuild(start_date=start_date, end_date=end_date)
+        self.stdout.write(self.style.SUCCESS(f'{count} cellule(s) créée(s)'))
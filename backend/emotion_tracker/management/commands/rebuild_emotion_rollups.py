@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from emotion_tracker.models import Collaborator, EmotionRollup
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les agrégats hebdomadaires et mensuels des émotions à partir de l\'historique'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collaborator',
+            action='append',
+            dest='collaborators',
+            help='ID collaborateur à reconstruire (répétable, tous par défaut)'
+        )
+
+    def handle(self, *args, **options):
+        collaborator_ids = None
+        if options['collaborators']:
+            collaborator_ids = list(
+                Collaborator.objects.filter(
+                    collaborator_id__in=options['collaborators']
+                ).values_list('id', flat=True)
+            )
+
+        self.stdout.write('Reconstruction des agrégats d\'émotions...')
+        count = EmotionRollup.objects.rebuild(collaborator_ids=collaborator_ids)
+        self.stdout.write(self.style.SUCCESS(f'{count} agrégat(s) reconstruit(s)'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from emotion_tracker.authentication import invalidate_all
+from emotion_tracker.models import Collaborator
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les champs d\'humeur des collaborateurs (jour, semaine, mois) depuis les déclarations et les agrégats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period', action='append', choices=Collaborator.objects.MOOD_PERIODS,
+            help='Période à recalculer (répétable, toutes par défaut)'
+        )
+
+    def handle(self, *args, **options):
+        periods = options['period'] or Collaborator.objects.MOOD_PERIODS
+        self.stdout.write(f"Recalcul des humeurs ({', '.join(periods)})...")
+        updated = Collaborator.objects.refresh_moods(periods=periods)
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f'{updated} collaborateur(s) mis à jour'))
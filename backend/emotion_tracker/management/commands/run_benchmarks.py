@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from emotion_tracker.benchmarks import BENCHMARKS, run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Exécute les scénarios de benchmark (les écritures sont annulées)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help='Scénarios à exécuter (tous par défaut)')
+        parser.add_argument('--list', action='store_true', help='Liste les scénarios disponibles')
+        parser.add_argument(
+            '--sizes',
+            help='Tailles à mesurer, séparées par des virgules (ex: 0,1000,10000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name, func in sorted(BENCHMARKS.items()):
+                self.stdout.write(f'{name}: {func.__doc__}')
+            return
+
+        names = options['scenarios'] or sorted(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Scénario(s) inconnu(s): {', '.join(unknown)}")
+
+        scenario_options = {}
+        if options['sizes']:
+            scenario_options['sizes'] = [int(size) for size in options['sizes'].split(',')]
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {name}'))
+            self._write_table(run_benchmark(name, **scenario_options))
+
+    def _write_table(self, rows):
+        if not rows:
+            self.stdout.write('(aucun résultat)')
+            return
+
+        columns = list(rows[0].keys())
+        widths = {
+            column: max(len(column), *(len(str(row.get(column, ''))) for row in rows))
+            for column in columns
+        }
+        self.stdout.write('  '.join(column.ljust(widths[column]) for column in columns))
+        for row in rows:
+            self.stdout.write('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
@@ -0,0 +1,235 @@
+"""
+Métriques des requêtes HTTP au format Prometheus (prometheus_client).
+
+Le middleware RequestMetricsMiddleware mesure chaque requête et l'étiquette par
+route DRF et action (nom d'URL du routeur, ex. emotion-stats, dashboard-data) :
+nombre de requêtes, latence, nombre et durée des requêtes SQL (via un
+execute_wrapper, indépendant de DEBUG), accès au cache (hits/misses relevés par
+InstrumentedRedisCache) et taille de la réponse. Il fonctionne sous WSGI comme
+sous ASGI : l'execute_wrapper est posé sur chaque connexion et rattache la requête
+SQL à la requête HTTP du contexte courant, quel que soit le thread qui l'exécute.
+
+Sous gunicorn, chaque worker est un processus distinct : avec la variable
+PROMETHEUS_MULTIPROC_DIR, les valeurs sont écrites dans des fichiers partagés
+et agrégées à la lecture de /metrics (voir gunicorn.conf.py).
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+UNMATCHED_ROUTE = 'unmatched'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUESTS = Counter(
+    'emotion_tracker_http_requests_total', 'Requêtes HTTP traitées',
+    ['route', 'method', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'emotion_tracker_http_request_duration_seconds', 'Durée de traitement des requêtes HTTP',
+    ['route', 'method'], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'emotion_tracker_http_db_queries', 'Requêtes SQL exécutées par requête HTTP',
+    ['route', 'method'], buckets=QUERY_COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    'emotion_tracker_http_db_duration_seconds', 'Temps SQL cumulé par requête HTTP',
+    ['route', 'method'], buckets=LATENCY_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    'emotion_tracker_http_cache_lookups_total', 'Lectures du cache pendant les requêtes HTTP',
+    ['route', 'result']
+)
+RESPONSE_SIZE = Histogram(
+    'emotion_tracker_http_response_size_bytes', 'Taille du corps des réponses HTTP',
+    ['route', 'method'], buckets=SIZE_BUCKETS
+)
+
+# Mesures de la requête en cours (None hors requête : tâches Celery, commandes)
+_current = ContextVar('emotion_tracker_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Compteurs d'une requête HTTP"""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Sections du dashboard asynchrone : requêtes exécutées depuis plusieurs threads
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper : chronomètre chaque requête SQL
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.query_time += elapsed
+                self.queries += 1
+
+
+def record_cache_lookups(hits, misses):
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics.lock:
+            metrics.cache_hits += hits
+            metrics.cache_misses += misses
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    execute_wrapper permanent des connexions : compte la requête SQL dans les métriques
+    de la requête HTTP en cours. Le contexte est propagé aux threads de sync_to_async
+    (vues synchrones sous ASGI, sections du dashboard asynchrone), pas les connexions.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='emotion_tracker_metrics_query_recorder')
+
+
+class InstrumentedRedisCache(RedisCache):
+    """Cache Redis qui compte les hits et misses de la requête HTTP en cours"""
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = super().get(key, missing, version)
+        if value is missing:
+            record_cache_lookups(0, 1)
+            return default
+        record_cache_lookups(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        record_cache_lookups(len(values), len(keys) - len(values))
+        return values
+
+
+def route_label(request):
+    """Nom de la route résolue (basename-action des routeurs DRF), borné aux routes connues"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNMATCHED_ROUTE
+    return match.url_name
+
+
+class RequestMetricsMiddleware:
+    """Mesure chaque requête et alimente les métriques Prometheus (WSGI et ASGI)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connexions ouvertes avant le chargement du middleware (les suivantes : connection_created)
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, metrics, start)
+
+    def _record(self, request, response, metrics, start):
+        route = route_label(request)
+        if route == 'metrics':
+            return response
+
+        method = request.method
+        elapsed = time.perf_counter() - start
+        REQUESTS.labels(route, method, str(response.status_code)).inc()
+        REQUEST_LATENCY.labels(route, method).observe(elapsed)
+        DB_QUERIES.labels(route, method).observe(metrics.queries)
+        DB_DURATION.labels(route, method).observe(metrics.query_time)
+        if metrics.cache_hits:
+            CACHE_LOOKUPS.labels(route, 'hit').inc(metrics.cache_hits)
+        if metrics.cache_misses:
+            CACHE_LOOKUPS.labels(route, 'miss').inc(metrics.cache_misses)
+
+        if response.streaming:
+            # Taille connue une fois le flux entièrement envoyé
+            count_stream = self._acount_stream if response.is_async else self._count_stream
+            response.streaming_content = count_stream(response.streaming_content, route, method)
+        else:
+            RESPONSE_SIZE.labels(route, method).observe(len(response.content))
+        return response
+
+    def _count_stream(self, chunks, route, method):
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            RESPONSE_SIZE.labels(route, method).observe(size)
+
+    async def _acount_stream(self, chunks, route, method):
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            RESPONSE_SIZE.labels(route, method).observe(size)
+
+
+def render_metrics():
+    """Métriques au format texte Prometheus : (contenu, type de contenu)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Agrégation des fichiers écrits par tous les workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
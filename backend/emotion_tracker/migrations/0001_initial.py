@@ -0,0 +1,386 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:42
+
+from django.conf import settings
+import django.core.serializers.json
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+import django.utils.timezone
+import emotion_tracker.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Collaborator',
+            fields=[
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('collaborator_id', models.CharField(max_length=50, unique=True, verbose_name='ID Collaborateur')),
+                ('first_name', models.CharField(max_length=150, verbose_name='Prénom')),
+                ('last_name', models.CharField(max_length=150, verbose_name='Nom')),
+                ('email', models.EmailField(max_length=254, unique=True, verbose_name='Adresse email')),
+                ('role', models.CharField(choices=[('employee', 'Employé'), ('manager', 'Manager'), ('director', 'Directeur'), ('pole_director', 'Directeur de Pôle'), ('admin', 'Administrateur')], default='employee', max_length=20, verbose_name='Rôle')),
+                ('emotion_today_morning', models.CharField(blank=True, max_length=50, null=True)),
+                ('emotion_today_evening', models.CharField(blank=True, max_length=50, null=True)),
+                ('emotion_this_week', models.CharField(blank=True, max_length=50, null=True)),
+                ('emotion_this_month', models.CharField(blank=True, max_length=50, null=True)),
+                ('emotion_degree_this_week', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+                ('emotion_degree_this_month', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('username', models.CharField(blank=True, max_length=150, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Collaborateur',
+                'verbose_name_plural': 'Collaborateurs',
+                'ordering': ['last_name', 'first_name'],
+            },
+            managers=[
+                ('objects', emotion_tracker.models.CollaboratorManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('alert_type', models.CharField(choices=[('consecutive_negative', 'Émotions négatives consécutives'), ('low_team_morale', "Moral d'équipe faible"), ('low_participation', 'Faible participation'), ('negative_emotions', 'Tendance émotionnelle négative')], max_length=50, verbose_name="Type d'alerte")),
+                ('severity', models.CharField(choices=[('low', 'Faible'), ('medium', 'Moyenne'), ('high', 'Élevée'), ('critical', 'Critique')], default='medium', max_length=20, verbose_name='Sévérité')),
+                ('title', models.CharField(max_length=255, verbose_name='Titre')),
+                ('message', models.TextField(verbose_name='Message')),
+                ('is_resolved', models.BooleanField(default=False, verbose_name='Résolue')),
+                ('resolved_at', models.DateTimeField(blank=True, null=True, verbose_name='Résolue le')),
+                ('resolution_notes', models.TextField(blank=True, verbose_name='Notes de résolution')),
+                ('trigger_data', models.JSONField(blank=True, default=dict, verbose_name='Données du déclencheur')),
+                ('notification_sent', models.BooleanField(default=False, verbose_name='Notification envoyée')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('collaborator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to=settings.AUTH_USER_MODEL)),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resolved_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Alerte',
+                'verbose_name_plural': 'Alertes',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Cluster',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name='Nom du cluster')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Cluster',
+                'verbose_name_plural': 'Clusters',
+                'ordering': ['name'],
+            },
+            bases=(models.Model, emotion_tracker.models.EmotionTrendMixin),
+        ),
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name="Nom de l'entreprise")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Entreprise',
+                'verbose_name_plural': 'Entreprises',
+                'ordering': ['name'],
+            },
+            bases=(models.Model, emotion_tracker.models.EmotionTrendMixin),
+        ),
+        migrations.CreateModel(
+            name='EmotionType',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name="Nom de l'émotion")),
+                ('emotion', models.CharField(max_length=50, verbose_name='Code émotion')),
+                ('degree', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)], verbose_name='Degré')),
+                ('emotions', models.TextField(blank=True, verbose_name='Description')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': "Type d'émotion",
+                'verbose_name_plural': "Types d'émotions",
+                'ordering': ['degree', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Service',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('service_name', models.CharField(max_length=255, verbose_name='Nom du service')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cluster', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='services', to='emotion_tracker.cluster')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='services', to='emotion_tracker.company')),
+            ],
+            options={
+                'verbose_name': 'Service',
+                'verbose_name_plural': 'Services',
+                'ordering': ['service_name'],
+            },
+            bases=(models.Model, emotion_tracker.models.EmotionTrendMixin),
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('team_name', models.CharField(max_length=255, verbose_name="Nom de l'équipe")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='emotion_tracker.company')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='emotion_tracker.service')),
+            ],
+            options={
+                'verbose_name': 'Équipe',
+                'verbose_name_plural': 'Équipes',
+                'ordering': ['team_name'],
+            },
+            bases=(models.Model, emotion_tracker.models.EmotionTrendMixin),
+        ),
+        migrations.CreateModel(
+            name='GroupAlertState',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mood_window', models.JSONField(blank=True, default=list, verbose_name='Humeur par jour')),
+                ('current_date', models.DateField(blank=True, null=True, verbose_name='Jour en cours')),
+                ('participant_count', models.IntegerField(default=0, verbose_name='Participants du jour')),
+                ('member_count', models.IntegerField(default=0, verbose_name='Membres actifs')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mood_alert', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='emotion_tracker.alert')),
+                ('participation_alert', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='emotion_tracker.alert')),
+                ('service', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_state', to='emotion_tracker.service')),
+                ('team', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_state', to='emotion_tracker.team')),
+            ],
+            options={
+                'verbose_name': "État d'alerte d'une équipe ou d'un service",
+                'verbose_name_plural': "États d'alerte des équipes et services",
+            },
+        ),
+        migrations.CreateModel(
+            name='Emotion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('emotion_id', models.CharField(max_length=100, unique=True, verbose_name='ID Émotion')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('period', models.CharField(choices=[('morning', 'Matin'), ('evening', 'Soir')], max_length=10, verbose_name='Période')),
+                ('week_number', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(53)], verbose_name='Numéro de semaine')),
+                ('month', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)], verbose_name='Mois')),
+                ('year', models.IntegerField(verbose_name='Année')),
+                ('team', models.CharField(blank=True, max_length=255, verbose_name='Équipe')),
+                ('company', models.CharField(blank=True, max_length=255, verbose_name='Entreprise')),
+                ('cluster', models.CharField(blank=True, max_length=255, verbose_name='Cluster')),
+                ('full_name', models.CharField(blank=True, max_length=300, verbose_name='Nom complet')),
+                ('weekly_emotion_summary', models.TextField(blank=True, verbose_name='Résumé émotionnel hebdomadaire')),
+                ('monthly_emotion_insights', models.TextField(blank=True, verbose_name='Insights émotionnels mensuels')),
+                ('emotion_degree', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)], verbose_name="Degré d'émotion")),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('half_day', models.BooleanField(default=False, verbose_name='Demi-journée')),
+                ('date_period', models.CharField(blank=True, max_length=20, verbose_name='Période de date')),
+                ('emotion_illustration', models.TextField(blank=True, verbose_name='Illustration émotion')),
+                ('comment', models.TextField(blank=True, null=True, verbose_name='Commentaire')),
+                ('collaborator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emotions', to=settings.AUTH_USER_MODEL)),
+                ('declared_cluster', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='emotion_tracker.cluster')),
+                ('declared_company', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='emotion_tracker.company')),
+                ('declared_service', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='emotion_tracker.service')),
+                ('declared_team', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='emotion_tracker.team')),
+                ('emotion_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emotion_entries', to='emotion_tracker.emotiontype')),
+            ],
+            options={
+                'verbose_name': "Déclaration d'émotion",
+                'verbose_name_plural': "Déclarations d'émotions",
+                'ordering': ['-date', '-creation_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CollaboratorAlertState',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('negative_streak', models.IntegerField(default=0, verbose_name='Déclarations négatives consécutives')),
+                ('last_date', models.DateField(blank=True, null=True, verbose_name='Date de la dernière déclaration')),
+                ('last_period', models.CharField(blank=True, choices=[('morning', 'Matin'), ('evening', 'Soir')], max_length=10, verbose_name='Période de la dernière déclaration')),
+                ('last_degree', models.IntegerField(blank=True, null=True, verbose_name='Degré de la dernière déclaration')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('collaborator', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='alert_state', to=settings.AUTH_USER_MODEL)),
+                ('streak_alert', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='emotion_tracker.alert')),
+            ],
+            options={
+                'verbose_name': "État d'alerte d'un collaborateur",
+                'verbose_name_plural': "États d'alerte des collaborateurs",
+            },
+        ),
+        migrations.AddField(
+            model_name='cluster',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clusters', to='emotion_tracker.company'),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='service',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='emotion_tracker.service'),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='emotion_tracker.team'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='collaborators', to='emotion_tracker.cluster'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collaborators', to='emotion_tracker.company'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='groups',
+            field=models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='manager',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='managed_collaborators', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='service',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='collaborators', to='emotion_tracker.service'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='collaborators', to='emotion_tracker.team'),
+        ),
+        migrations.AddField(
+            model_name='collaborator',
+            name='user_permissions',
+            field=models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions'),
+        ),
+        migrations.CreateModel(
+            name='EmotionTrend',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('weekly_emotion_trend', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Tendance (hebdomadaire/trimestrielle)')),
+                ('monthly_emotion_summary', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Résumé mensuel')),
+                ('period_type', models.CharField(choices=[('weekly', 'Hebdomadaire'), ('monthly', 'Mensuelle'), ('quarterly', 'Trimestrielle')], max_length=20, verbose_name='Type de période')),
+                ('start_date', models.DateField(verbose_name='Début de période')),
+                ('end_date', models.DateField(verbose_name='Fin de période')),
+                ('average_emotion_score', models.FloatField(default=0, verbose_name='Score émotionnel moyen')),
+                ('dominant_emotion', models.CharField(blank=True, max_length=50, verbose_name='Émotion dominante')),
+                ('participation_rate', models.FloatField(default=0, verbose_name='Taux de participation')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cluster', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emotion_trends', to='emotion_tracker.cluster')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emotion_trends', to='emotion_tracker.company')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emotion_trends', to='emotion_tracker.service')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='emotion_trends', to='emotion_tracker.team')),
+            ],
+            options={
+                'verbose_name': 'Tendance émotionnelle',
+                'verbose_name_plural': 'Tendances émotionnelles',
+                'ordering': ['-start_date'],
+                'indexes': [models.Index(fields=['period_type', '-start_date'], name='emotion_tra_period__03745b_idx'), models.Index(fields=['team', 'period_type', '-start_date'], name='emotion_tra_team_id_d1f4cf_idx'), models.Index(fields=['service', 'period_type', '-start_date'], name='emotion_tra_service_f98a1c_idx'), models.Index(fields=['cluster', 'period_type', '-start_date'], name='emotion_tra_cluster_26b92f_idx'), models.Index(fields=['company', 'period_type', '-start_date'], name='emotion_tra_company_583b4c_idx')],
+                'unique_together': {('team', 'service', 'cluster', 'company', 'period_type', 'start_date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EmotionRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period_type', models.CharField(choices=[('weekly', 'Hebdomadaire'), ('monthly', 'Mensuel')], max_length=10, verbose_name='Type de période')),
+                ('period_start', models.DateField(verbose_name='Début de période')),
+                ('total_emotions', models.PositiveIntegerField(default=0)),
+                ('degree_sum', models.IntegerField(default=0)),
+                ('emotion_type_breakdown', models.JSONField(blank=True, default=dict)),
+                ('progression', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('collaborator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emotion_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Agrégat d'émotions",
+                'verbose_name_plural': "Agrégats d'émotions",
+                'unique_together': {('collaborator', 'period_type', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EmotionDailyAggregate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(verbose_name='Date')),
+                ('period', models.CharField(choices=[('morning', 'Matin'), ('evening', 'Soir')], max_length=10, verbose_name='Période')),
+                ('half_day', models.BooleanField(default=False, verbose_name='Demi-journée')),
+                ('emotion_type', models.CharField(max_length=50, verbose_name='Code émotion')),
+                ('emotion_count', models.IntegerField(default=0, verbose_name='Nombre de déclarations')),
+                ('degree_sum', models.IntegerField(default=0, verbose_name='Somme des degrés')),
+                ('participant_count', models.IntegerField(default=0, verbose_name='Participants distincts')),
+                ('cluster', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_aggregates', to='emotion_tracker.cluster')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_aggregates', to='emotion_tracker.company')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_aggregates', to='emotion_tracker.service')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_aggregates', to='emotion_tracker.team')),
+            ],
+            options={
+                'verbose_name': "Agrégat journalier d'émotions",
+                'verbose_name_plural': "Agrégats journaliers d'émotions",
+                'indexes': [models.Index(fields=['company', 'date'], name='emotion_tra_company_1c1d1a_idx'), models.Index(fields=['cluster', 'date'], name='emotion_tra_cluster_529d12_idx'), models.Index(fields=['service', 'date'], name='emotion_tra_service_da52a8_idx'), models.Index(fields=['team', 'date'], name='emotion_tra_team_id_5c46c1_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='emotiondailyaggregate',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('team', models.Value(uuid.UUID('00000000-0000-0000-0000-000000000000'))), django.db.models.functions.comparison.Coalesce('service', models.Value(uuid.UUID('00000000-0000-0000-0000-000000000000'))), django.db.models.functions.comparison.Coalesce('cluster', models.Value(uuid.UUID('00000000-0000-0000-0000-000000000000'))), models.F('company'), models.F('date'), models.F('period'), models.F('half_day'), models.F('emotion_type'), name='emotion_daily_aggregate_cell'),
+        ),
+        migrations.AddIndex(
+            model_name='emotion',
+            index=models.Index(fields=['date', 'period'], name='emotion_tra_date_046466_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotion',
+            index=models.Index(fields=['collaborator', 'date'], name='emotion_tra_collabo_257991_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotion',
+            index=models.Index(fields=['-date', '-creation_date', '-id'], name='emotion_tra_date_f794f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotion',
+            index=models.Index(fields=['week_number', 'year'], name='emotion_tra_week_nu_721154_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotion',
+            index=models.Index(fields=['month', 'year'], name='emotion_tra_month_e1b8fb_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='emotion',
+            unique_together={('collaborator', 'date', 'period')},
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['-created_at', '-id'], name='emotion_tra_created_ea2803_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['is_resolved', '-created_at'], name='emotion_tra_is_reso_a841de_idx'),
+        ),
+    ]
@@ -1,217 +1,233 @@
-from django.db import models
-from django.db.models import Avg, Count, Sum
-from django.db.models.functions import ExtractWeek
-from django.contrib.auth.models import AbstractUser
+from django.db import models, transaction
+from django.db.models import Avg, Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from datetime import datetime
+import json
 import uuid
 
+from .analytics import AggregateSource, EmotionSource, build_daily_stats, get_bucket_start
+
+
+def get_date_period(date, today):
+    """Libellé de la période d'une déclaration relativement à aujourd'hui"""
+    if date == today:
+        return "Ce jour"
+    if date.isocalendar()[1] == today.isocalendar()[1] and date.year == today.year:
+        return "cette semaine"
+    if date.month == today.month and date.year == today.year:
+        return "ce mois"
+    return "cette année"
+
+
+# Libellé d'humeur selon la somme des degrés d'émotion : (degré maximal, libellé)
+MOOD_LABELS = [
+    (-5, "Angry"),
+    (-2, "Anxious"),
+    (-1, "Sad"),
+    (0, "Neutral"),
+    (5, "Happy"),
+]
+MOOD_LABEL_ABOVE = "Excited"
+
+
+def get_mood_label(emotion_degree):
+    """Libellé d'humeur (emotion_this_week, emotion_this_month) d'une somme de degrés"""
+    if emotion_degree is None:
+        return None
+    for maximum, label in MOOD_LABELS:
+        if emotion_degree <= maximum:
+            return label
+    return MOOD_LABEL_ABOVE
+
+
+def mood_label_expression(degree_field):
+    """Équivalent SQL de get_mood_label, pour les mises à jour ensemblistes"""
+    return Case(
+        *[When(**{f'{degree_field}__lte': maximum}, then=Value(label)) for maximum, label in MOOD_LABELS],
+        When(**{f'{degree_field}__isnull': False}, then=Value(MOOD_LABEL_ABOVE)),
+        default=None,
+        output_field=models.CharField()
+    )
+
+
 class EmotionTrendMixin:
     """Mixin pour calculer les tendances émotionnelles"""
 
-    def _calculate_base_emotion_stats(self, daily_emotions):
+    def _calculate_base_emotion_stats(self, source):
         """
-        Calcule les statistiques de base pour un QuerySet d'émotions
+        Calcule les statistiques de base d'une journée à partir d'une source
+        (déclarations ou cube pré-agrégé), taux de participation de l'entité compris
         """
-        stats = {
-            'total_emotions': daily_emotions.count(),
-            'morning_emotions': daily_emotions.filter(half_day=False).count(),
-            'evening_emotions': daily_emotions.filter(half_day=True).count(),
-            'participation_rate': 0,
-            'emotion_distribution': {},
-            'average_emotion_degree': 0,
-            'emotion_trends': {
-                'morning': {},
-                'evening': {}
-            }
-        }
+        stats = build_daily_stats(source.half_day_rows())
+        stats['participation_rate'] = self._calculate_participation_rate(source.count_participants())
+        return stats
 
-        # Distribution des émotions
-        emotion_counts = daily_emotions.values('emotion_type__emotion_type').annotate(
-            count=Count('emotion_type__emotion_type')
+    def _calculate_participation_rate(self, participants):
+        """Taux de participation parmi les collaborateurs actifs de l'entité"""
+        total_collaborators = self.collaborators.filter(is_active=True).count()
+        if total_collaborators > 0:
+            return (participants / total_collaborators) * 100
+        return 0
+
+    def _get_scoped_emotions(self):
+        """Émotions des collaborateurs rattachés à l'entité"""
+        return Emotion.objects.filter(**{self.emotion_scope_lookup: self})
+
+    def _get_declared_emotions(self):
+        """
+        Émotions comptées dans les cellules du cube de l'entité : rattachement enregistré
+        sur la déclaration, à défaut rattachement actuel du collaborateur
+        """
+        return Emotion.objects.filter(
+            Q(**{f'declared_{self.aggregate_scope_field}': self})
+            | Q(declared_company__isnull=True, **{self.emotion_scope_lookup: self})
         )
-        for emotion in emotion_counts:
-            stats['emotion_distribution'][emotion['emotion_type__emotion_type']] = emotion['count']
-
-        # Moyenne des degrés d'émotion
-        avg_degree = daily_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg']
-        stats['average_emotion_degree'] = round(avg_degree if avg_degree else 0, 2)
-
-        # Tendances par période (matin/soir)
-        for period, half_day in [('morning', False), ('evening', True)]:
-            period_emotions = daily_emotions.filter(half_day=half_day)
-            emotion_trend = period_emotions.values('emotion_type__emotion_type').annotate(
-                count=Count('emotion_type__emotion_type')
-            )
-            
-            for emotion in emotion_trend:
-                stats['emotion_trends'][period][emotion['emotion_type__emotion_type']] = emotion['count']
-        
-        return stats
 
-    def _get_week_date_range(self):
-        """Retourne le début et la fin de la semaine en cours"""
-        today = timezone.now().date()
+    def _get_emotion_source(self, start_date, end_date, use_aggregates=None):
+        """
+        Retourne la source des statistiques de l'entité sur la plage de dates :
+        les déclarations brutes, ou le cube journalier pré-agrégé si use_aggregates
+        (par défaut : réglage EMOTION_TRENDS_USE_AGGREGATES)
+        """
+        emotions = self._get_scoped_emotions().filter(date__range=[start_date, end_date])
+        if use_aggregates is None:
+            use_aggregates = getattr(settings, 'EMOTION_TRENDS_USE_AGGREGATES', False)
+        if not use_aggregates:
+            return EmotionSource(emotions, start_date, end_date)
+
+        return AggregateSource(
+            EmotionDailyAggregate.objects.filter(
+                **{self.aggregate_scope_field: self},
+                date__range=[start_date, end_date]
+            ),
+            self._get_declared_emotions().filter(date__range=[start_date, end_date]),
+            emotions,
+            start_date,
+            end_date
+        )
+
+    def _get_week_date_range(self, reference_date=None):
+        """Retourne le début et la fin de la semaine en cours (ou de celle de reference_date)"""
+        today = reference_date or timezone.now().date()
         start_of_week = today - timezone.timedelta(days=today.weekday())
         end_of_week = start_of_week + timezone.timedelta(days=6)
         return start_of_week, end_of_week
 
-    def _calculate_weekly_base_stats(self, weekly_emotions):
+    def _calculate_weekly_base_stats(self, source):
         """
-        Calcule les statistiques de base pour la semaine
+        Calcule les statistiques de base pour la semaine à partir d'une série
+        temporelle dense (une requête groupée sur (date, type d'émotion))
         """
+        series = source.time_series()
+
         stats = {
-            'total_emotions': weekly_emotions.count(),
+            'total_emotions': series.total,
             'daily_breakdown': {},
-            'emotion_distribution': {},
-            'average_emotion_degree': 0,
-            'participation_rate': 0,
+            'emotion_distribution': series.distribution,
+            'average_emotion_degree': series.average_degree,
+            'participation_rate': self._calculate_participation_rate(source.count_participants()),
             'daily_trends': {},
-            'emotion_evolution': []
+            'emotion_evolution': [
+                {'date': point['date'], 'average_degree': point['average_degree']}
+                for point in series.evolution('day')
+            ]
         }
         
-        # Distribution par jour
-        start_of_week, end_of_week = self._get_week_date_range()
-        current_date = start_of_week
-        
-        while current_date <= end_of_week:
-            day_emotions = weekly_emotions.filter(date=current_date)
-            
-            stats['daily_breakdown'][current_date.strftime('%Y-%m-%d')] = {
-                'count': day_emotions.count(),
-                'average_degree': day_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg'] or 0
-            }
-            
-            # Tendances par jour
-            day_emotion_counts = day_emotions.values('emotion_type__emotion_type').annotate(
-                count=Count('emotion_type__emotion_type')
-            )
-            
-            stats['daily_trends'][current_date.strftime('%Y-%m-%d')] = {
-                emotion['emotion_type__emotion_type']: emotion['count']
-                for emotion in day_emotion_counts
+        # Distribution et tendances par jour (tous les jours de la semaine, même vides)
+        for point in series.points('day'):
+            day = point['start'].strftime('%Y-%m-%d')
+            stats['daily_breakdown'][day] = {
+                'count': point['count'],
+                'average_degree': series.average(point) or 0
             }
-            
-            current_date += timezone.timedelta(days=1)
-        
-        # Distribution globale des émotions
-        emotion_counts = weekly_emotions.values('emotion_type__emotion_type').annotate(
-            count=Count('emotion_type__emotion_type')
-        )
-        stats['emotion_distribution'] = {
-            emotion['emotion_type__emotion_type']: emotion['count']
-            for emotion in emotion_counts
-        }
-        
-        # Moyenne globale
-        avg_degree = weekly_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg']
-        stats['average_emotion_degree'] = round(avg_degree if avg_degree else 0, 2)
-        
-        # Évolution des émotions
-        daily_averages = weekly_emotions.values('date').annotate(
-            avg_degree=Avg('emotion_degree')
-        ).order_by('date')
-        
-        stats['emotion_evolution'] = [
-            {
-                'date': entry['date'].strftime('%Y-%m-%d'),
-                'average_degree': round(entry['avg_degree'] if entry['avg_degree'] else 0, 2)
-            }
-            for entry in daily_averages
-        ]
+            stats['daily_trends'][day] = dict(point['distribution'])
         
         return stats
 
-    def _get_month_date_range(self):
-        """Retourne le début et la fin du mois en cours"""
-        today = timezone.now().date()
+    def _get_month_date_range(self, reference_date=None):
+        """Retourne le début et la fin du mois en cours (ou de celui de reference_date)"""
+        today = reference_date or timezone.now().date()
         start_of_month = today.replace(day=1)
         next_month = start_of_month + timezone.timedelta(days=32)
         end_of_month = next_month.replace(day=1) - timezone.timedelta(days=1)
         return start_of_month, end_of_month
 
-    def _calculate_monthly_base_stats(self, monthly_emotions):
+    def _calculate_monthly_base_stats(self, source):
         """
-        Calcule les statistiques de base pour le mois
+        Calcule les statistiques de base pour le mois à partir d'une série
+        temporelle dense (une requête groupée sur (date, type d'émotion))
         """
+        series = source.time_series()
+
         stats = {
-            'total_emotions': monthly_emotions.count(),
+            'total_emotions': series.total,
             'weekly_breakdown': {},
-            'emotion_distribution': {},
-            'average_emotion_degree': 0,
-            'participation_rate': 0,
+            'emotion_distribution': series.distribution,
+            'average_emotion_degree': series.average_degree,
+            'participation_rate': self._calculate_participation_rate(source.count_participants()),
             'weekly_trends': {},
-            'emotion_evolution': [],
-            'peak_days': {
-                'highest': None,
-                'lowest': None
-            }
-        }
-        
-        # Distribution par semaine
-        weekly_stats = monthly_emotions.annotate(
-            week=ExtractWeek('date')
-        ).values('week').annotate(
-            count=Count('id'),
-            avg_degree=Avg('emotion_degree')
-        ).order_by('week')
-        
-        for week_stat in weekly_stats:
-            stats['weekly_breakdown'][f"Week-{week_stat['week']}"] = {
-                'count': week_stat['count'],
-                'average_degree': round(week_stat['avg_degree'] if week_stat['avg_degree'] else 0, 2)
-            }
-        
-        # Distribution globale des émotions
-        emotion_counts = monthly_emotions.values('emotion_type__emotion_type').annotate(
-            count=Count('emotion_type__emotion_type')
-        )
-        stats['emotion_distribution'] = {
-            emotion['emotion_type__emotion_type']: emotion['count']
-            for emotion in emotion_counts
+            'emotion_evolution': series.evolution('day'),
+            'peak_days': series.peaks('day')
         }
         
-        # Moyenne globale
-        avg_degree = monthly_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg']
-        stats['average_emotion_degree'] = round(avg_degree if avg_degree else 0, 2)
-        
-        # Évolution quotidienne des émotions
-        daily_stats = monthly_emotions.values('date').annotate(
-            count=Count('id'),
-            avg_degree=Avg('emotion_degree')
-        ).order_by('date')
-        
-        stats['emotion_evolution'] = [
-            {
-                'date': entry['date'].strftime('%Y-%m-%d'),
-                'count': entry['count'],
-                'average_degree': round(entry['avg_degree'] if entry['avg_degree'] else 0, 2)
-            }
-            for entry in daily_stats
-        ]
-        
-        # Identifier les pics
-        if daily_stats:
-            highest = max(daily_stats, key=lambda x: x['avg_degree'] or 0)
-            lowest = min(daily_stats, key=lambda x: x['avg_degree'] or 0)
-            
-            stats['peak_days'] = {
-                'highest': {
-                    'date': highest['date'].strftime('%Y-%m-%d'),
-                    'degree': round(highest['avg_degree'] if highest['avg_degree'] else 0, 2)
-                },
-                'lowest': {
-                    'date': lowest['date'].strftime('%Y-%m-%d'),
-                    'degree': round(lowest['avg_degree'] if lowest['avg_degree'] else 0, 2)
-                }
+        # Distribution par semaine ISO
+        for point in series.points('week'):
+            if not point['count']:
+                continue
+            week = f"Week-{point['start'].isocalendar()[1]}"
+            stats['weekly_breakdown'][week] = {
+                'count': point['count'],
+                'average_degree': round(series.average(point), 2)
             }
+            stats['weekly_trends'][week] = dict(point['distribution'])
         
         return stats
 
+    def _get_quarter_date_range(self, reference_date=None):
+        """Retourne le début et la fin du trimestre en cours (ou de celui de reference_date)"""
+        today = reference_date or timezone.now().date()
+        start_of_quarter = get_bucket_start(today, 'quarter')
+        end_of_quarter = get_bucket_start(start_of_quarter + timezone.timedelta(days=93), 'quarter') - timezone.timedelta(days=1)
+        return start_of_quarter, end_of_quarter
+
+    def calculate_quarterly_emotion_trend(self, reference_date=None, use_aggregates=None):
+        """
+        Calcule les tendances émotionnelles trimestrielles de l'entité,
+        avec le même nombre de requêtes qu'une tendance journalière
+        """
+        start_of_quarter, end_of_quarter = self._get_quarter_date_range(reference_date)
+        source = self._get_emotion_source(start_of_quarter, end_of_quarter, use_aggregates)
+        series = source.time_series()
+
+        return {
+            'total_emotions': series.total,
+            'monthly_breakdown': {
+                point['start'].strftime('%Y-%m'): {
+                    'count': point['count'],
+                    'average_degree': round(series.average(point) or 0, 2),
+                    'emotion_distribution': dict(point['distribution'])
+                }
+                for point in series.points('month')
+            },
+            'weekly_evolution': series.evolution('week'),
+            'emotion_distribution': series.distribution,
+            'average_emotion_degree': series.average_degree,
+            'participation_rate': self._calculate_participation_rate(source.count_participants()),
+            'emotion_evolution': series.evolution('day'),
+            'peak_days': series.peaks('day')
+        }
+
 
 class Company(models.Model, EmotionTrendMixin):
     """Modèle pour les entreprises"""
+    emotion_scope_lookup = 'collaborator__company'
+    aggregate_scope_field = 'company'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, verbose_name="Nom de l'entreprise")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -222,153 +238,69 @@ class Company(models.Model, EmotionTrendMixin):
         verbose_name_plural = "Entreprises"
         ordering = ['name']
 
-    def calculate_daily_emotion_trend(self):
+    def calculate_daily_emotion_trend(self, use_aggregates=None):
         """
         Calcule les tendances émotionnelles des collaborateurs de l'entreprise pour la journée
         """
         today = timezone.now().date()
-        
-        # Récupérer toutes les émotions des collaborateurs de l'entreprise pour aujourd'hui
-        daily_emotions = Emotion.objects.filter(
-            collaborator__company=self,
-            date=today
-        )
 
-        stats = self._calculate_base_emotion_stats(daily_emotions)
+        # Émotions des collaborateurs de l'entreprise pour aujourd'hui (brutes ou pré-agrégées)
+        source = self._get_emotion_source(today, today, use_aggregates)
 
-        # Calculer le taux de participation pour l'entreprise
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            stats['participation_rate'] = (daily_emotions.values('collaborator').distinct().count() / total_collaborators) * 100
+        stats = self._calculate_base_emotion_stats(source)
 
         # Ajouter des statistiques spécifiques à l'entreprise
-        stats['service_breakdown'] = self._calculate_service_breakdown(daily_emotions)
-        stats['cluster_breakdown'] = self._calculate_cluster_breakdown(daily_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
+        stats['cluster_breakdown'] = source.breakdown('cluster')
 
         return stats
 
-    def _calculate_service_breakdown(self, daily_emotions):
-        """Calcule la répartition des émotions par service"""
-        return dict(daily_emotions.values('collaborator__service__service_name')
-                   .annotate(count=Count('id'))
-                   .values_list('collaborator__service__service_name', 'count'))
-
-    def _calculate_cluster_breakdown(self, daily_emotions):
-        """Calcule la répartition des émotions par cluster"""
-        return dict(daily_emotions.values('collaborator__cluster__name')
-                   .annotate(count=Count('id'))
-                   .values_list('collaborator__cluster__name', 'count'))
-
-    def calculate_weekly_emotion_trend(self):
+    def calculate_weekly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles hebdomadaires de l'entreprise
         """
-        start_of_week, end_of_week = self._get_week_date_range()
-        
-        weekly_emotions = Emotion.objects.filter(
-            collaborator__company=self,
-            date__range=[start_of_week, end_of_week]
-        )
+        start_of_week, end_of_week = self._get_week_date_range(reference_date)
+        source = self._get_emotion_source(start_of_week, end_of_week, use_aggregates)
         
-        stats = self._calculate_weekly_base_stats(weekly_emotions)
-        
-        # Calculer le taux de participation hebdomadaire
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = weekly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_weekly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques à l'entreprise
-        stats['service_breakdown'] = self._calculate_weekly_service_breakdown(weekly_emotions)
-        stats['cluster_breakdown'] = self._calculate_weekly_cluster_breakdown(weekly_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
+        stats['cluster_breakdown'] = source.breakdown('cluster')
         
         return stats
 
-    def _calculate_weekly_service_breakdown(self, weekly_emotions):
-        """Répartition hebdomadaire par service"""
-        return dict(
-            weekly_emotions.values('collaborator__service__service_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__service__service_name', 'count')
-        )
-    
-    def _calculate_weekly_cluster_breakdown(self, weekly_emotions):
-        """Répartition hebdomadaire par cluster"""
-        return dict(
-            weekly_emotions.values('collaborator__cluster__name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__cluster__name', 'count')
-        )
-
-    def calculate_monthly_emotion_trend(self):
+    def calculate_monthly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles mensuelles de l'entreprise
         """
-        start_of_month, end_of_month = self._get_month_date_range()
-        
-        monthly_emotions = Emotion.objects.filter(
-            collaborator__company=self,
-            date__range=[start_of_month, end_of_month]
-        )
+        start_of_month, end_of_month = self._get_month_date_range(reference_date)
+        source = self._get_emotion_source(start_of_month, end_of_month, use_aggregates)
         
-        stats = self._calculate_monthly_base_stats(monthly_emotions)
-        
-        # Calculer le taux de participation mensuel
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = monthly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_monthly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques à l'entreprise
-        stats['service_breakdown'] = self._calculate_monthly_service_breakdown(monthly_emotions)
-        stats['cluster_breakdown'] = self._calculate_monthly_cluster_breakdown(monthly_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
+        stats['cluster_breakdown'] = source.breakdown('cluster')
         
         # Ajouter l'analyse des tendances
-        stats['trend_analysis'] = self._analyze_monthly_trends(monthly_emotions)
+        stats['trend_analysis'] = self._analyze_monthly_trends(stats)
         
         return stats
 
-    def _calculate_monthly_service_breakdown(self, monthly_emotions):
-        """Répartition mensuelle par service"""
-        return dict(
-            monthly_emotions.values('collaborator__service__service_name')
-            .annotate(
-                count=Count('id'),
-                avg_degree=Avg('emotion_degree')
-            )
-            .values_list(
-                'collaborator__service__service_name',
-                'count'
-            )
-        )
-
-    def _calculate_monthly_cluster_breakdown(self, monthly_emotions):
-        """Répartition mensuelle par cluster"""
-        return dict(
-            monthly_emotions.values('collaborator__cluster__name')
-            .annotate(
-                count=Count('id'),
-                avg_degree=Avg('emotion_degree')
-            )
-            .values_list(
-                'collaborator__cluster__name',
-                'count'
-            )
-        )
-
-    def _analyze_monthly_trends(self, monthly_emotions):
-        """Analyse des tendances mensuelles"""
+    def _analyze_monthly_trends(self, stats):
+        """Analyse des tendances mensuelles (dérivée des statistiques de base, sans requête)"""
+        distribution = stats['emotion_distribution']
+        dominant = max(distribution, key=distribution.get) if distribution else None
         return {
-            'dominant_emotion': monthly_emotions.values('emotion_type__emotion_type')
-                .annotate(count=Count('id'))
-                .order_by('-count')
-                .first(),
-            'emotion_progression': list(
-                monthly_emotions.values('date')
-                .annotate(avg_degree=Avg('emotion_degree'))
-                .order_by('date')
-                .values('date', 'avg_degree')
-            )
+            'dominant_emotion': {
+                'emotion_type__emotion': dominant,
+                'count': distribution[dominant]
+            } if dominant else None,
+            'emotion_progression': [
+                {'date': entry['date'], 'avg_degree': entry['average_degree']}
+                for entry in stats['emotion_evolution']
+            ]
         }
     
     def __str__(self):
@@ -377,6 +309,9 @@ class Company(models.Model, EmotionTrendMixin):
 
 class Cluster(models.Model, EmotionTrendMixin):
     """Modèle pour les clusters/pôles"""
+    emotion_scope_lookup = 'collaborator__cluster'
+    aggregate_scope_field = 'cluster'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, verbose_name="Nom du cluster")
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='clusters')
@@ -388,110 +323,50 @@ class Cluster(models.Model, EmotionTrendMixin):
         verbose_name_plural = "Clusters"
         ordering = ['name']
 
-    def calculate_daily_emotion_trend(self):
+    def calculate_daily_emotion_trend(self, use_aggregates=None):
         """
         Calcule les tendances émotionnelles des collaborateurs du cluster pour la journée
         """
         today = timezone.now().date()
         
-        # Récupérer toutes les émotions des collaborateurs du cluster pour aujourd'hui
-        daily_emotions = Emotion.objects.filter(
-            collaborator__cluster=self,
-            date=today
-        )
-        
-        stats = self._calculate_base_emotion_stats(daily_emotions)
+        # Émotions des collaborateurs du cluster pour aujourd'hui (brutes ou pré-agrégées)
+        source = self._get_emotion_source(today, today, use_aggregates)
         
-        # Calculer le taux de participation pour le cluster
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            stats['participation_rate'] = (daily_emotions.values('collaborator').distinct().count() / total_collaborators) * 100
+        stats = self._calculate_base_emotion_stats(source)
         
         # Ajouter des statistiques spécifiques au cluster
-        stats['service_breakdown'] = self._calculate_service_breakdown(daily_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
         
         return stats
-    
-    def _calculate_service_breakdown(self, daily_emotions):
-        """Calcule la répartition des émotions par service dans le cluster"""
-        return dict(daily_emotions.values('collaborator__service__service_name')
-                   .annotate(count=Count('id'))
-                   .values_list('collaborator__service__service_name', 'count'))
 
-    def calculate_weekly_emotion_trend(self):
+    def calculate_weekly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles hebdomadaires du cluster
         """
-        start_of_week, end_of_week = self._get_week_date_range()
-        
-        weekly_emotions = Emotion.objects.filter(
-            collaborator__cluster=self,
-            date__range=[start_of_week, end_of_week]
-        )
+        start_of_week, end_of_week = self._get_week_date_range(reference_date)
+        source = self._get_emotion_source(start_of_week, end_of_week, use_aggregates)
         
-        stats = self._calculate_weekly_base_stats(weekly_emotions)
-        
-        # Calculer le taux de participation hebdomadaire
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = weekly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_weekly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques au cluster
-        stats['service_breakdown'] = self._calculate_weekly_service_breakdown(weekly_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
 
         return stats
 
-
-    def _calculate_weekly_service_breakdown(self, weekly_emotions):
-        """Répartition hebdomadaire par service dans le cluster"""
-        return dict(
-            weekly_emotions.values('collaborator__service__service_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__service__service_name', 'count')
-        )
-
-    def calculate_monthly_emotion_trend(self):
+    def calculate_monthly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles mensuelles du cluster
         """
-        start_of_month, end_of_month = self._get_month_date_range()
+        start_of_month, end_of_month = self._get_month_date_range(reference_date)
+        source = self._get_emotion_source(start_of_month, end_of_month, use_aggregates)
         
-        monthly_emotions = Emotion.objects.filter(
-            collaborator__cluster=self,
-            date__range=[start_of_month, end_of_month]
-        )
-        
-        stats = self._calculate_monthly_base_stats(monthly_emotions)
-        
-        # Calculer le taux de participation mensuel
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = monthly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_monthly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques au cluster
-        stats['service_breakdown'] = self._calculate_monthly_service_breakdown(monthly_emotions)
-        stats['team_distribution'] = self._calculate_monthly_team_distribution(monthly_emotions)
+        stats['service_breakdown'] = source.breakdown('service')
+        stats['team_distribution'] = source.breakdown('team')
         
         return stats
-
-    def _calculate_monthly_service_breakdown(self, monthly_emotions):
-        """Répartition mensuelle par service"""
-        return dict(
-            monthly_emotions.values('collaborator__service__service_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__service__service_name', 'count')
-        )
-    
-    def _calculate_monthly_team_distribution(self, monthly_emotions):
-        """Distribution mensuelle par équipe"""
-        return dict(
-            monthly_emotions.values('collaborator__team__team_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__team__team_name', 'count')
-        )
-        
     
     def __str__(self):
         return f"{self.name} - {self.company.name}"
@@ -499,6 +374,9 @@ class Cluster(models.Model, EmotionTrendMixin):
 
 class Service(models.Model, EmotionTrendMixin):
     """Modèle pour les services/départements"""
+    emotion_scope_lookup = 'collaborator__service'
+    aggregate_scope_field = 'service'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     service_name = models.CharField(max_length=255, verbose_name="Nom du service")
     cluster = models.ForeignKey(Cluster, on_delete=models.CASCADE, related_name='services', null=True, blank=True)
@@ -511,60 +389,17 @@ class Service(models.Model, EmotionTrendMixin):
         verbose_name_plural = "Services"
         ordering = ['service_name']
 
-    def calculate_daily_emotion_trend(self):
+    def calculate_daily_emotion_trend(self, use_aggregates=None):
         """
         Calcule les tendances émotionnelles des collaborateurs du service pour la journée
         Retourne un dictionnaire contenant les statistiques émotionnelles
         """
         today = timezone.now().date()
 
-        # Récupérer toutes les émotions des collaborateurs du service pour aujourd'hui
-        daily_emotions = Emotion.objects.filter(
-        collaborator__service=self,
-        date=today
-        )
-
-        # Statistiques de base
-        stats = {
-            'total_emotions': daily_emotions.count(),
-            'morning_emotions': daily_emotions.filter(half_day=False).count(),
-            'evening_emotions': daily_emotions.filter(half_day=True).count(),
-            'participation_rate': 0,
-            'emotion_distribution': {},
-            'average_emotion_degree': 0,
-            'emotion_trends': {
-                'morning': {},
-                'evening': {}
-            }
-        }
-
-        # Calculer le taux de participation
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            stats['participation_rate'] = (daily_emotions.values('collaborator').distinct().count() / total_collaborators) * 100
-        
-        # Distribution des émotions
-        emotion_counts = daily_emotions.values('emotion_type__emotion_type').annotate(
-            count=Count('emotion_type__emotion_type')
-        )   
-        for emotion in emotion_counts:
-            stats['emotion_distribution'][emotion['emotion_type__emotion_type']] = emotion['count']
-
-        # Moyenne des degrés d'émotion
-        avg_degree = daily_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg']
-        stats['average_emotion_degree'] = round(avg_degree if avg_degree else 0, 2)
-
-        # Tendances par période (matin/soir)
-        for period, half_day in [('morning', False), ('evening', True)]:
-            period_emotions = daily_emotions.filter(half_day=half_day)
-            emotion_trend = period_emotions.values('emotion_type__emotion_type').annotate(
-                count=Count('emotion_type__emotion_type')
-            )
-
-            for emotion in emotion_trend:
-                stats['emotion_trends'][period][emotion['emotion_type__emotion_type']] = emotion['count']
+        # Émotions des collaborateurs du service pour aujourd'hui (brutes ou pré-agrégées)
+        source = self._get_emotion_source(today, today, use_aggregates)
 
-        return stats
+        return self._calculate_base_emotion_stats(source)
 
     def get_dominant_emotion(self):
         """
@@ -583,102 +418,52 @@ class Service(models.Model, EmotionTrendMixin):
 
     def get_emotion_alerts(self):
         """
-        Retourne les alertes émotionnelles du service pour la journée
+        Retourne les alertes émotionnelles ouvertes du service, levées et résolues
+        au fil des déclarations par le moteur d'alertes (voir alerting.py)
         """
+        alerts = self.alerts.filter(
+            is_resolved=False,
+            alert_type__in=['low_participation', 'negative_emotions']
+        ).order_by('-created_at').values('alert_type', 'severity', 'message', 'created_at')
 
-        alerts = []
-
-        today = timezone.now().date()
-        stats = self.calculate_daily_emotion_trend()
-
-        # Alerte si le taux de participation est faible (<50%)
-        if stats['participation_rate'] < 50:
-            alerts.append({
-                'type': 'low_participation',
-                'message': f"Faible taux de participation ({stats['participation_rate']}%) dans le service {self.service_name}"
-            })
-
-        # Alerte si la moyenne des émotions est négative
-        if stats['average_emotion_degree'] < 0:
-            alerts.append({
-                'type': 'negative_emotions',
-                'message': f"Tendance émotionnelle négative dans le service {self.service_name}"
-            })
-
-        return alerts
+        return [
+            {
+                'type': alert['alert_type'],
+                'severity': alert['severity'],
+                'message': alert['message'],
+                'created_at': alert['created_at'],
+            }
+            for alert in alerts
+        ]
 
-    def calculate_weekly_emotion_trend(self):
+    def calculate_weekly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles hebdomadaires du service
         """
-        start_of_week, end_of_week = self._get_week_date_range()
+        start_of_week, end_of_week = self._get_week_date_range(reference_date)
+        source = self._get_emotion_source(start_of_week, end_of_week, use_aggregates)
         
-        weekly_emotions = Emotion.objects.filter(
-            collaborator__service=self,
-            date__range=[start_of_week, end_of_week]
-        )
-        
-        stats = self._calculate_weekly_base_stats(weekly_emotions)
-        
-        # Calculer le taux de participation hebdomadaire
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = weekly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_weekly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques au service
-        stats['team_breakdown'] = self._calculate_weekly_team_breakdown(weekly_emotions)
+        stats['team_breakdown'] = source.breakdown('team')
         
         return stats
 
-    def _calculate_weekly_team_breakdown(self, weekly_emotions):
-        """Répartition hebdomadaire par équipe"""
-        return dict(
-            weekly_emotions.values('collaborator__team__team_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__team__team_name', 'count')
-        )
-
-    def calculate_monthly_emotion_trend(self):
+    def calculate_monthly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles mensuelles du service
         """
-        start_of_month, end_of_month = self._get_month_date_range()
-        
-        monthly_emotions = Emotion.objects.filter(
-            collaborator__service=self,
-            date__range=[start_of_month, end_of_month]
-        )
+        start_of_month, end_of_month = self._get_month_date_range(reference_date)
+        source = self._get_emotion_source(start_of_month, end_of_month, use_aggregates)
         
-        stats = self._calculate_monthly_base_stats(monthly_emotions)
-        
-        # Calculer le taux de participation mensuel
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = monthly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_monthly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques au service
-        stats['team_breakdown'] = self._calculate_monthly_team_breakdown(monthly_emotions)
-        stats['role_distribution'] = self._calculate_monthly_role_distribution(monthly_emotions)
+        stats['team_breakdown'] = source.breakdown('team')
+        stats['role_distribution'] = source.breakdown('role')
         
         return stats
-
-    def _calculate_monthly_team_breakdown(self, monthly_emotions):
-        """Répartition mensuelle par équipe"""
-        return dict(
-            monthly_emotions.values('collaborator__team__team_name')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__team__team_name', 'count')
-        )
-    
-    def _calculate_monthly_role_distribution(self, monthly_emotions):
-        """Distribution mensuelle par rôle"""
-        return dict(
-            monthly_emotions.values('collaborator__role')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__role', 'count')
-        )
     
     def __str__(self):
         return self.service_name
@@ -686,6 +471,9 @@ class Service(models.Model, EmotionTrendMixin):
 
 class Team(models.Model, EmotionTrendMixin):
     """Modèle pour les équipes"""
+    emotion_scope_lookup = 'collaborator__team'
+    aggregate_scope_field = 'team'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     team_name = models.CharField(max_length=255, verbose_name="Nom de l'équipe")
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='teams', null=True, blank=True)
@@ -698,120 +486,143 @@ class Team(models.Model, EmotionTrendMixin):
         verbose_name_plural = "Équipes"
         ordering = ['team_name']
 
-    def calculate_daily_emotion_trend(self):
+    def calculate_daily_emotion_trend(self, use_aggregates=None):
         """
         Calcule les tendances émotionnelles des collaborateurs de l'équipe pour la journée
         """
         today = timezone.now().date()
         
-        # Récupérer toutes les émotions des collaborateurs de l'équipe pour aujourd'hui
-        daily_emotions = Emotion.objects.filter(
-            collaborator__team=self,
-            date=today
-        )
+        # Émotions des collaborateurs de l'équipe pour aujourd'hui (brutes ou pré-agrégées)
+        source = self._get_emotion_source(today, today, use_aggregates)
         
-        stats = self._calculate_base_emotion_stats(daily_emotions)
-        
-        # Calculer le taux de participation pour l'équipe
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            stats['participation_rate'] = (daily_emotions.values('collaborator').distinct().count() / total_collaborators) * 100
+        stats = self._calculate_base_emotion_stats(source)
         
         # Ajouter des statistiques spécifiques à l'équipe
-        stats['role_breakdown'] = self._calculate_role_breakdown(daily_emotions)
+        stats['role_breakdown'] = source.breakdown('role')
         
         return stats
-    
-    def _calculate_role_breakdown(self, daily_emotions):
-        """Calcule la répartition des émotions par rôle dans l'équipe"""
-        return dict(daily_emotions.values('collaborator__role')
-                   .annotate(count=Count('id'))
-                   .values_list('collaborator__role', 'count'))
 
-    def calculate_weekly_emotion_trend(self):
+    def calculate_weekly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles hebdomadaires de l'équipe
         """
-        start_of_week, end_of_week = self._get_week_date_range()
+        start_of_week, end_of_week = self._get_week_date_range(reference_date)
+        source = self._get_emotion_source(start_of_week, end_of_week, use_aggregates)
         
-        weekly_emotions = Emotion.objects.filter(
-            collaborator__team=self,
-            date__range=[start_of_week, end_of_week]
-        )
-        
-        stats = self._calculate_weekly_base_stats(weekly_emotions)
-        
-        # Calculer le taux de participation hebdomadaire
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = weekly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_weekly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques à l'équipe
-        stats['role_breakdown'] = self._calculate_weekly_role_breakdown(weekly_emotions)
+        stats['role_breakdown'] = source.breakdown('role')
         
         return stats
 
-    def _calculate_weekly_role_breakdown(self, weekly_emotions):
-        """Répartition hebdomadaire par rôle"""
-        return dict(
-            weekly_emotions.values('collaborator__role')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__role', 'count')
-        )
-
-    def calculate_monthly_emotion_trend(self):
+    def calculate_monthly_emotion_trend(self, reference_date=None, use_aggregates=None):
         """
         Calcule les tendances émotionnelles mensuelles de l'équipe
         """
-        start_of_month, end_of_month = self._get_month_date_range()
+        start_of_month, end_of_month = self._get_month_date_range(reference_date)
+        source = self._get_emotion_source(start_of_month, end_of_month, use_aggregates)
         
-        monthly_emotions = Emotion.objects.filter(
-            collaborator__team=self,
-            date__range=[start_of_month, end_of_month]
-        )
-        
-        stats = self._calculate_monthly_base_stats(monthly_emotions)
-        
-        # Calculer le taux de participation mensuel
-        total_collaborators = self.collaborators.filter(is_active=True).count()
-        if total_collaborators > 0:
-            participants = monthly_emotions.values('collaborator').distinct().count()
-            stats['participation_rate'] = (participants / total_collaborators) * 100
+        stats = self._calculate_monthly_base_stats(source)
         
         # Ajouter les breakdowns spécifiques à l'équipe
-        stats['role_breakdown'] = self._calculate_monthly_role_breakdown(monthly_emotions)
-        stats['member_participation'] = self._calculate_member_participation(monthly_emotions)
+        stats['role_breakdown'] = source.breakdown('role')
+        stats['member_participation'] = self._calculate_member_participation(source.emotions)
         
         return stats
-
-    def _calculate_monthly_role_breakdown(self, monthly_emotions):
-        """Répartition mensuelle par rôle"""
-        return dict(
-            monthly_emotions.values('collaborator__role')
-            .annotate(count=Count('id'))
-            .values_list('collaborator__role', 'count')
-        )
     
     def _calculate_member_participation(self, monthly_emotions):
-        """Calcul de la participation par membre"""
-        return dict(
-            monthly_emotions.values('collaborator__full_name')
+        """
+        Calcul de la participation par membre, indexée par nom complet
+        (full_name est une propriété : regroupement sur le collaborateur et ses nom et prénom)
+        """
+        rows = (
+            monthly_emotions.order_by()
+            .values('collaborator_id', 'collaborator__first_name', 'collaborator__last_name')
             .annotate(
                 emotion_count=Count('id'),
                 avg_emotion=Avg('emotion_degree')
             )
-            .values(
-                'collaborator__full_name',
-                'emotion_count',
-                'avg_emotion'
-            )
+            .order_by('collaborator__last_name', 'collaborator__first_name')
         )
+        return {
+            f"{row['collaborator__first_name']} {row['collaborator__last_name']}": {
+                'emotion_count': row['emotion_count'],
+                'avg_emotion': round(row['avg_emotion'], 2) if row['avg_emotion'] is not None else None
+            }
+            for row in rows
+        }
     
     def __str__(self):
         return self.team_name
 
 
+class CollaboratorManager(UserManager):
+    """
+    Manager des collaborateurs : maintient les champs d'humeur dénormalisés
+    (emotion_today_*, emotion_*_this_week, emotion_*_this_month) depuis le chemin
+    d'écriture des émotions, par des UPDATE ciblés ou ensemblistes
+    """
+    MOOD_PERIODS = ('today', 'week', 'month')
+
+    def record_emotion(self, emotion, rollups, previous=None, today=None):
+        """
+        Met à jour les champs d'humeur du collaborateur après l'enregistrement
+        d'une déclaration, à partir de ses agrégats hebdomadaire et mensuel
+        (voir EmotionRollupManager.record_emotion), sans relire l'historique
+        """
+        today = today or timezone.localdate()
+        if previous and (previous['date'], previous['period']) != (emotion.date, emotion.period):
+            # Déclaration déplacée : l'ancienne période n'est plus couverte par rollups
+            return self.refresh_moods([emotion.collaborator_id], today=today)
+
+        fields = {}
+        if emotion.date == today:
+            fields[f'emotion_today_{emotion.period}'] = emotion.emotion_type.emotion
+        for period_type, suffix in ((EmotionRollup.WEEKLY, 'week'), (EmotionRollup.MONTHLY, 'month')):
+            rollup = rollups[period_type]
+            if rollup.period_start == EmotionRollup.get_period_start(period_type, today):
+                fields[f'emotion_degree_this_{suffix}'] = rollup.degree_sum
+                fields[f'emotion_this_{suffix}'] = get_mood_label(rollup.degree_sum)
+
+        if not fields:
+            return 0
+        for name, value in fields.items():
+            setattr(emotion.collaborator, name, value)
+        return self.filter(pk=emotion.collaborator_id).update(**fields)
+
+    def refresh_moods(self, collaborator_ids=None, periods=MOOD_PERIODS, today=None):
+        """
+        Recalcule en quelques UPDATE ensemblistes les champs d'humeur des périodes
+        demandées (today, week, month), pour les collaborateurs donnés ou pour tous,
+        depuis les déclarations du jour et les agrégats de la semaine et du mois
+        """
+        today = today or timezone.localdate()
+        queryset = self.all() if collaborator_ids is None else self.filter(pk__in=collaborator_ids)
+        updated = 0
+
+        if 'today' in periods:
+            todays = Emotion.objects.filter(collaborator=OuterRef('pk'), date=today).order_by()
+            updated = queryset.update(
+                emotion_today_morning=Subquery(todays.filter(period='morning').values('emotion_type__emotion')[:1]),
+                emotion_today_evening=Subquery(todays.filter(period='evening').values('emotion_type__emotion')[:1])
+            )
+
+        for period_type, suffix in ((EmotionRollup.WEEKLY, 'week'), (EmotionRollup.MONTHLY, 'month')):
+            if suffix not in periods:
+                continue
+            degree_sum = EmotionRollup.objects.filter(
+                collaborator=OuterRef('pk'),
+                period_type=period_type,
+                period_start=EmotionRollup.get_period_start(period_type, today)
+            ).values('degree_sum')[:1]
+            degree_field = f'emotion_degree_this_{suffix}'
+            updated = queryset.update(**{degree_field: Coalesce(Subquery(degree_sum), 0)})
+            queryset.update(**{f'emotion_this_{suffix}': mood_label_expression(degree_field)})
+
+        return updated
+
+
 class Collaborator(AbstractUser):
     """Modèle étendu pour les collaborateurs (utilisateurs)"""
     ROLE_CHOICES = [
@@ -856,6 +667,8 @@ class Collaborator(AbstractUser):
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'collaborator_id']
+
+    objects = CollaboratorManager()
     
     class Meta:
         verbose_name = "Collaborateur"
@@ -949,63 +762,8 @@ class Collaborator(AbstractUser):
         return total_emotion_degree
     
     def save(self, *args, **kwargs):
-
-        # Mettre à jour emotion_today_morning lors de la sauvegarde
-        morning_emotion = self.get_today_morning_emotion()
-
-        if morning_emotion:
-            self.emotion_today_morning = morning_emotion.emotion_type
-        else:
-            self.emotion_today_morning = None
-
-        # Récupérer et mettre à jour l'émotion du soir
-        evening_emotion = self.get_today_evening_emotion()
-
-        if evening_emotion:
-            self.emotion_today_evening = evening_emotion.emotion_type
-        else:
-            self.emotion_today_evening = None
-
-        # Calculer et mettre à jour le degré d'émotion pour la semaine
-        self.emotion_degree_this_week = self.calculate_emotion_degree_this_week()
-
-        # Déterminer emotion_this_week en fonction de emotion_degree_this_week
-        if self.emotion_degree_this_week is not None:
-            if self.emotion_degree_this_week <= -5:
-                self.emotion_this_week = "Angry"
-            elif self.emotion_degree_this_week <= -2:
-                self.emotion_this_week = "Anxious"
-            elif self.emotion_degree_this_week <= -1:
-                self.emotion_this_week = "Sad"
-            elif self.emotion_degree_this_week == 0:
-                self.emotion_this_week = "Neutral"
-            elif self.emotion_degree_this_week <= 5:
-                self.emotion_this_week = "Happy"
-            else:
-                self.emotion_this_week = "Excited"
-        else:
-            self.emotion_this_week = None
-
-        # Calculer et mettre à jour le degré d'émotion pour le mois
-        self.emotion_degree_this_month = self.calculate_emotion_degree_this_month()
-
-        # Déterminer emotion_this_month en fonction de emotion_degree_this_month
-        if self.emotion_degree_this_month is not None:
-            if self.emotion_degree_this_month <= -5:
-                self.emotion_this_month = "Angry"
-            elif self.emotion_degree_this_month <= -2:
-                self.emotion_this_month = "Anxious"
-            elif self.emotion_degree_this_month <= -1:
-                self.emotion_this_month = "Sad"
-            elif self.emotion_degree_this_month == 0:
-                self.emotion_this_month = "Neutral"
-            elif self.emotion_degree_this_month <= 5:
-                self.emotion_this_month = "Happy"
-            else:
-                self.emotion_this_month = "Excited"
-        else:
-            self.emotion_this_month = None
-
+        # Les champs d'humeur sont maintenus par le chemin d'écriture des émotions
+        # (CollaboratorManager.record_emotion) et la bascule de minuit (refresh_moods)
         if not self.username:
             self.username = self.email
         super().save(*args, **kwargs)
@@ -1090,6 +848,26 @@ class Emotion(models.Model):
     
     # Commentaire optionnel
     comment = models.TextField(blank=True, null=True, verbose_name="Commentaire")
+
+    # Rattachement sous lequel la déclaration est comptée dans le cube journalier et les
+    # états d'alerte : retirée de ces cellules même si le collaborateur a changé d'équipe depuis.
+    # Sans contrainte en base (table partitionnée, entités supprimées : cellules supprimées en cascade)
+    declared_team = models.ForeignKey(
+        'Team', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+        related_name='+', editable=False
+    )
+    declared_service = models.ForeignKey(
+        'Service', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+        related_name='+', editable=False
+    )
+    declared_cluster = models.ForeignKey(
+        'Cluster', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+        related_name='+', editable=False
+    )
+    declared_company = models.ForeignKey(
+        'Company', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+        related_name='+', editable=False
+    )
     
     class Meta:
         verbose_name = "Déclaration d'émotion"
@@ -1099,142 +877,48 @@ class Emotion(models.Model):
         indexes = [
             models.Index(fields=['date', 'period']),
             models.Index(fields=['collaborator', 'date']),
+            # Pagination par curseur, dans l'ordre de la liste (date, creation_date, id)
+            models.Index(fields=['-date', '-creation_date', '-id']),
             models.Index(fields=['week_number', 'year']),
             models.Index(fields=['month', 'year']),
         ]
 
-    def calculate_weekly_emotion_summary(self):
+    def calculate_weekly_emotion_summary(self, rollup):
         """
-        Calcule un résumé des émotions pour la semaine en cours
+        Calcule un résumé des émotions pour la semaine de la déclaration
+        à partir de l'agrégat hebdomadaire du collaborateur
         """
-
-        # Obtenir la date de début et de fin de la semaine en cours
-        today = timezone.now().date()
-        start_of_week = today - timezone.timedelta(days=today.weekday())
-        end_of_week = start_of_week + timezone.timedelta(days=6)
-
-        # Filtrer les émotions de la semaine en cours pour ce collaborateur
-        weekly_emotions = Emotion.objects.filter(
-            collaborator=self.collaborator,
-            date__range=[start_of_week, end_of_week]
-        )
-
-        # Calculer les statistiques
-        total_emotions = weekly_emotions.count()
-        avg_emotion_degree = weekly_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg'] or 0
-
-        # Compter les types d'émotions
-        emotion_type_counts = weekly_emotions.values('emotion_type__emotion_type').annotate(
-            count=Count('emotion_type__emotion_type')
-        )
-
-        # Construire le résumé
-        summary = {
-            'total_emotions': total_emotions,
-            'average_emotion_degree': round(avg_emotion_degree, 2),
-            'emotion_type_breakdown': {
-                item['emotion_type__emotion_type']: item['count'] 
-                for item in emotion_type_counts
-            }
-        }
-
+        summary = rollup.build_weekly_summary()
         self.weekly_emotion_summary = json.dumps(summary)
         return summary
 
-    def calculate_monthly_emotion_insights(self):
+    def calculate_monthly_emotion_insights(self, rollup):
         """
-        Calcule des insights émotionnels pour le mois en cours
+        Calcule des insights émotionnels pour le mois de la déclaration
+        à partir de l'agrégat mensuel du collaborateur
         """
-
-        # Obtenir la date de début et de fin du mois en cours
-        today = timezone.now().date()
-        start_of_month = today.replace(day=1)
-        end_of_month = (start_of_month + timezone.timedelta(days=32)).replace(day=1) - timezone.timedelta(days=1)
-
-        # Filtrer les émotions du mois en cours pour ce collaborateur
-        monthly_emotions = Emotion.objects.filter(
-            collaborator=self.collaborator,
-            date__range=[start_of_month, end_of_month]
-        )
-
-        # Calculs statistiques
-        total_emotions = monthly_emotions.count()
-        avg_emotion_degree = monthly_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg'] or 0
-
-        # Identifier les tendances émotionnelles
-        emotion_trends = {
-            'most_frequent_emotion': monthly_emotions.values('emotion_type__emotion_type')
-                .annotate(count=Count('emotion_type__emotion_type'))
-                .order_by('-count')
-                .first(),
-            'highest_emotion_degree': monthly_emotions.order_by('-emotion_degree').first(),
-            'lowest_emotion_degree': monthly_emotions.order_by('emotion_degree').first()
-        }
-
-        # Calcul de la progression émotionnelle
-        emotion_progression = self.calculate_emotion_progression(monthly_emotions)
-
-        # Construire les insights
-        insights = {
-            'total_emotions': total_emotions,
-            'average_emotion_degree': round(avg_emotion_degree, 2),
-            'emotion_trends': {
-                'most_frequent_emotion': emotion_trends['most_frequent_emotion']['emotion_type__emotion_type'] 
-                    if emotion_trends['most_frequent_emotion'] else None,
-                'highest_emotion': emotion_trends['highest_emotion_degree'].emotion_type.emotion_type 
-                    if emotion_trends['highest_emotion_degree'] else None,
-                'lowest_emotion': emotion_trends['lowest_emotion_degree'].emotion_type.emotion_type 
-                    if emotion_trends['lowest_emotion_degree'] else None
-            },
-            'emotion_progression': emotion_progression
-        }
-
+        insights = rollup.build_monthly_insights()
         self.monthly_emotion_insights = json.dumps(insights)
         return insights
 
-    def calculate_emotion_progression(self, monthly_emotions):
-        """
-        Calcule la progression des émotions sur le mois
-        """
+    def assign_organization(self, organization):
+        """Enregistre le rattachement (voir EmotionDailyAggregate.get_organization) sous lequel la déclaration est comptée"""
+        for field, value in organization.items():
+            setattr(self, f'declared_{field}', value)
 
-        progression = []
-        for emotion in monthly_emotions.order_by('date'):
-            progression.append({
-                'date': emotion.date.isoformat(),
-                'emotion_type': emotion.emotion_type.emotion_type,
-                'emotion_degree': emotion.emotion_degree
-            })
-        return progression
-    
     def save(self, *args, **kwargs):
 
-        # Calcul de emotion_degree basé sur le type d'émotion
-        if self.emotion_type:
-            emotion_degree_mapping = {
-            'happy': 1,
-            'Sad': -1,
-            'Neutral': 0,
-            'Angry': -5,
-            'Excited': 5,
-            'Anxious': -2
-            }
+        # Charger le collaborateur et son organisation en une seule requête
+        if self.collaborator_id:
+            self.collaborator = Collaborator.objects.select_related(
+                'team', 'company', 'cluster'
+            ).get(pk=self.collaborator_id)
 
-            # Récupérer le degree du type d'émotion
-            self.emotion_degree = emotion_degree_mapping.get(self.emotion_type.emotion_type, 0)
-        else:
-            # Si pas de type d'émotion, mettre à 0 par défaut
-            self.emotion_degree = 0
+        # Le degré d'émotion est celui du type d'émotion (calculé dans EmotionType.save)
+        self.emotion_degree = self.emotion_type.degree if self.emotion_type_id else 0
 
         # Calcul de date_period
-        today = timezone.now().date()
-        if self.date == today:
-            self.date_period = "Ce jour"
-        elif self.date.isocalendar()[1] == today.isocalendar()[1] and self.date.year == today.year:
-            self.date_period = "cette semaine"
-        elif self.date.month == today.month and self.date.year == today.year:
-            self.date_period = "ce mois"
-        else:
-            self.date_period = "cette année"
+        self.date_period = get_date_period(self.date, timezone.now().date())
 
         # Half_day
         current_time = timezone.now().time()
@@ -1258,12 +942,853 @@ class Emotion(models.Model):
             if self.collaborator.cluster:
                 self.cluster = self.collaborator.cluster.name
 
-        # Calculer les résumés et insights lors de la sauvegarde
-        self.calculate_weekly_emotion_summary()
-        self.calculate_monthly_emotion_insights()
- 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Mettre à jour les agrégats incrémentaux puis en dériver les résumés,
+            # sans relire l'historique du collaborateur
+            previous = None
+            if not self._state.adding:
+                previous = Emotion.objects.filter(pk=self.pk).values(
+                    'date', 'period', 'half_day', 'emotion_degree', 'emotion_type__emotion',
+                    *(f'declared_{field}' for field in EmotionDailyAggregateManager.ORGANIZATION_FIELDS)
+                ).first()
+            if previous:
+                # Cellules dans lesquelles la version précédente a été comptée
+                previous['organization'] = EmotionDailyAggregate.objects.get_declared_organization(
+                    previous, self.collaborator
+                )
+
+            rollups = EmotionRollup.objects.record_emotion(
+                self, previous_date=previous['date'] if previous else None
+            )
+            self.calculate_weekly_emotion_summary(rollups['weekly'])
+            self.calculate_monthly_emotion_insights(rollups['monthly'])
+
+            # Cube journalier par équipe, sous le rattachement actuel du collaborateur
+            organization = EmotionDailyAggregate.objects.get_organization(self.collaborator)
+            self.assign_organization(organization)
+            if previous:
+                EmotionDailyAggregate.objects.record(
+                    previous['organization'], previous['date'], previous['period'], previous['half_day'],
+                    previous['emotion_type__emotion'], previous['emotion_degree'], sign=-1
+                )
+            EmotionDailyAggregate.objects.record(
+                organization, self.date, self.period, self.half_day, self.emotion_type.emotion, self.emotion_degree
+            )
+
+            # Valeurs avant modification, lues par le moteur d'alertes (signal post_save)
+            self._previous_values = previous
+            super().save(*args, **kwargs)
+
+            # Champs d'humeur dénormalisés du collaborateur (UPDATE ciblé)
+            Collaborator.objects.record_emotion(self, rollups, previous=previous)
     
     def __str__(self):
         return f"{self.collaborator.full_name} - {self.emotion_type.name} - {self.date} ({self.period})"
 
+
+
+class EmotionTrendManager(models.Manager):
+    """Manager pour l'enregistrement des tendances précalculées"""
+
+    def store(self, entity, period_type, start_date, end_date, stats):
+        """Crée ou met à jour la tendance de l'entité pour la période commençant à start_date"""
+        distribution = stats.get('emotion_distribution') or {}
+        dominant_emotion = max(distribution, key=distribution.get) if distribution else ''
+        # Tendances hebdomadaires et trimestrielles dans weekly_emotion_trend, mensuelles dans monthly_emotion_summary
+        payload_field = 'monthly_emotion_summary' if period_type == EmotionTrend.MONTHLY else 'weekly_emotion_trend'
+
+        lookup = {field: None for field in EmotionTrend.ENTITY_FIELDS}
+        lookup[entity.aggregate_scope_field] = entity
+        trend, _ = self.update_or_create(
+            **lookup,
+            period_type=period_type,
+            start_date=start_date,
+            defaults={
+                'end_date': end_date,
+                payload_field: stats,
+                'average_emotion_score': stats.get('average_emotion_degree') or 0,
+                'dominant_emotion': dominant_emotion,
+                'participation_rate': stats.get('participation_rate') or 0,
+            }
+        )
+        return trend
+
+
+class EmotionTrend(models.Model):
+    """Tendances émotionnelles précalculées d'une entité (équipe, service, cluster ou entreprise)"""
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    QUARTERLY = 'quarterly'
+    PERIOD_TYPE_CHOICES = [
+        (WEEKLY, 'Hebdomadaire'),
+        (MONTHLY, 'Mensuelle'),
+        (QUARTERLY, 'Trimestrielle'),
+    ]
+    ENTITY_FIELDS = ('team', 'service', 'cluster', 'company')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Entité concernée (une seule renseignée)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='emotion_trends')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True, blank=True, related_name='emotion_trends')
+    cluster = models.ForeignKey(Cluster, on_delete=models.CASCADE, null=True, blank=True, related_name='emotion_trends')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True, related_name='emotion_trends')
+
+    weekly_emotion_trend = models.JSONField(
+        default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Tendance (hebdomadaire/trimestrielle)"
+    )
+    monthly_emotion_summary = models.JSONField(
+        default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Résumé mensuel"
+    )
+
+    period_type = models.CharField(max_length=20, choices=PERIOD_TYPE_CHOICES, verbose_name="Type de période")
+    start_date = models.DateField(verbose_name="Début de période")
+    end_date = models.DateField(verbose_name="Fin de période")
+
+    average_emotion_score = models.FloatField(default=0, verbose_name="Score émotionnel moyen")
+    dominant_emotion = models.CharField(max_length=50, blank=True, verbose_name="Émotion dominante")
+    participation_rate = models.FloatField(default=0, verbose_name="Taux de participation")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmotionTrendManager()
+
+    class Meta:
+        verbose_name = "Tendance émotionnelle"
+        verbose_name_plural = "Tendances émotionnelles"
+        ordering = ['-start_date']
+        unique_together = ['team', 'service', 'cluster', 'company', 'period_type', 'start_date']
+        indexes = [
+            models.Index(fields=['period_type', '-start_date']),
+            models.Index(fields=['team', 'period_type', '-start_date']),
+            models.Index(fields=['service', 'period_type', '-start_date']),
+            models.Index(fields=['cluster', 'period_type', '-start_date']),
+            models.Index(fields=['company', 'period_type', '-start_date']),
+        ]
+
+    def __str__(self):
+        entity = self.team or self.service or self.cluster or self.company
+        return f"{entity} - {self.get_period_type_display()} du {self.start_date}"
+
+
+class Alert(models.Model):
+    """Alertes émotionnelles ciblant un collaborateur, une équipe ou un service"""
+    ALERT_TYPE_CHOICES = [
+        ('consecutive_negative', 'Émotions négatives consécutives'),
+        ('low_team_morale', 'Moral d\'équipe faible'),
+        ('low_participation', 'Faible participation'),
+        ('negative_emotions', 'Tendance émotionnelle négative'),
+    ]
+
+    SEVERITY_CHOICES = [
+        ('low', 'Faible'),
+        ('medium', 'Moyenne'),
+        ('high', 'Élevée'),
+        ('critical', 'Critique'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Cible de l'alerte
+    collaborator = models.ForeignKey(Collaborator, on_delete=models.CASCADE, null=True, blank=True, related_name='alerts')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='alerts')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True, blank=True, related_name='alerts')
+
+    # Contenu
+    alert_type = models.CharField(max_length=50, choices=ALERT_TYPE_CHOICES, verbose_name="Type d'alerte")
+    severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES, default='medium', verbose_name="Sévérité")
+    title = models.CharField(max_length=255, verbose_name="Titre")
+    message = models.TextField(verbose_name="Message")
+
+    # Résolution
+    is_resolved = models.BooleanField(default=False, verbose_name="Résolue")
+    resolved_by = models.ForeignKey(
+        Collaborator, on_delete=models.SET_NULL, null=True, blank=True, related_name='resolved_alerts'
+    )
+    resolved_at = models.DateTimeField(null=True, blank=True, verbose_name="Résolue le")
+    resolution_notes = models.TextField(blank=True, verbose_name="Notes de résolution")
+
+    # Données techniques
+    trigger_data = models.JSONField(default=dict, blank=True, verbose_name="Données du déclencheur")
+    notification_sent = models.BooleanField(default=False, verbose_name="Notification envoyée")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Alerte"
+        verbose_name_plural = "Alertes"
+        ordering = ['-created_at']
+        indexes = [
+            # Pagination par curseur (created_at, id)
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['is_resolved', '-created_at']),
+        ]
+
+    def resolve(self, resolved_by=None, notes=''):
+        """Marque l'alerte comme résolue"""
+        self.is_resolved = True
+        self.resolved_by = resolved_by
+        self.resolved_at = timezone.now()
+        self.resolution_notes = notes or ''
+        self.save()
+
+    def __str__(self):
+        return f"{self.get_severity_display()} - {self.title}"
+
+
+class EmotionRollupManager(models.Manager):
+    """Manager pour la maintenance incrémentale des agrégats d'émotions"""
+
+    def _period_keys(self, date):
+        return [
+            (EmotionRollup.WEEKLY, EmotionRollup.get_period_start(EmotionRollup.WEEKLY, date)),
+            (EmotionRollup.MONTHLY, EmotionRollup.get_period_start(EmotionRollup.MONTHLY, date)),
+        ]
+
+    def _lock_rollups(self, collaborator_id, keys, create=True):
+        """
+        Verrouille (et crée si besoin) les agrégats correspondant aux clés données
+        """
+        condition = Q()
+        for period_type, period_start in keys:
+            condition |= Q(period_type=period_type, period_start=period_start)
+
+        rollups = {
+            (rollup.period_type, rollup.period_start): rollup
+            for rollup in self.select_for_update().filter(condition, collaborator_id=collaborator_id)
+        }
+
+        missing = [key for key in keys if key not in rollups]
+        if missing and create:
+            # Première déclaration de la période : ignore_conflicts protège des créations concurrentes
+            self.bulk_create(
+                [
+                    EmotionRollup(collaborator_id=collaborator_id, period_type=period_type, period_start=period_start)
+                    for period_type, period_start in missing
+                ],
+                ignore_conflicts=True
+            )
+            return self._lock_rollups(collaborator_id, keys)
+
+        return rollups
+
+    def record_emotion(self, emotion, previous_date=None):
+        """
+        Ajoute (ou remplace) une déclaration dans les agrégats hebdomadaire et mensuel
+        du collaborateur. Le nombre de requêtes ne dépend pas de l'historique.
+        Retourne les agrégats mis à jour, indexés par type de période.
+        """
+        keys = self._period_keys(emotion.date)
+        previous_keys = self._period_keys(previous_date) if previous_date else []
+        rollups = self._lock_rollups(emotion.collaborator_id, list(dict.fromkeys(previous_keys + keys)))
+
+        for key in previous_keys:
+            rollups[key].remove_entry(emotion.pk)
+        for key in keys:
+            rollups[key].add_entry(emotion)
+
+        self.bulk_update(
+            list(rollups.values()),
+            ['total_emotions', 'degree_sum', 'emotion_type_breakdown', 'progression']
+        )
+
+        return {period_type: rollups[(period_type, period_start)] for period_type, period_start in keys}
+
+    def record_emotions(self, emotions):
+        """
+        Version en lot de record_emotion pour de nouvelles déclarations (ingestion en masse).
+        Les déclarations sont appliquées dans l'ordre chronologique et chacune reçoit
+        les résumés de ses agrégats tels qu'ils sont après son ajout.
+        Le type d'émotion de chaque déclaration doit être déjà chargé.
+        """
+        if not emotions:
+            return {}
+
+        keys = {
+            (emotion.collaborator_id, period_type, period_start)
+            for emotion in emotions
+            for period_type, period_start in self._period_keys(emotion.date)
+        }
+        rollups = self._lock_many(keys)
+
+        for emotion in sorted(emotions, key=lambda item: (item.date, item.period != 'morning')):
+            weekly_key, monthly_key = self._period_keys(emotion.date)
+            weekly = rollups[(emotion.collaborator_id,) + weekly_key]
+            monthly = rollups[(emotion.collaborator_id,) + monthly_key]
+            weekly.add_entry(emotion)
+            monthly.add_entry(emotion)
+            emotion.calculate_weekly_emotion_summary(weekly)
+            emotion.calculate_monthly_emotion_insights(monthly)
+
+        self.bulk_update(
+            list(rollups.values()),
+            ['total_emotions', 'degree_sum', 'emotion_type_breakdown', 'progression'],
+            batch_size=500
+        )
+        return rollups
+
+    def _lock_many(self, keys):
+        """
+        Verrouille (et crée si besoin) les agrégats de plusieurs collaborateurs,
+        clés de la forme (collaborator_id, period_type, period_start)
+        """
+        collaborator_ids = {key[0] for key in keys}
+        period_starts = [key[2] for key in keys]
+
+        candidates = self.select_for_update().filter(
+            collaborator_id__in=collaborator_ids,
+            period_start__range=(min(period_starts), max(period_starts))
+        )
+        rollups = {
+            (rollup.collaborator_id, rollup.period_type, rollup.period_start): rollup
+            for rollup in candidates
+        }
+
+        missing = [key for key in keys if key not in rollups]
+        if missing:
+            self.bulk_create(
+                [
+                    EmotionRollup(collaborator_id=collaborator_id, period_type=period_type, period_start=period_start)
+                    for collaborator_id, period_type, period_start in missing
+                ],
+                ignore_conflicts=True,
+                batch_size=1000
+            )
+            return self._lock_many(keys)
+
+        return {key: rollups[key] for key in keys}
+
+    def forget_emotion(self, emotion):
+        """Retire une déclaration supprimée des agrégats du collaborateur"""
+        keys = self._period_keys(emotion.date)
+        with transaction.atomic():
+            rollups = self._lock_rollups(emotion.collaborator_id, keys, create=False)
+            for rollup in rollups.values():
+                rollup.remove_entry(emotion.pk)
+            self.bulk_update(
+                list(rollups.values()),
+                ['total_emotions', 'degree_sum', 'emotion_type_breakdown', 'progression']
+            )
+
+    def rebuild(self, collaborator_ids=None):
+        """
+        Reconstruit les agrégats à partir de l'historique des déclarations
+        (initialisation ou réparation après un import en masse)
+        """
+        emotions = Emotion.objects.order_by('collaborator_id', 'date', 'period').values(
+            'id', 'collaborator_id', 'date', 'emotion_degree', 'emotion_type__emotion'
+        )
+        existing = self.all()
+        if collaborator_ids is not None:
+            emotions = emotions.filter(collaborator_id__in=collaborator_ids)
+            existing = existing.filter(collaborator_id__in=collaborator_ids)
+
+        rollups = {}
+        for row in emotions.iterator(chunk_size=2000):
+            for period_type, period_start in self._period_keys(row['date']):
+                key = (row['collaborator_id'], period_type, period_start)
+                if key not in rollups:
+                    rollups[key] = EmotionRollup(
+                        collaborator_id=row['collaborator_id'],
+                        period_type=period_type,
+                        period_start=period_start
+                    )
+                rollups[key].add_entry_values(
+                    row['id'], row['date'], row['emotion_type__emotion'], row['emotion_degree']
+                )
+
+        with transaction.atomic():
+            existing.delete()
+            self.bulk_create(list(rollups.values()), batch_size=1000)
+
+        return len(rollups)
+
+
+class EmotionRollup(models.Model):
+    """
+    Agrégat incrémental des déclarations d'un collaborateur sur une semaine ou un mois.
+    Alimente les résumés hebdomadaires et insights mensuels des émotions sans rescanner l'historique.
+    """
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    PERIOD_TYPE_CHOICES = [
+        (WEEKLY, 'Hebdomadaire'),
+        (MONTHLY, 'Mensuel'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    collaborator = models.ForeignKey(Collaborator, on_delete=models.CASCADE, related_name='emotion_rollups')
+    period_type = models.CharField(max_length=10, choices=PERIOD_TYPE_CHOICES, verbose_name="Type de période")
+    period_start = models.DateField(verbose_name="Début de période")
+
+    total_emotions = models.PositiveIntegerField(default=0)
+    degree_sum = models.IntegerField(default=0)
+    emotion_type_breakdown = models.JSONField(default=dict, blank=True)
+    progression = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmotionRollupManager()
+
+    class Meta:
+        verbose_name = "Agrégat d'émotions"
+        verbose_name_plural = "Agrégats d'émotions"
+        unique_together = ['collaborator', 'period_type', 'period_start']
+
+    @classmethod
+    def get_period_start(cls, period_type, date):
+        """Retourne le premier jour de la période contenant la date"""
+        if period_type == cls.WEEKLY:
+            return date - timezone.timedelta(days=date.weekday())
+        return date.replace(day=1)
+
+    def add_entry(self, emotion):
+        """Ajoute une déclaration à l'agrégat"""
+        self.add_entry_values(emotion.pk, emotion.date, emotion.emotion_type.emotion, emotion.emotion_degree)
+
+    def add_entry_values(self, emotion_pk, date, emotion_type, emotion_degree):
+        self.remove_entry(emotion_pk)
+        self.total_emotions += 1
+        self.degree_sum += emotion_degree
+        self.emotion_type_breakdown[emotion_type] = self.emotion_type_breakdown.get(emotion_type, 0) + 1
+        self.progression.append({
+            'id': str(emotion_pk),
+            'date': date.isoformat(),
+            'emotion_type': emotion_type,
+            'emotion_degree': emotion_degree
+        })
+
+    def remove_entry(self, emotion_pk):
+        """Retire une déclaration de l'agrégat si elle y figure"""
+        emotion_pk = str(emotion_pk)
+        for index, entry in enumerate(self.progression):
+            if entry['id'] == emotion_pk:
+                del self.progression[index]
+                self.total_emotions -= 1
+                self.degree_sum -= entry['emotion_degree']
+                remaining = self.emotion_type_breakdown.get(entry['emotion_type'], 0) - 1
+                if remaining > 0:
+                    self.emotion_type_breakdown[entry['emotion_type']] = remaining
+                else:
+                    self.emotion_type_breakdown.pop(entry['emotion_type'], None)
+                return True
+        return False
+
+    @property
+    def average_emotion_degree(self):
+        return round(self.degree_sum / self.total_emotions, 2) if self.total_emotions else 0
+
+    def build_weekly_summary(self):
+        """Construit le résumé hebdomadaire stocké sur chaque déclaration"""
+        return {
+            'total_emotions': self.total_emotions,
+            'average_emotion_degree': self.average_emotion_degree,
+            'emotion_type_breakdown': dict(self.emotion_type_breakdown)
+        }
+
+    def build_monthly_insights(self):
+        """Construit les insights mensuels stockés sur chaque déclaration"""
+        progression = sorted(self.progression, key=lambda entry: entry['date'])
+        breakdown = self.emotion_type_breakdown
+
+        highest = max(progression, key=lambda entry: entry['emotion_degree']) if progression else None
+        lowest = min(progression, key=lambda entry: entry['emotion_degree']) if progression else None
+
+        return {
+            'total_emotions': self.total_emotions,
+            'average_emotion_degree': self.average_emotion_degree,
+            'emotion_trends': {
+                'most_frequent_emotion': max(breakdown, key=breakdown.get) if breakdown else None,
+                'highest_emotion': highest['emotion_type'] if highest else None,
+                'lowest_emotion': lowest['emotion_type'] if lowest else None
+            },
+            'emotion_progression': [
+                {
+                    'date': entry['date'],
+                    'emotion_type': entry['emotion_type'],
+                    'emotion_degree': entry['emotion_degree']
+                }
+                for entry in progression
+            ]
+        }
+
+    def __str__(self):
+        return f"{self.collaborator_id} - {self.get_period_type_display()} du {self.period_start}"
+
+
+class EmotionDailyAggregateManager(models.Manager):
+    """Manager pour la maintenance du cube journalier des émotions"""
+    ORGANIZATION_FIELDS = ('team', 'service', 'cluster', 'company')
+    KEY_FIELDS = ('team_id', 'service_id', 'cluster_id', 'company_id', 'date', 'period', 'half_day', 'emotion_type')
+
+    @staticmethod
+    def get_organization(collaborator):
+        """Rattachement organisationnel d'un collaborateur, clé de ses cellules dans le cube"""
+        return {
+            'team_id': collaborator.team_id,
+            'service_id': collaborator.service_id,
+            'cluster_id': collaborator.cluster_id,
+            'company_id': collaborator.company_id,
+        }
+
+    @classmethod
+    def get_declared_organization(cls, emotion, collaborator=None):
+        """
+        Rattachement sous lequel une déclaration (instance ou valeurs declared_*) a été
+        comptée dans le cube. Déclarations antérieures à son enregistrement : rattachement
+        actuel du collaborateur.
+        """
+        values = emotion if isinstance(emotion, dict) else {
+            f'declared_{field}': getattr(emotion, f'declared_{field}_id') for field in cls.ORGANIZATION_FIELDS
+        }
+        if values['declared_company'] is None:
+            return cls.get_organization(collaborator or emotion.collaborator)
+        return {f'{field}_id': values[f'declared_{field}'] for field in cls.ORGANIZATION_FIELDS}
+
+    def _lock_cells(self, keys):
+        """Cellules existantes des clés données, verrouillées jusqu'à la fin de la transaction"""
+        keys = set(keys)
+        dates = [key[4] for key in keys]
+        teams = {key[0] for key in keys if key[0] is not None}
+        candidates = self.select_for_update().filter(
+            Q(team_id__in=teams) | Q(team__isnull=True),
+            company_id__in={key[3] for key in keys},
+            date__range=(min(dates), max(dates))
+        ).order_by('id')
+        cells = {}
+        for cell in candidates:
+            key = tuple(getattr(cell, field) for field in self.KEY_FIELDS)
+            if key in keys:
+                cells[key] = cell
+        return cells
+
+    def _apply(self, deltas):
+        """
+        Applique des deltas {clé: [nombre, somme des degrés]} aux cellules du cube.
+        Les cellules manquantes sont d'abord insérées à zéro (ON CONFLICT DO NOTHING,
+        contrainte d'unicité du cube) : deux transactions concurrentes ne peuvent pas
+        créer la même cellule, elles s'attendent sur son verrou.
+        """
+        if not deltas:
+            return
+        cells = self._lock_cells(deltas)
+        missing = [key for key, (count, _) in deltas.items() if key not in cells and count > 0]
+        if missing:
+            self.bulk_create(
+                [EmotionDailyAggregate(**dict(zip(self.KEY_FIELDS, key))) for key in missing],
+                batch_size=1000, ignore_conflicts=True
+            )
+            cells.update(self._lock_cells(missing))
+
+        updated = []
+        for key, (count, degree_sum) in deltas.items():
+            cell = cells.get(key)
+            if cell is None:
+                # Retrait d'une déclaration absente du cube (cellule supprimée avec son entité)
+                continue
+            cell.emotion_count = F('emotion_count') + count
+            cell.degree_sum = F('degree_sum') + degree_sum
+            cell.participant_count = F('participant_count') + count
+            updated.append(cell)
+        self.bulk_update(updated, ['emotion_count', 'degree_sum', 'participant_count'], batch_size=500)
+
+    def record(self, organization, date, period, half_day, emotion_type, emotion_degree, sign=1):
+        """
+        Ajoute (sign=1) ou retire (sign=-1) une déclaration de la cellule
+        (équipe, date, période, demi-journée, type d'émotion) du cube
+        """
+        key = (
+            organization['team_id'], organization['service_id'], organization['cluster_id'],
+            organization['company_id'], date, period, half_day, emotion_type
+        )
+        self._apply({key: [sign, sign * emotion_degree]})
+
+    def record_many(self, emotions, organizations):
+        """
+        Ajoute un lot de nouvelles déclarations au cube.
+        organizations associe chaque collaborator_id à son rattachement (voir get_organization).
+        """
+        deltas = {}
+        for emotion in emotions:
+            organization = organizations[emotion.collaborator_id]
+            key = (
+                organization['team_id'], organization['service_id'], organization['cluster_id'],
+                organization['company_id'], emotion.date, emotion.period, emotion.half_day,
+                emotion.emotion_type.emotion
+            )
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += 1
+            delta[1] += emotion.emotion_degree
+        self._apply(deltas)
+
+    def rebuild(self, start_date=None, end_date=None, batch_size=1000):
+        """
+        Reconstruit le cube à partir de l'historique des déclarations
+        (sur toute la table, ou sur une plage de dates)
+        """
+        emotions = Emotion.objects.all()
+        cells = self.all()
+        if start_date:
+            emotions = emotions.filter(date__gte=start_date)
+            cells = cells.filter(date__gte=start_date)
+        if end_date:
+            emotions = emotions.filter(date__lte=end_date)
+            cells = cells.filter(date__lte=end_date)
+
+        # Rattachement enregistré sur la déclaration, à défaut rattachement actuel du collaborateur
+        declared = {
+            f'cube_{field}': Case(
+                When(declared_company__isnull=True, then=F(f'collaborator__{field}')),
+                default=F(f'declared_{field}')
+            )
+            for field in self.ORGANIZATION_FIELDS
+        }
+        rows = emotions.order_by().annotate(**declared).values(
+            *declared, 'date', 'period', 'half_day', 'emotion_type__emotion'
+        ).annotate(
+            emotion_count=Count('id'),
+            degree_sum=Sum('emotion_degree'),
+            participant_count=Count('collaborator', distinct=True)
+        )
+
+        total = 0
+        with transaction.atomic():
+            cells.delete()
+            batch = []
+            for row in rows.iterator(chunk_size=2000):
+                batch.append(EmotionDailyAggregate(
+                    team_id=row['cube_team'],
+                    service_id=row['cube_service'],
+                    cluster_id=row['cube_cluster'],
+                    company_id=row['cube_company'],
+                    date=row['date'],
+                    period=row['period'],
+                    half_day=row['half_day'],
+                    emotion_type=row['emotion_type__emotion'],
+                    emotion_count=row['emotion_count'],
+                    degree_sum=row['degree_sum'] or 0,
+                    participant_count=row['participant_count']
+                ))
+                if len(batch) >= batch_size:
+                    self.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            self.bulk_create(batch)
+            total += len(batch)
+
+        return total
+
+
+# Remplace NULL (collaborateur sans équipe, service ou cluster) dans la contrainte d'unicité
+# du cube : PostgreSQL considère deux NULL comme distincts
+AGGREGATE_NULL_KEY = uuid.UUID(int=0)
+
+
+class EmotionDailyAggregate(models.Model):
+    """
+    Cube journalier pré-agrégé des déclarations par (équipe, date, période, demi-journée,
+    type d'émotion). Le service, le cluster et l'entreprise du collaborateur sont conservés
+    pour le roll-up vers les niveaux supérieurs. Maintenu à chaque écriture, reconstructible
+    depuis l'historique.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_aggregates')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_aggregates')
+    cluster = models.ForeignKey(Cluster, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_aggregates')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='daily_aggregates')
+
+    date = models.DateField(verbose_name="Date")
+    period = models.CharField(max_length=10, choices=Emotion.PERIOD_CHOICES, verbose_name="Période")
+    # Demi-journée de la déclaration (heure de saisie, voir Emotion.half_day), lue par les statistiques journalières
+    half_day = models.BooleanField(default=False, verbose_name="Demi-journée")
+    emotion_type = models.CharField(max_length=50, verbose_name="Code émotion")
+
+    emotion_count = models.IntegerField(default=0, verbose_name="Nombre de déclarations")
+    degree_sum = models.IntegerField(default=0, verbose_name="Somme des degrés")
+    # Un collaborateur déclare au plus une émotion par (date, période) :
+    # à ce grain, le nombre de participants distincts est additif entre types d'émotion
+    participant_count = models.IntegerField(default=0, verbose_name="Participants distincts")
+
+    objects = EmotionDailyAggregateManager()
+
+    class Meta:
+        verbose_name = "Agrégat journalier d'émotions"
+        verbose_name_plural = "Agrégats journaliers d'émotions"
+        constraints = [
+            models.UniqueConstraint(
+                Coalesce('team', Value(AGGREGATE_NULL_KEY)),
+                Coalesce('service', Value(AGGREGATE_NULL_KEY)),
+                Coalesce('cluster', Value(AGGREGATE_NULL_KEY)),
+                'company', 'date', 'period', 'half_day', 'emotion_type',
+                name='emotion_daily_aggregate_cell',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'date']),
+            models.Index(fields=['cluster', 'date']),
+            models.Index(fields=['service', 'date']),
+            models.Index(fields=['team', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} - {self.date} ({self.period}) - {self.emotion_type}: {self.emotion_count}"
+
+
+class CollaboratorAlertStateManager(models.Manager):
+    """Manager pour le verrouillage des états d'alerte des collaborateurs"""
+
+    def lock(self, collaborator_ids, create=True):
+        """
+        Retourne les états des collaborateurs (créés si besoin, sauf create=False),
+        verrouillés jusqu'à la fin de la transaction, indexés par collaborator_id
+        """
+        collaborator_ids = set(collaborator_ids)
+        queryset = self.select_for_update(of=('self',)).select_related('collaborator', 'streak_alert')
+        states = {state.collaborator_id: state for state in queryset.filter(collaborator_id__in=collaborator_ids)}
+        missing = collaborator_ids - set(states)
+        if missing and create:
+            self.bulk_create(
+                [CollaboratorAlertState(collaborator_id=pk) for pk in missing], ignore_conflicts=True
+            )
+            states.update({state.collaborator_id: state for state in queryset.filter(collaborator_id__in=missing)})
+        return states
+
+
+class CollaboratorAlertState(models.Model):
+    """
+    État glissant d'un collaborateur pour la détection incrémentale des alertes :
+    série de déclarations négatives consécutives jusqu'à la dernière déclaration
+    """
+    STATE_FIELDS = ['negative_streak', 'last_date', 'last_period', 'last_degree', 'streak_alert']
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    collaborator = models.OneToOneField(Collaborator, on_delete=models.CASCADE, related_name='alert_state')
+
+    negative_streak = models.IntegerField(default=0, verbose_name="Déclarations négatives consécutives")
+    last_date = models.DateField(null=True, blank=True, verbose_name="Date de la dernière déclaration")
+    last_period = models.CharField(max_length=10, choices=Emotion.PERIOD_CHOICES, blank=True, verbose_name="Période de la dernière déclaration")
+    last_degree = models.IntegerField(null=True, blank=True, verbose_name="Degré de la dernière déclaration")
+
+    # Alerte levée par la série en cours
+    streak_alert = models.ForeignKey(Alert, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CollaboratorAlertStateManager()
+
+    class Meta:
+        verbose_name = "État d'alerte d'un collaborateur"
+        verbose_name_plural = "États d'alerte des collaborateurs"
+
+    def __str__(self):
+        return f"{self.collaborator_id} - série négative: {self.negative_streak}"
+
+
+class GroupAlertStateManager(models.Manager):
+    """Manager pour le verrouillage des états d'alerte des équipes et services"""
+
+    def lock(self, team_ids=(), service_ids=(), create=True):
+        """
+        Retourne les états des équipes et services (créés si besoin, sauf create=False),
+        verrouillés jusqu'à la fin de la transaction, indexés par ('team', id) ou ('service', id)
+        """
+        states = {}
+        queryset = self.select_for_update(of=('self',)).select_related(
+            'team', 'service', 'mood_alert', 'participation_alert'
+        )
+        for field, ids in (('team', set(team_ids) - {None}), ('service', set(service_ids) - {None})):
+            if not ids:
+                continue
+            lookup = f'{field}_id__in'
+            found = {getattr(state, f'{field}_id'): state for state in queryset.filter(**{lookup: ids})}
+            missing = ids - set(found)
+            if missing and create:
+                self.bulk_create(
+                    [GroupAlertState(**{f'{field}_id': pk}) for pk in missing], ignore_conflicts=True
+                )
+                found.update({getattr(state, f'{field}_id'): state for state in queryset.filter(**{lookup: missing})})
+            states.update({(field, pk): state for pk, state in found.items()})
+        return states
+
+
+class GroupAlertState(models.Model):
+    """
+    État glissant d'une équipe ou d'un service (un seul renseigné) : humeur sur
+    une fenêtre de jours et participation du jour en cours
+    """
+    STATE_FIELDS = [
+        'mood_window', 'current_date', 'participant_count', 'member_count',
+        'mood_alert', 'participation_alert',
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='alert_state')
+    service = models.OneToOneField(Service, on_delete=models.CASCADE, null=True, blank=True, related_name='alert_state')
+
+    # Une entrée [date ISO, somme des degrés, nombre de déclarations] par jour de la fenêtre
+    mood_window = models.JSONField(default=list, blank=True, verbose_name="Humeur par jour")
+
+    # Participation du jour en cours (collaborateurs distincts / membres actifs)
+    current_date = models.DateField(null=True, blank=True, verbose_name="Jour en cours")
+    participant_count = models.IntegerField(default=0, verbose_name="Participants du jour")
+    member_count = models.IntegerField(default=0, verbose_name="Membres actifs")
+
+    # Alertes levées par l'état courant
+    mood_alert = models.ForeignKey(Alert, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    participation_alert = models.ForeignKey(Alert, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GroupAlertStateManager()
+
+    class Meta:
+        verbose_name = "État d'alerte d'une équipe ou d'un service"
+        verbose_name_plural = "États d'alerte des équipes et services"
+
+    @property
+    def target_field(self):
+        return 'team' if self.team_id else 'service'
+
+    @property
+    def target(self):
+        return self.team if self.team_id else self.service
+
+    @property
+    def target_label(self):
+        if self.team_id:
+            return f"l'équipe {self.team.team_name}"
+        return f"le service {self.service.service_name}"
+
+    def add_mood(self, date, emotion_degree, window_days, sign=1):
+        """
+        Ajoute (sign=1) ou retire (sign=-1) une déclaration de la fenêtre d'humeur,
+        bornée à window_days jours ; retourne False si la date est hors fenêtre
+        """
+        reference = max(self.current_date or date, date)
+        start = (reference - timezone.timedelta(days=window_days - 1)).isoformat()
+        key = date.isoformat()
+        if key < start:
+            return False
+
+        buckets = {day: [total, count] for day, total, count in self.mood_window if day >= start}
+        bucket = buckets.setdefault(key, [0, 0])
+        bucket[0] += sign * emotion_degree
+        bucket[1] += sign
+        self.mood_window = [[day, total, count] for day, (total, count) in sorted(buckets.items()) if count > 0]
+        return True
+
+    def mood_average(self):
+        """(humeur moyenne, nombre de déclarations) sur la fenêtre"""
+        total = sum(bucket[1] for bucket in self.mood_window)
+        count = sum(bucket[2] for bucket in self.mood_window)
+        return (round(total / count, 2) if count else None), count
+
+    def participation_rate(self):
+        if not self.member_count:
+            return None
+        return round(self.participant_count / self.member_count * 100, 2)
+
+    def __str__(self):
+        return f"{self.target} - humeur: {self.mood_average()[0]}"
@@ -0,0 +1,217 @@
+"""
+Modes de pagination optionnels pour les listes volumineuses (émotions, alertes).
+
+- ?pagination=cursor : pagination par clé (keyset) sur l'ordre de la liste,
+  sans COUNT ni OFFSET, à coût constant quelle que soit la profondeur ;
+- ?pagination=estimated : pagination par numéro de page dont le total est
+  estimé par le planificateur PostgreSQL au-delà d'un seuil.
+Sans paramètre, la pagination globale (PageNumberPagination) s'applique.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """Nombre de lignes estimé par EXPLAIN (PostgreSQL uniquement, None sinon)"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPage(Page):
+    """Page dont la présence d'une page suivante ne dépend pas du total estimé"""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator dont le total est exact pour les petits querysets et estimé au-delà
+    de PAGINATION_EXACT_COUNT_THRESHOLD lignes
+    """
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < settings.PAGINATION_EXACT_COUNT_THRESHOLD:
+            self.count_is_estimate = False
+            return self.object_list.count()
+        self.count_is_estimate = True
+        return estimate
+
+    def validate_number(self, number):
+        # Le total étant approximatif, les pages au-delà de l'estimation restent valides
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Le numéro de page doit être un entier')
+        if number < 1:
+            raise EmptyPage('Le numéro de page doit être supérieur ou égal à 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(items[:self.per_page], number, self, len(items) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """Pagination par numéro de page avec total estimé (?pagination=estimated)"""
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_estimate', paginator.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par clé (vers l'avant) : le curseur encode les valeurs de tri
+    de la dernière ligne et la page suivante est filtrée sur (tri) < curseur.
+    Le dernier champ de `ordering` doit être unique.
+    """
+    ordering = None
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        page = rows[:self.page_size]
+        self.next_position = self._position(page[-1]) if len(rows) > self.page_size else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def _fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def _position(self, obj):
+        # Instance de modèle ou ligne values()
+        if isinstance(obj, dict):
+            return [obj[name] for name, _ in self._fields()]
+        return [getattr(obj, name) for name, _ in self._fields()]
+
+    def _after(self, position):
+        # (a, b, c) < (x, y, z)  <=>  a < x OU (a = x ET b < y) OU (a = x ET b = y ET c < z)
+        condition = None
+        equal = {}
+        for (name, descending), value in zip(self._fields(), position):
+            step = Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": value})
+            condition = step if condition is None else condition | step
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            fields = self._fields()
+            if len(values) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound('Curseur invalide')
+
+
+class EmotionCursorPagination(KeysetPagination):
+    ordering = ('-date', '-creation_date', '-id')
+
+
+class AlertCursorPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class SelectablePaginationMixin:
+    """
+    Permet au client de choisir le mode de pagination d'une liste :
+    ?pagination=cursor (ou un paramètre cursor), ?pagination=estimated
+    """
+    cursor_pagination_class = None
+    estimated_pagination_class = EstimatedCountPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            mode = params.get('pagination')
+            if (mode == 'cursor' or 'cursor' in params) and self.cursor_pagination_class:
+                pagination_class = self.cursor_pagination_class
+            elif mode == 'estimated':
+                pagination_class = self.estimated_pagination_class
+            else:
+                pagination_class = self.pagination_class
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
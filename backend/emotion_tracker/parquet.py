@@ -0,0 +1,204 @@
+"""
+Export analytique des déclarations d'émotions au format Parquet (pyarrow).
+
+Les faits (colonnes propres à Emotion) sont lus par paquets sans jointure ;
+les dimensions (type d'émotion, collaborateur, équipe, service, cluster,
+entreprise) sont résolues depuis des dictionnaires chargés à la demande.
+Chaque mois (year, month — index existant sur Emotion) forme un row group,
+ou un fichier distinct en partitionnement Hive (year=AAAA/month=MM).
+"""
+import os
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import Collaborator, EmotionType
+
+FACT_FIELDS = [
+    'id', 'emotion_id', 'collaborator_id', 'emotion_type_id', 'date', 'period', 'half_day',
+    'year', 'month', 'week_number', 'emotion_degree', 'comment', 'creation_date',
+]
+
+COLLABORATOR_FIELDS = [
+    'id', 'collaborator_id', 'first_name', 'last_name', 'role',
+    'team_id', 'team__team_name', 'service_id', 'service__service_name',
+    'cluster_id', 'cluster__name', 'company_id', 'company__name',
+]
+
+# Colonnes à faible cardinalité, encodées en dictionnaire
+DICTIONARY_COLUMNS = [
+    'period', 'emotion_type', 'emotion_type_name', 'role',
+    'team_name', 'service_name', 'cluster_name', 'company_name',
+]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImproperlyConfigured(
+            "L'export Parquet nécessite pyarrow (pip install pyarrow)"
+        ) from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _build_schema(pa):
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.string()),
+        ('emotion_id', pa.string()),
+        ('date', pa.date32()),
+        ('period', text),
+        ('half_day', pa.bool_()),
+        ('year', pa.int16()),
+        ('month', pa.int8()),
+        ('week_number', pa.int8()),
+        ('emotion_type', text),
+        ('emotion_type_name', text),
+        ('emotion_degree', pa.int8()),
+        ('comment', pa.string()),
+        ('creation_date', pa.timestamp('us', tz='UTC')),
+        ('collaborator', pa.string()),
+        ('collaborator_id', pa.string()),
+        ('collaborator_name', pa.string()),
+        ('role', text),
+        ('team_id', pa.string()),
+        ('team_name', text),
+        ('service_id', pa.string()),
+        ('service_name', text),
+        ('cluster_id', pa.string()),
+        ('cluster_name', text),
+        ('company_id', pa.string()),
+        ('company_name', text),
+    ])
+
+
+def _to_str(value):
+    return str(value) if value is not None else None
+
+
+class ParquetEmotionExporter:
+    """Écrit un queryset d'émotions (déjà filtré selon le périmètre) en Parquet"""
+
+    def __init__(self, batch_size=None, compression=None):
+        self.pa, self.pq = _import_pyarrow()
+        self.schema = _build_schema(self.pa)
+        self.batch_size = batch_size or settings.EMOTION_PARQUET_BATCH_SIZE
+        self.compression = compression or settings.EMOTION_PARQUET_COMPRESSION
+        self._emotion_types = {
+            pk: (code, name) for pk, code, name in EmotionType.objects.values_list('id', 'emotion', 'name')
+        }
+        self._collaborators = {}
+
+    def partitions(self, queryset):
+        """Mois (year, month) présents dans le queryset, dans l'ordre chronologique"""
+        return list(
+            queryset.filter(year__isnull=False, month__isnull=False)
+            .order_by('year', 'month').values_list('year', 'month').distinct()
+        )
+
+    def export_file(self, queryset, sink):
+        """Écrit tout le queryset dans un seul fichier (un row group par mois au minimum)"""
+        total = 0
+        with self.pq.ParquetWriter(sink, self.schema, compression=self.compression) as writer:
+            for year, month in self.partitions(queryset):
+                total += self._write_partition(queryset.filter(year=year, month=month), writer)
+        return total
+
+    def export_partitions(self, queryset, root, overwrite=False):
+        """
+        Écrit un fichier par mois sous root/year=AAAA/month=MM/.
+        Les mois clos déjà exportés sont conservés sauf si overwrite ;
+        le mois en cours est toujours réécrit.
+        """
+        today = date.today()
+        results = []
+        for year, month in self.partitions(queryset):
+            directory = os.path.join(root, f'year={year}', f'month={month:02d}')
+            path = os.path.join(directory, 'part-0.parquet')
+            closed = (year, month) < (today.year, today.month)
+            if closed and not overwrite and os.path.exists(path):
+                results.append({'year': year, 'month': month, 'rows': None, 'path': path})
+                continue
+
+            os.makedirs(directory, exist_ok=True)
+            temporary = f'{path}.tmp'
+            with self.pq.ParquetWriter(temporary, self.schema, compression=self.compression) as writer:
+                rows = self._write_partition(queryset.filter(year=year, month=month), writer)
+            os.replace(temporary, path)
+            results.append({'year': year, 'month': month, 'rows': rows, 'path': path})
+        return results
+
+    def _write_partition(self, queryset, writer):
+        rows = queryset.order_by('date', 'period').values_list(*FACT_FIELDS)
+        batch, total = [], 0
+        for row in rows.iterator(chunk_size=min(self.batch_size, 10000)):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                writer.write_batch(self._to_record_batch(batch))
+                total += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(self._to_record_batch(batch))
+            total += len(batch)
+        return total
+
+    def _load_collaborators(self, collaborator_ids):
+        missing = [pk for pk in collaborator_ids if pk not in self._collaborators]
+        if missing:
+            for row in Collaborator.objects.filter(id__in=missing).values(*COLLABORATOR_FIELDS):
+                self._collaborators[row['id']] = row
+
+    def _to_record_batch(self, rows):
+        pa = self.pa
+        (ids, emotion_ids, collaborator_pks, emotion_type_ids, dates, periods, half_days,
+         years, months, weeks, degrees, comments, creation_dates) = zip(*rows)
+
+        self._load_collaborators(set(collaborator_pks))
+        collaborators = [self._collaborators.get(pk, {}) for pk in collaborator_pks]
+        emotion_types = [self._emotion_types.get(pk, (None, None)) for pk in emotion_type_ids]
+
+        def dimension(key, convert=None):
+            values = [collaborator.get(key) for collaborator in collaborators]
+            return [convert(value) for value in values] if convert else values
+
+        columns = {
+            'id': [_to_str(value) for value in ids],
+            'emotion_id': list(emotion_ids),
+            'date': list(dates),
+            'period': list(periods),
+            'half_day': list(half_days),
+            'year': list(years),
+            'month': list(months),
+            'week_number': list(weeks),
+            'emotion_type': [code for code, _ in emotion_types],
+            'emotion_type_name': [name for _, name in emotion_types],
+            'emotion_degree': list(degrees),
+            'comment': list(comments),
+            'creation_date': list(creation_dates),
+            'collaborator': [_to_str(value) for value in collaborator_pks],
+            'collaborator_id': dimension('collaborator_id'),
+            'collaborator_name': [
+                f"{collaborator['first_name']} {collaborator['last_name']}" if collaborator else None
+                for collaborator in collaborators
+            ],
+            'role': dimension('role'),
+            'team_id': dimension('team_id', _to_str),
+            'team_name': dimension('team__team_name'),
+            'service_id': dimension('service_id', _to_str),
+            'service_name': dimension('service__service_name'),
+            'cluster_id': dimension('cluster_id', _to_str),
+            'cluster_name': dimension('cluster__name'),
+            'company_id': dimension('company_id', _to_str),
+            'company_name': dimension('company__name'),
+        }
+
+        arrays = []
+        for field in self.schema:
+            if field.name in DICTIONARY_COLUMNS:
+                arrays.append(pa.array(columns[field.name], pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(columns[field.name], field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
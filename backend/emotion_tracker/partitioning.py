@@ -0,0 +1,272 @@
+"""
+Partitionnement mensuel de la table des déclarations d'émotions (PostgreSQL).
+
+La table Emotion est partitionnée par plage sur `date`, une partition par mois
+(emotion_tracker_emotion_pAAAA_MM) plus une partition par défaut qui recueille
+les dates sans partition. Les requêtes de l'ORM ne changent pas : tout filtre
+sur `date` (plages des tendances, listes, exports) est élagué par le
+planificateur aux seules partitions concernées.
+
+PostgreSQL impose que la clé de partitionnement figure dans les contraintes
+d'unicité : la clé primaire devient (id, date) et emotion_id est unique par
+(emotion_id, date) — emotion_id contient déjà la date de la déclaration.
+"""
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Emotion
+
+TABLE = Emotion._meta.db_table
+PARTITIONED_TABLE = f'{TABLE}_partitioned'
+LEGACY_TABLE = f'{TABLE}_legacy'
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_KEY = 'date'
+
+BOUND_PATTERN = re.compile(r"FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _next_month(month_start):
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def iter_months(start, end):
+    """Premiers jours des mois de start à end inclus"""
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = _next_month(month)
+
+
+def partition_name(month_start):
+    return f'{TABLE}_p{month_start.year}_{month_start.month:02d}'
+
+
+def is_partitioned():
+    """La table des émotions est-elle partitionnée ? (toujours False hors PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [TABLE]
+        )
+        return cursor.fetchone()[0]
+
+
+def list_partitions():
+    """Partitions attachées : [(nom, début inclus, fin exclue)], (nom, None, None) pour la partition par défaut"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            ORDER BY child.relname
+            """,
+            [TABLE]
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or '')
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+def _create_partition(cursor, parent, month_start):
+    cursor.execute(
+        f'CREATE TABLE {_quote(partition_name(month_start))} PARTITION OF {_quote(parent)} '
+        f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{_next_month(month_start).isoformat()}')"
+    )
+
+
+def _table_definition(cursor, table):
+    """Index et contraintes d'une table, lus dans le catalogue"""
+    cursor.execute(
+        """
+        SELECT con.conname, con.contype, pg_get_constraintdef(con.oid),
+               ARRAY(
+                   SELECT att.attname FROM unnest(con.conkey) WITH ORDINALITY AS key(attnum, position)
+                   JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = key.attnum
+                   ORDER BY key.position
+               ),
+               con.conindid::regclass::text
+        FROM pg_constraint con
+        WHERE con.conrelid = to_regclass(%s)
+        """,
+        [table]
+    )
+    constraints = cursor.fetchall()
+    constraint_indexes = {row[4] for row in constraints if row[1] in ('p', 'u')}
+
+    cursor.execute(
+        'SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s',
+        [table]
+    )
+    indexes = [(name, definition) for name, definition in cursor.fetchall() if name not in constraint_indexes]
+    return constraints, indexes
+
+
+def _legacy_name(name):
+    # Les noms PostgreSQL sont limités à 63 caractères
+    return f'{name[:55]}_legacy'
+
+
+def convert_to_partitioned(months_ahead=None, drop_legacy=False):
+    """
+    Convertit la table des émotions en table partitionnée par mois, en une transaction :
+    copie des lignes, bascule des noms, puis recréation des contraintes et index
+    (propagés à chaque partition). L'ancienne table est conservée sous le nom
+    emotion_tracker_emotion_legacy, sauf drop_legacy. Retourne le nombre de lignes copiées.
+    """
+    months_ahead = settings.EMOTION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    if is_partitioned():
+        return 0
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Les lectures restent possibles pendant la copie, pas les écritures
+        cursor.execute(f'LOCK TABLE {_quote(TABLE)} IN EXCLUSIVE MODE')
+        constraints, indexes = _table_definition(cursor, TABLE)
+
+        cursor.execute(f'SELECT MIN({PARTITION_KEY}), MAX({PARTITION_KEY}) FROM {_quote(TABLE)}')
+        first_date, last_date = cursor.fetchone()
+        today = timezone.localdate()
+        horizon = today.replace(day=1)
+        for _ in range(months_ahead):
+            horizon = _next_month(horizon)
+
+        cursor.execute(
+            f'CREATE TABLE {_quote(PARTITIONED_TABLE)} '
+            f'(LIKE {_quote(TABLE)} INCLUDING DEFAULTS INCLUDING STORAGE) '
+            f'PARTITION BY RANGE ({_quote(PARTITION_KEY)})'
+        )
+        for month_start in iter_months(min(first_date or today, today), max(last_date or horizon, horizon)):
+            _create_partition(cursor, PARTITIONED_TABLE, month_start)
+        cursor.execute(
+            f'CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {_quote(PARTITIONED_TABLE)} DEFAULT'
+        )
+
+        cursor.execute(f'INSERT INTO {_quote(PARTITIONED_TABLE)} SELECT * FROM {_quote(TABLE)}')
+        copied = cursor.rowcount
+
+        # Libérer les noms de contraintes et d'index pour la nouvelle table
+        for name, kind, _, _, _ in constraints:
+            if kind in ('p', 'u'):
+                cursor.execute(
+                    f'ALTER TABLE {_quote(TABLE)} RENAME CONSTRAINT {_quote(name)} TO {_quote(_legacy_name(name))}'
+                )
+        for name, _ in indexes:
+            cursor.execute(f'ALTER INDEX {_quote(name)} RENAME TO {_quote(_legacy_name(name))}')
+        cursor.execute(f'ALTER TABLE {_quote(TABLE)} RENAME TO {_quote(LEGACY_TABLE)}')
+        cursor.execute(f'ALTER TABLE {_quote(PARTITIONED_TABLE)} RENAME TO {_quote(TABLE)}')
+
+        for name, kind, definition, columns, _ in constraints:
+            if kind == 'p':
+                keys = columns if PARTITION_KEY in columns else columns + [PARTITION_KEY]
+                definition = f"PRIMARY KEY ({', '.join(_quote(column) for column in keys)})"
+            elif kind == 'u':
+                keys = columns if PARTITION_KEY in columns else columns + [PARTITION_KEY]
+                definition = f"UNIQUE ({', '.join(_quote(column) for column in keys)})"
+            cursor.execute(f'ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(name)} {definition}')
+        for _, definition in indexes:
+            # La définition désigne la table par son nom, désormais celui de la table partitionnée
+            cursor.execute(definition)
+
+        if drop_legacy:
+            cursor.execute(f'DROP TABLE {_quote(LEGACY_TABLE)}')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {_quote(TABLE)}')
+    return copied
+
+
+def create_partitions(start, end):
+    """
+    Crée les partitions mensuelles manquantes de start à end inclus.
+    Les lignes déjà tombées dans la partition par défaut pour un mois créé y sont déplacées.
+    Retourne les noms des partitions créées.
+    """
+    existing = {lower for _, lower, _ in list_partitions() if lower}
+    has_default = any(lower is None for _, lower, _ in list_partitions())
+    created = []
+
+    for month_start in iter_months(start, end):
+        if month_start in existing:
+            continue
+        bounds = [month_start, _next_month(month_start)]
+        with transaction.atomic(), connection.cursor() as cursor:
+            pending = False
+            if has_default:
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {_quote(DEFAULT_PARTITION)} '
+                    f'WHERE {_quote(PARTITION_KEY)} >= %s AND {_quote(PARTITION_KEY)} < %s)',
+                    bounds
+                )
+                pending = cursor.fetchone()[0]
+
+            if pending:
+                # Une partition ne peut couvrir des lignes présentes dans la partition par défaut
+                cursor.execute(f'ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(DEFAULT_PARTITION)}')
+                _create_partition(cursor, TABLE, month_start)
+                cursor.execute(
+                    f'INSERT INTO {_quote(TABLE)} SELECT * FROM {_quote(DEFAULT_PARTITION)} '
+                    f'WHERE {_quote(PARTITION_KEY)} >= %s AND {_quote(PARTITION_KEY)} < %s',
+                    bounds
+                )
+                cursor.execute(
+                    f'DELETE FROM {_quote(DEFAULT_PARTITION)} '
+                    f'WHERE {_quote(PARTITION_KEY)} >= %s AND {_quote(PARTITION_KEY)} < %s',
+                    bounds
+                )
+                cursor.execute(
+                    f'ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(DEFAULT_PARTITION)} DEFAULT'
+                )
+            else:
+                _create_partition(cursor, TABLE, month_start)
+        created.append(partition_name(month_start))
+    return created
+
+
+def ensure_partitions(months_ahead=None, today=None):
+    """Crée les partitions du mois en cours et des months_ahead mois suivants"""
+    months_ahead = settings.EMOTION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    start = (today or timezone.localdate()).replace(day=1)
+    end = start
+    for _ in range(months_ahead):
+        end = _next_month(end)
+    return create_partitions(start, end)
+
+
+def detach_partitions(before, drop=False):
+    """
+    Détache les partitions entièrement antérieures au mois de `before`.
+    Le détachement ne déplace aucune donnée : les tables détachées restent
+    interrogeables (archivage, export) ou sont supprimées si drop.
+    Retourne les noms des partitions détachées.
+    """
+    limit = before.replace(day=1)
+    detached = []
+    for name, _, upper in list_partitions():
+        if upper is None or upper > limit:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {_quote(name)}')
+        detached.append(name)
+    return detached
@@ -0,0 +1,330 @@
+"""
+Suite de non-régression des performances : endpoints de l'API et calculs de tendances.
+
+Pour chaque échelle, une organisation synthétique (synthetic.py) est générée dans
+une transaction annulée à la fin, puis chaque scénario est exécuté plusieurs fois.
+On relève le nombre de requêtes SQL (maximum), les latences p50/p95 et le pic de
+mémoire Python (tracemalloc, sur une exécution dédiée), comparés à la référence
+enregistrée (PERF_BASELINE_PATH) selon les budgets PERF_BUDGET_*.
+"""
+import json
+import os
+import platform
+import tracemalloc
+from datetime import timedelta
+from fnmatch import fnmatch
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from . import cache as dashboard_cache
+from .benchmarks import measure, percentile, register, run_benchmark
+from .models import Alert, Cluster, Collaborator, Company, EmotionDailyAggregate, EmotionRollup, Service, Team
+from .scopes import HIERARCHY_SCOPE
+from .synthetic import DeclarationGenerator, OrganizationGenerator, OrganizationSpec
+
+SCALES = {
+    'small': OrganizationSpec(clusters=1, services=2, teams=2, employees=8, years=0.25, prefix='PERFS'),
+    'medium': OrganizationSpec(clusters=2, services=3, teams=4, employees=12, years=0.5, prefix='PERFM'),
+    'large': OrganizationSpec(clusters=3, services=4, teams=5, employees=20, years=1, prefix='PERFL'),
+}
+DEFAULT_SCALES = ('small', 'medium')
+
+TREND_ENTITIES = ('company', 'cluster', 'service', 'team')
+TREND_PERIODS = ('daily', 'weekly', 'monthly', 'quarterly')
+
+METRICS = ('queries', 'p50_ms', 'p95_ms', 'peak_kb')
+
+# Clé de la référence décrivant, par échelle, la commande et l'environnement de mesure
+GENERATED_KEY = '_generated'
+
+
+class PerfContext:
+    """Jeu de données d'une échelle : utilisateurs types et entités de référence"""
+
+    def __init__(self, spec):
+        from rest_framework.test import APIRequestFactory
+
+        self.spec = spec
+        # Hôte accepté par ALLOWED_HOSTS (liens de pagination absolus)
+        self.factory = APIRequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        collaborators = Collaborator.objects.filter(collaborator_id__startswith=spec.prefix)
+        self.employee = collaborators.filter(role='employee').order_by('collaborator_id').first()
+        self.manager = collaborators.filter(role='manager').annotate(
+            reports=Count('managed_collaborators')
+        ).order_by('-reports', 'collaborator_id').first()
+        self.director = collaborators.filter(role='director').order_by('collaborator_id').first()
+        self.pole_director = collaborators.filter(role='pole_director').order_by('collaborator_id').first()
+        self.company = Company.objects.get(pk=self.employee.company_id)
+        self.admin = Collaborator.objects.create(
+            collaborator_id=f'{spec.prefix}ADMIN',
+            email=f'{spec.prefix.lower()}.admin@perf.local',
+            first_name='Perf',
+            last_name='Admin',
+            role='admin',
+            company=self.company,
+        )
+        self.entities = {
+            'company': self.company,
+            'cluster': Cluster.objects.filter(company=self.company).order_by('name').first(),
+            'service': Service.objects.filter(company=self.company).order_by('service_name').first(),
+            'team': Team.objects.filter(company=self.company).order_by('team_name').first(),
+        }
+
+    def call(self, viewset, action, user, path, params=None):
+        """Appelle une action de ViewSet et rend la réponse (sérialisation et rendu inclus)"""
+        from rest_framework.test import force_authenticate
+
+        request = self.factory.get(path, params or {})
+        force_authenticate(request, user=user)
+        # Le périmètre est mémorisé sur l'utilisateur : le relire du cache à chaque appel
+        user._user_scope = None
+        # Options de l'action (@action(renderer_classes=...)), transmises par le routeur en production
+        initkwargs = getattr(getattr(viewset, action), 'kwargs', {})
+        response = viewset.as_view({'get': action}, **initkwargs)(request)
+        if response.status_code >= 400:
+            # Une réponse d'erreur ne mesure pas le scénario
+            raise RuntimeError(f'{path}: statut {response.status_code}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.render()
+        return response
+
+
+def build_dataset(spec):
+    """Génère l'organisation, son historique et les données dérivées (écritures à annuler)"""
+    from .alerting import rebuild_alert_states
+
+    organization = OrganizationGenerator(spec)
+    organization.generate()
+    generator = DeclarationGenerator(spec, workers=1)
+    generator.generate(organization.teams)
+    collaborator_ids = [collaborator.pk for collaborator in organization.collaborators]
+    EmotionRollup.objects.rebuild(collaborator_ids)
+    EmotionDailyAggregate.objects.rebuild(generator.start_date, generator.end_date)
+    Collaborator.objects.refresh_moods(collaborator_ids)
+
+    # Quelques alertes ouvertes par équipe pour la liste des alertes non résolues
+    alerts = []
+    for team in organization.teams:
+        for pk, _, full_name in team['members'][:2]:
+            alerts.append(Alert(
+                collaborator_id=pk, alert_type='consecutive_negative', severity='medium',
+                title=f'Émotions négatives consécutives - {full_name}', message='Alerte générée (perf)'
+            ))
+        alerts.append(Alert(
+            team_id=team['team_id'], alert_type='low_team_morale', severity='high',
+            title=f"Moral d'équipe faible - {team['team_name']}", message='Alerte générée (perf)'
+        ))
+    Alert.objects.bulk_create(alerts, batch_size=1000)
+    rebuild_alert_states()
+    analyze_tables()
+    # Identifiants générés identiques d'une exécution à l'autre et données insérées sans signaux :
+    # les périmètres restés en cache d'une exécution précédente (annulée) ne doivent pas servir
+    dashboard_cache._bump([HIERARCHY_SCOPE])
+    return PerfContext(spec)
+
+
+def _maintain_tables(command):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for model in apps.get_app_config('emotion_tracker').get_models():
+            cursor.execute(f'{command} {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def analyze_tables():
+    """
+    Statistiques du planificateur sur les données générées : sans elles, les plans
+    dépendent de l'état laissé par les exécutions précédentes (annulées) et par l'autovacuum
+    """
+    _maintain_tables('ANALYZE')
+
+
+def vacuum_tables():
+    """
+    Récupère les lignes mortes laissées par les jeux de données annulés des exécutions
+    précédentes, qui ralentiraient les parcours (hors transaction)
+    """
+    _maintain_tables('VACUUM')
+
+
+def scenarios(context):
+    """Scénarios mesurés : nom -> fonction sans argument"""
+    from . import views
+
+    def dashboard(user, cold):
+        def run():
+            if cold:
+                dashboard_cache._bump(dashboard_cache.dashboard_scopes(user))
+            return context.call(views.DashboardViewSet, 'data', user, '/api/dashboard/data/', {'days': 30})
+        return run
+
+    def endpoint(viewset, action, user, path, params=None):
+        return lambda: context.call(viewset, action, user, path, params)
+
+    result = {
+        'dashboard.data.manager': dashboard(context.manager, cold=True),
+        'dashboard.data.manager.cached': dashboard(context.manager, cold=False),
+        'dashboard.data.pole_director': dashboard(context.pole_director, cold=True),
+        'emotions.list': endpoint(views.EmotionViewSet, 'list', context.admin, '/api/emotions/'),
+        'emotions.list.cursor': endpoint(
+            views.EmotionViewSet, 'list', context.admin, '/api/emotions/', {'pagination': 'cursor'}
+        ),
+        'emotions.list.director': endpoint(
+            views.EmotionViewSet, 'list', context.director, '/api/emotions/', {'days': 30}
+        ),
+        'emotions.stats': endpoint(
+            views.EmotionViewSet, 'stats', context.director, '/api/emotions/stats/', {'days': 30}
+        ),
+        'emotions.export': endpoint(
+            views.EmotionViewSet, 'export', context.director, '/api/emotions/export/',
+            {'format': 'csv', 'start': (timezone.localdate() - timedelta(days=30)).isoformat()}
+        ),
+        'emotions.today': endpoint(views.EmotionViewSet, 'today', context.employee, '/api/emotions/today/'),
+        'alerts.unresolved': endpoint(views.AlertViewSet, 'unresolved', context.admin, '/api/alerts/unresolved/'),
+    }
+    for name, viewset in (
+        ('companies', views.CompanyViewSet),
+        ('clusters', views.ClusterViewSet),
+        ('services', views.ServiceViewSet),
+        ('teams', views.TeamViewSet),
+        ('collaborators', views.CollaboratorViewSet),
+    ):
+        result[f'org.{name}.list'] = endpoint(viewset, 'list', context.admin, f'/api/{name}/')
+
+    for label in TREND_ENTITIES:
+        entity = context.entities[label]
+        for period in TREND_PERIODS:
+            result[f'trend.{label}.{period}'] = getattr(entity, f'calculate_{period}_emotion_trend')
+    return result
+
+
+def measure_scenario(func, repeats):
+    """Requêtes (max), latences p50/p95 sur `repeats` exécutions et pic mémoire d'une exécution tracée"""
+    timings, queries = [], []
+    for _ in range(repeats):
+        _, elapsed, query_count = measure(func)
+        timings.append(elapsed)
+        queries.append(query_count)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': max(queries),
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+@register('perf_budgets')
+def bench_perf_budgets(scale='small', repeats=10, only=None, **options):
+    """Requêtes, latences p50/p95 et pic mémoire des endpoints et tendances sur une organisation synthétique"""
+    spec = SCALES[scale]
+    context = build_dataset(spec)
+
+    results = []
+    for name, func in scenarios(context).items():
+        if only and not any(fnmatch(name, pattern) for pattern in only):
+            continue
+        results.append({'scale': scale, 'scenario': name, **measure_scenario(func, repeats)})
+    return results
+
+
+def run_suite(scales=DEFAULT_SCALES, repeats=10, only=None):
+    """Exécute la suite pour chaque échelle (une transaction annulée par échelle)"""
+    results = []
+    for scale in scales:
+        vacuum_tables()
+        results.extend(run_benchmark('perf_budgets', scale=scale, repeats=repeats, only=only))
+    return results
+
+
+def load_baseline(path=None):
+    path = path or settings.PERF_BASELINE_PATH
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def measurement_environment(command):
+    """Commande, date et versions (Python, Django, PostgreSQL) d'une mesure, enregistrées avec la référence"""
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW server_version')
+        server_version = cursor.fetchone()[0]
+    return {
+        'command': command,
+        'date': timezone.now().date().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': f'{connection.vendor} {server_version}',
+        'machine': platform.machine(),
+    }
+
+
+def save_baseline(results, path=None, merge=True, environment=None):
+    """
+    Enregistre les mesures comme référence (fusionnées avec la référence existante si merge),
+    avec l'environnement de mesure des échelles mises à jour
+    """
+    path = path or settings.PERF_BASELINE_PATH
+    baseline = load_baseline(path) if merge else {}
+    for row in results:
+        baseline.setdefault(row['scale'], {})[row['scenario']] = {metric: row[metric] for metric in METRICS}
+        if environment:
+            baseline.setdefault(GENERATED_KEY, {})[row['scale']] = environment
+    baseline = {scale: dict(sorted(rows.items())) for scale, rows in sorted(baseline.items())}
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(baseline, handle, indent=2, ensure_ascii=False)
+        handle.write('\n')
+    return baseline
+
+
+def budget_limits(reference):
+    """Valeurs maximales tolérées pour une mesure de référence"""
+    latency_ratio = settings.PERF_BUDGET_LATENCY_RATIO
+    latency_margin = settings.PERF_BUDGET_LATENCY_MIN_MS
+    # Les très petites latences sont dominées par le bruit : marge absolue minimale
+    return {
+        'queries': reference['queries'] + settings.PERF_BUDGET_QUERY_TOLERANCE,
+        'p50_ms': max(reference['p50_ms'] * latency_ratio, reference['p50_ms'] + latency_margin),
+        'p95_ms': max(reference['p95_ms'] * latency_ratio, reference['p95_ms'] + latency_margin),
+        'peak_kb': max(
+            reference['peak_kb'] * settings.PERF_BUDGET_MEMORY_RATIO,
+            reference['peak_kb'] + settings.PERF_BUDGET_MEMORY_MIN_KB
+        ),
+    }
+
+
+def compare(results, baseline):
+    """
+    Compare les mesures à la référence. Chaque ligne reçoit un statut
+    ('ok', 'new' sans référence, 'over' si un budget est dépassé) et la liste des dépassements.
+    """
+    rows = []
+    for row in results:
+        reference = baseline.get(row['scale'], {}).get(row['scenario'])
+        row = dict(row, status='new', violations=[])
+        if reference is not None:
+            limits = budget_limits(reference)
+            row['violations'] = [
+                f"{metric} {row[metric]} > {round(limits[metric], 2)} (réf. {reference[metric]})"
+                for metric in METRICS
+                if row[metric] > limits[metric]
+            ]
+            row['status'] = 'over' if row['violations'] else 'ok'
+        rows.append(row)
+    return rows
@@ -0,0 +1,315 @@
+"""
+Profilage à la demande d'une requête de l'API (administrateurs uniquement).
+
+Une requête portant l'en-tête X-Profile: 1 (ou le paramètre ?_profile=1) émise
+par un administrateur est profilée : échantillonnage périodique de la pile du
+thread qui la traite, chronologie des requêtes SQL avec leur origine dans le
+code de l'application, et répartition du temps entre ORM, sérialisation,
+méthodes des modèles et reste du code. Le profil est écrit dans PROFILING_DIR
+et consultable via /api/profiles/{id}/ (identifiant renvoyé dans l'en-tête X-Profile-Id).
+
+Sans l'indicateur, le middleware se limite à un test sur l'en-tête et le paramètre.
+Sous ASGI, la requête profilée est traitée dans un thread dédié où s'exécute aussi
+la vue synchrone (sync_to_async) : même échantillonnage et même chronologie que sous WSGI.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .authentication import authenticate_request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '_profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SQL_PREVIEW_LENGTH = 500
+
+# Catégories de temps : premier motif reconnu en partant du sommet de la pile
+CATEGORIES = (
+    ('orm', (os.path.join('django', 'db', ''),)),
+    ('serialization', (
+        os.path.join('rest_framework', 'serializers.py'),
+        os.path.join('rest_framework', 'fields.py'),
+        os.path.join('rest_framework', 'renderers.py'),
+        os.path.join(APP_DIR, 'serializers.py'),
+        os.path.join(APP_DIR, 'exports.py'),
+    )),
+    ('model_methods', (os.path.join(APP_DIR, 'models.py'),)),
+)
+
+
+def profiling_requested(request):
+    return request.headers.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_PARAM) == '1'
+
+
+def can_profile(user):
+    return bool(user and user.is_authenticated and (user.is_staff or user.role == 'admin'))
+
+
+def _category(filenames):
+    for filename in filenames:
+        for category, patterns in CATEGORIES:
+            if any(pattern in filename for pattern in patterns):
+                return category
+    return 'other'
+
+
+def _origin(stack):
+    """Dernier appel dans le code de l'application (hors profilage et métriques)"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_DIR) and os.path.basename(frame.filename) not in ('profiling.py', 'metrics.py'):
+            return f'{os.path.relpath(frame.filename, APP_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class StackSampler(threading.Thread):
+    """Échantillonne la pile d'un thread à intervalle fixe (sys._current_frames)"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name, frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                # Du sommet (fonction en cours) vers la racine
+                self.samples[tuple(stack)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class SQLTimeline:
+    """execute_wrapper : chronologie des requêtes SQL et origine dans le code"""
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = time.perf_counter()
+            self.queries.append({
+                'start_ms': round((start - self.started) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3),
+                'sql': sql[:SQL_PREVIEW_LENGTH],
+                'many': many,
+                'origin': _origin(traceback.extract_stack()),
+            })
+
+
+class RequestProfile:
+    """Profil d'une requête : échantillonnage de pile et chronologie SQL"""
+
+    def __init__(self, request):
+        self.request = request
+        self.interval = settings.PROFILING_SAMPLE_INTERVAL_MS / 1000
+        self.started = time.perf_counter()
+        self.sampler = StackSampler(threading.get_ident(), self.interval)
+        self.timeline = SQLTimeline(self.started)
+
+    def run(self, get_response):
+        # Le rendu des réponses DRF (JSON) a lieu avant le retour au middleware : il est inclus
+        self.sampler.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self.timeline))
+                response = get_response(self.request)
+        finally:
+            self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+        return response
+
+    def to_dict(self, user, response):
+        samples = self.sampler.samples
+        total_samples = sum(samples.values()) or 1
+        interval_ms = self.interval * 1000
+
+        categories = Counter()
+        model_methods = Counter()
+        functions = Counter()
+        for stack, count in samples.items():
+            filenames = [filename for filename, _, _ in stack]
+            categories[_category(filenames)] += count
+            filename, name, _ = stack[0]
+            functions[f'{filename}:{name}'] += count
+            for filename, name, _ in stack:
+                if filename == os.path.join(APP_DIR, 'models.py'):
+                    model_methods[name] += count
+                    break
+
+        # Format « folded stacks » (flamegraph.pl, speedscope) : racine;...;sommet nombre
+        folded = [
+            ';'.join(f'{os.path.basename(filename)}:{name}' for filename, name, _ in reversed(stack)) + f' {count}'
+            for stack, count in samples.most_common()
+        ]
+        sql_time = sum(query['duration_ms'] for query in self.timeline.queries)
+
+        return {
+            'id': uuid.uuid4().hex,
+            'created_at': timezone.now().isoformat(),
+            'user': str(user.pk),
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(self.elapsed * 1000, 2),
+            'sample_interval_ms': interval_ms,
+            'samples': sum(samples.values()),
+            'time_breakdown_ms': {
+                category: round(count * interval_ms, 1)
+                for category, count in sorted(categories.items())
+            },
+            'time_breakdown_percent': {
+                category: round(count / total_samples * 100, 1)
+                for category, count in sorted(categories.items())
+            },
+            'model_methods_ms': {
+                name: round(count * interval_ms, 1) for name, count in model_methods.most_common()
+            },
+            'top_functions': [
+                {'function': name, 'ms': round(count * interval_ms, 1)}
+                for name, count in functions.most_common(30)
+            ],
+            'sql': {
+                'count': len(self.timeline.queries),
+                'total_ms': round(sql_time, 3),
+                'by_origin': _sql_by_origin(self.timeline.queries),
+                'timeline': self.timeline.queries,
+            },
+            'folded_stacks': folded,
+        }
+
+
+def _sql_by_origin(queries):
+    groups = defaultdict(lambda: {'count': 0, 'total_ms': 0.0})
+    for query in queries:
+        group = groups[query['origin'] or '(hors application)']
+        group['count'] += 1
+        group['total_ms'] += query['duration_ms']
+    return [
+        {'origin': origin, 'count': group['count'], 'total_ms': round(group['total_ms'], 3)}
+        for origin, group in sorted(groups.items(), key=lambda item: -item[1]['total_ms'])
+    ]
+
+
+class ProfileStore:
+    """Profils enregistrés en JSON dans PROFILING_DIR (les plus anciens au-delà de PROFILING_MAX_STORED sont supprimés)"""
+
+    def __init__(self, directory=None, max_stored=None):
+        self.directory = directory or settings.PROFILING_DIR
+        self.max_stored = settings.PROFILING_MAX_STORED if max_stored is None else max_stored
+
+    def _path(self, profile_id):
+        return os.path.join(self.directory, f'{profile_id}.json')
+
+    def save(self, profile):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile['id']), 'w', encoding='utf-8') as handle:
+            json.dump(profile, handle, ensure_ascii=False)
+        self._prune()
+        return profile['id']
+
+    def _files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')
+        ]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def _prune(self):
+        for path in self._files()[self.max_stored:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, profile_id):
+        # Identifiant hexadécimal uniquement : pas de chemin arbitraire
+        if not profile_id or any(char not in '0123456789abcdef' for char in profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def list(self):
+        """Résumés des profils, du plus récent au plus ancien"""
+        summaries = []
+        for path in self._files():
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    profile = json.load(handle)
+            except (FileNotFoundError, ValueError):
+                continue
+            summaries.append({
+                key: profile.get(key)
+                for key in ('id', 'created_at', 'user', 'method', 'path', 'status', 'duration_ms')
+            })
+        return summaries
+
+
+class RequestProfilingMiddleware:
+    """Profile les requêtes marquées par un administrateur (WSGI et ASGI)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.PROFILING_ENABLED or not profiling_requested(request):
+            return self.get_response(request)
+
+        user = authenticate_request(request)
+        if not can_profile(user):
+            return self.get_response(request)
+        return self._profile(request, user, self.get_response)
+
+    async def __acall__(self, request):
+        if not settings.PROFILING_ENABLED or not profiling_requested(request):
+            return await self.get_response(request)
+
+        user = await sync_to_async(authenticate_request)(request)
+        if not can_profile(user):
+            return await self.get_response(request)
+        # async_to_sync depuis ce thread : le code synchrone de la vue y est exécuté, échantillonné
+        return await sync_to_async(self._profile)(request, user, async_to_sync(self.get_response))
+
+    def _profile(self, request, user, get_response):
+        profile = RequestProfile(request)
+        response = profile.run(get_response)
+        response[PROFILE_ID_HEADER] = ProfileStore().save(profile.to_dict(user, response))
+        return response
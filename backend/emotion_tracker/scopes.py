@@ -0,0 +1,168 @@
+"""
+Résolution du périmètre visible par un utilisateur selon son rôle.
+
+Le périmètre (collaborateurs, équipes, services, clusters visibles) est calculé
+une fois puis mis en cache ; la clé embarque le rôle et le rattachement de
+l'utilisateur ainsi qu'une version globale de la hiérarchie, incrémentée à
+chaque changement de rattachement d'un collaborateur ou de cluster d'un service.
+Toutes les vues filtrent leurs querysets à partir de ce périmètre.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache import KEY_PREFIX, get_versions
+from .models import Collaborator, Service
+
+HIERARCHY_SCOPE = 'hierarchy'
+HIERARCHY_FIELDS = ('manager_id', 'team_id', 'service_id', 'cluster_id')
+SCOPED_ROLES = ('employee', 'manager', 'director', 'pole_director')
+
+
+class UserScope:
+    """
+    Périmètre de données visible par un utilisateur.
+
+    Les membres (collaborateurs sous sa responsabilité) sont désignés par un filtre sur
+    le rattachement (manager_id, service_id ou cluster_id) ; la liste explicite de leurs
+    identifiants n'est conservée que pour les petits périmètres (SCOPE_INLINE_IDS_MAX),
+    afin de ne pas inliner des milliers d'UUID dans chaque requête.
+    Un manager voit la fiche de ses membres et la sienne, mais seulement les déclarations
+    de ses membres ; un employé ne voit que ses propres déclarations.
+    """
+
+    def __init__(self, unrestricted=False, user_id=None, member_lookup=None, member_ids=None,
+                 member_count=0, team_ids=(), service_ids=(), cluster_ids=()):
+        self.unrestricted = unrestricted
+        self.user_id = user_id
+        # Filtre Collaborator désignant les membres (None : aucun membre)
+        self.member_lookup = member_lookup
+        # Identifiants des membres, petits périmètres uniquement (None : utiliser member_lookup)
+        self.member_ids = frozenset(member_ids) if member_ids is not None else None
+        self.member_count = member_count
+        self.team_ids = frozenset(team_ids)
+        self.service_ids = frozenset(service_ids)
+        self.cluster_ids = frozenset(cluster_ids)
+
+    def _members_condition(self, prefix=''):
+        if self.member_ids is not None:
+            return Q(**{f'{prefix}id__in': self.member_ids})
+        if self.member_lookup is None:
+            return Q(**{f'{prefix}id__in': []})
+        return Q(**{f'{prefix}{field}': value for field, value in self.member_lookup.items()})
+
+    def members(self, queryset=None):
+        """Collaborateurs sous la responsabilité de l'utilisateur (statistiques d'équipe)"""
+        queryset = Collaborator.objects.all() if queryset is None else queryset
+        return queryset.filter(self._members_condition())
+
+    def includes(self, collaborator):
+        """
+        L'utilisateur peut-il déclarer pour ce collaborateur (dict ou instance avec
+        id, manager_id, service_id et cluster_id) ?
+        """
+        if self.unrestricted:
+            return True
+        values = collaborator if isinstance(collaborator, dict) else vars(collaborator)
+        if values['id'] == self.user_id:
+            return True
+        if self.member_ids is not None:
+            return values['id'] in self.member_ids
+        return self.member_lookup is not None and all(
+            values[field] == value for field, value in self.member_lookup.items()
+        )
+
+    def filter_collaborators(self, queryset):
+        if self.unrestricted:
+            return queryset
+        return queryset.filter(self._members_condition() | Q(pk=self.user_id))
+
+    def filter_emotions(self, queryset):
+        if self.unrestricted:
+            return queryset
+        if self.member_lookup is None and not self.member_ids:
+            return queryset.filter(collaborator_id=self.user_id)
+        return queryset.filter(self._members_condition('collaborator__'))
+
+    def filter_alerts(self, queryset):
+        if self.unrestricted:
+            return queryset
+        condition = self._members_condition('collaborator__') | Q(collaborator_id=self.user_id)
+        if self.team_ids:
+            condition |= Q(team_id__in=self.team_ids)
+        if self.service_ids:
+            condition |= Q(service_id__in=self.service_ids)
+        return queryset.filter(condition)
+
+    def filter_trends(self, queryset):
+        if self.unrestricted:
+            return queryset
+        return queryset.filter(
+            Q(team_id__in=self.team_ids) | Q(service_id__in=self.service_ids) | Q(cluster_id__in=self.cluster_ids)
+        )
+
+
+def _members_scope(user, member_lookup, **fields):
+    """Périmètre des membres désignés par member_lookup (identifiants conservés si peu nombreux)"""
+    members = Collaborator.objects.filter(**member_lookup)
+    limit = settings.SCOPE_INLINE_IDS_MAX
+    member_ids = list(members.values_list('id', flat=True)[:limit + 1])
+    if len(member_ids) > limit:
+        member_count, member_ids = members.count(), None
+    else:
+        member_count = len(member_ids)
+    return UserScope(
+        user_id=user.pk, member_lookup=member_lookup, member_ids=member_ids, member_count=member_count, **fields
+    )
+
+
+def _resolve(user):
+    """Calcule le périmètre d'un utilisateur (requêtes en base)"""
+    role = user.role
+    if role not in SCOPED_ROLES:
+        return UserScope(unrestricted=True)
+
+    if role == 'employee':
+        return UserScope(user_id=user.pk)
+
+    if role == 'manager':
+        team_ids = Collaborator.objects.filter(
+            manager_id=user.pk, team_id__isnull=False
+        ).values_list('team_id', flat=True).distinct()
+        return _members_scope(user, {'manager_id': user.pk}, team_ids=list(team_ids))
+
+    if role == 'director':
+        if not user.service_id:
+            return UserScope(user_id=user.pk, member_ids=[])
+        return _members_scope(user, {'service_id': user.service_id}, service_ids=[user.service_id])
+
+    if not user.cluster_id:
+        return UserScope(user_id=user.pk, member_ids=[])
+    return _members_scope(
+        user, {'cluster_id': user.cluster_id},
+        service_ids=list(Service.objects.filter(cluster_id=user.cluster_id).values_list('id', flat=True)),
+        cluster_ids=[user.cluster_id]
+    )
+
+
+def get_user_scope(user):
+    """
+    Retourne le périmètre de l'utilisateur : mémorisé sur l'objet pour la requête
+    en cours, sinon lu dans le cache, sinon calculé
+    """
+    scope = getattr(user, '_user_scope', None)
+    if scope is not None:
+        return scope
+
+    version = get_versions([HIERARCHY_SCOPE])[HIERARCHY_SCOPE]
+    key = (
+        f'{KEY_PREFIX}:scope:{user.pk}:{user.role}:'
+        f'{user.service_id}:{user.cluster_id}:{version}'
+    )
+    scope = cache.get(key)
+    if scope is None:
+        scope = _resolve(user)
+        cache.set(key, scope, timeout=settings.USER_SCOPE_CACHE_TIMEOUT)
+
+    user._user_scope = scope
+    return scope
@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from .exports import format_value
 from .models import (
     Company, Cluster, Service, Team, Collaborator,
     EmotionType, Emotion, EmotionTrend, Alert
 )
 
 
+def annotated_count(obj, attribute, related_manager):
+    """
+    Compteur annoté par le queryset de la vue (une seule requête pour toute la liste) ;
+    à défaut (instance tout juste créée), COUNT sur la relation
+    """
+    count = getattr(obj, attribute, None)
+    return count if count is not None else related_manager.count()
+
+
 class CompanySerializer(serializers.ModelSerializer):
     clusters_count = serializers.SerializerMethodField()
     services_count = serializers.SerializerMethodField()
@@ -17,13 +27,13 @@ class CompanySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_clusters_count(self, obj):
-        return obj.clusters.count()
+        return annotated_count(obj, 'clusters_count', obj.clusters)
     
     def get_services_count(self, obj):
-        return obj.services.count()
+        return annotated_count(obj, 'services_count', obj.services)
     
     def get_collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return annotated_count(obj, 'collaborators_count', obj.collaborators)
 
 
 class ClusterSerializer(serializers.ModelSerializer):
@@ -36,7 +46,7 @@ class ClusterSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_services_count(self, obj):
-        return obj.services.count()
+        return annotated_count(obj, 'services_count', obj.services)
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -54,10 +64,10 @@ class ServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_teams_count(self, obj):
-        return obj.teams.count()
+        return annotated_count(obj, 'teams_count', obj.teams)
     
     def get_collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return annotated_count(obj, 'collaborators_count', obj.collaborators)
 
 
 class TeamSerializer(serializers.ModelSerializer):
@@ -74,7 +84,7 @@ class TeamSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_collaborators_count(self, obj):
-        return obj.collaborators.count()
+        return annotated_count(obj, 'collaborators_count', obj.collaborators)
 
 
 class CollaboratorSerializer(serializers.ModelSerializer):
@@ -118,7 +128,7 @@ class EmotionTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_usage_count(self, obj):
-        return obj.emotion_entries.count()
+        return annotated_count(obj, 'usage_count', obj.emotion_entries)
 
 
 class EmotionSerializer(serializers.ModelSerializer):
@@ -143,6 +153,49 @@ class EmotionSerializer(serializers.ModelSerializer):
         ]
 
 
+class EmotionReadProjection:
+    """
+    Chemin de lecture rapide des listes d'émotions, même rendu JSON que EmotionSerializer :
+    le queryset est projeté avec values() sur les seules colonnes nécessaires
+    (noms joints en SQL, sans chargement paresseux des FK) et chaque ligne devient
+    un dictionnaire simple, sans arbre de champs DRF.
+    """
+    fields = EmotionSerializer.Meta.fields
+    # Champ de l'API -> colonne lue (les autres champs portent le nom de la colonne)
+    sources = {
+        'collaborator': 'collaborator_id',
+        'emotion_type': 'emotion_type_id',
+        'emotion_type_name': 'emotion_type__name',
+        'emotion_type_degree': 'emotion_type__degree',
+    }
+    name_columns = ('collaborator__first_name', 'collaborator__last_name')
+
+    @classmethod
+    def project(cls, queryset):
+        columns = [cls.sources.get(field, field) for field in cls.fields if field != 'collaborator_name']
+        return queryset.values(*columns, *cls.name_columns)
+
+    @classmethod
+    def to_representation(cls, rows):
+        first_name, last_name = cls.name_columns
+        # collaborator_name (source None) est recomposé comme Collaborator.full_name
+        pairs = [
+            (field, None if field == 'collaborator_name' else cls.sources.get(field, field))
+            for field in cls.fields
+        ]
+        return [
+            {
+                field: f"{row[first_name]} {row[last_name]}" if source is None else format_value(row[source])
+                for field, source in pairs
+            }
+            for row in rows
+        ]
+
+    @classmethod
+    def serialize(cls, queryset):
+        return cls.to_representation(cls.project(queryset))
+
+
 class EmotionCreateSerializer(serializers.ModelSerializer):
     """Serializer simplifié pour la création d'émotions"""
     
@@ -177,7 +230,7 @@ class EmotionTrendSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmotionTrend
         fields = [
-            'id', 'team', 'team_name', 'service', 'service_name',
+            'id', 'team', 'team_name', 'service', 'service_name', 'cluster', 'company',
             'weekly_emotion_trend', 'monthly_emotion_summary',
             'period_type', 'start_date', 'end_date',
             'average_emotion_score', 'dominant_emotion', 'participation_rate',
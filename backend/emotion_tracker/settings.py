@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +47,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'emotion_tracker.metrics.RequestMetricsMiddleware',
+    'emotion_tracker.profiling.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'emotion_tracker.urls'
@@ -66,6 +70,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'emotion_tracker.wsgi.application'
+ASGI_APPLICATION = 'emotion_tracker.asgi.application'
 
 # Database
 DATABASES = {
@@ -76,6 +81,10 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Connexions persistantes : sous ASGI, chaque thread du pool (sections du
+        # dashboard asynchrone) garde sa connexion au lieu d'en ouvrir une par section
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -118,7 +127,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'emotion_tracker.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -139,6 +148,48 @@ REST_FRAMEWORK = {
     'DATE_FORMAT': '%Y-%m-%d',
 }
 
+# Pagination ?pagination=estimated : total exact en dessous de ce seuil, estimé au-delà
+PAGINATION_EXACT_COUNT_THRESHOLD = int(os.environ.get('PAGINATION_EXACT_COUNT_THRESHOLD', '10000'))
+
+# Ingestion en masse des émotions (POST /api/emotions/bulk/)
+EMOTION_BULK_MAX_ITEMS = int(os.environ.get('EMOTION_BULK_MAX_ITEMS', '5000'))
+EMOTION_BULK_BATCH_SIZE = int(os.environ.get('EMOTION_BULK_BATCH_SIZE', '1000'))
+
+# Tendances des entités calculées sur le cube journalier pré-agrégé plutôt que sur les déclarations
+EMOTION_TRENDS_USE_AGGREGATES = os.environ.get('EMOTION_TRENDS_USE_AGGREGATES', 'False').lower() == 'true'
+
+# Table Emotion partitionnée par mois (PostgreSQL, voir partitioning.py) :
+# nombre de mois à venir dont la partition est créée à l'avance
+EMOTION_PARTITION_MONTHS_AHEAD = int(os.environ.get('EMOTION_PARTITION_MONTHS_AHEAD', '3'))
+
+# Moteur d'alertes incrémental (alerting.py) : seuils évalués à chaque déclaration
+ALERT_NEGATIVE_STREAK = int(os.environ.get('ALERT_NEGATIVE_STREAK', '3'))
+ALERT_MOOD_WINDOW_DAYS = int(os.environ.get('ALERT_MOOD_WINDOW_DAYS', '7'))
+ALERT_MOOD_THRESHOLD = float(os.environ.get('ALERT_MOOD_THRESHOLD', '0'))
+ALERT_MOOD_MIN_DECLARATIONS = int(os.environ.get('ALERT_MOOD_MIN_DECLARATIONS', '5'))
+ALERT_PARTICIPATION_THRESHOLD = float(os.environ.get('ALERT_PARTICIPATION_THRESHOLD', '50'))
+
+# Export en flux des émotions : lignes lues par paquet via un curseur côté serveur
+EMOTION_EXPORT_CHUNK_SIZE = int(os.environ.get('EMOTION_EXPORT_CHUNK_SIZE', '2000'))
+
+# Budgets de performance (perf_budgets.py, commande check_performance_budgets) :
+# mesures de référence et dépassements tolérés (latences et mémoire : ratio ou marge minimale)
+PERF_BASELINE_PATH = os.environ.get('PERF_BASELINE_PATH', os.path.join(BASE_DIR, 'perf_baseline.json'))
+PERF_BUDGET_QUERY_TOLERANCE = int(os.environ.get('PERF_BUDGET_QUERY_TOLERANCE', '0'))
+PERF_BUDGET_LATENCY_RATIO = float(os.environ.get('PERF_BUDGET_LATENCY_RATIO', '1.5'))
+PERF_BUDGET_LATENCY_MIN_MS = float(os.environ.get('PERF_BUDGET_LATENCY_MIN_MS', '5'))
+PERF_BUDGET_MEMORY_RATIO = float(os.environ.get('PERF_BUDGET_MEMORY_RATIO', '1.25'))
+PERF_BUDGET_MEMORY_MIN_KB = float(os.environ.get('PERF_BUDGET_MEMORY_MIN_KB', '256'))
+
+# Carte de chaleur du dashboard (numpy) : nombre maximal de jours
+EMOTION_HEATMAP_MAX_DAYS = int(os.environ.get('EMOTION_HEATMAP_MAX_DAYS', '90'))
+# Statistiques par membre du dashboard : nombre maximal de jours
+MEMBER_STATS_MAX_DAYS = int(os.environ.get('MEMBER_STATS_MAX_DAYS', '365'))
+
+# Export analytique Parquet (pyarrow)
+EMOTION_PARQUET_BATCH_SIZE = int(os.environ.get('EMOTION_PARQUET_BATCH_SIZE', '50000'))
+EMOTION_PARQUET_COMPRESSION = os.environ.get('EMOTION_PARQUET_COMPRESSION', 'zstd')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -166,6 +217,54 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Précalcul des tendances (EmotionTrend) : période en cours toutes les heures,
+# période close juste après chaque changement de semaine, de mois et de trimestre.
+# Bascule des champs d'humeur des collaborateurs à minuit (jour, semaine, mois).
+# Partitions mensuelles de la table Emotion créées à l'avance chaque semaine
+CELERY_BEAT_SCHEDULE = {
+    'emotion-partitions-ensure': {
+        'task': 'emotion_tracker.tasks.ensure_emotion_partitions',
+        'schedule': crontab(minute=0, hour=3, day_of_week='sun'),
+    },
+    'collaborator-moods-rollover': {
+        'task': 'emotion_tracker.tasks.rollover_collaborator_moods',
+        'schedule': crontab(minute=0, hour=0),
+    },
+    'emotion-trends-weekly-open': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=5),
+        'args': ('weekly',),
+    },
+    'emotion-trends-monthly-open': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=15),
+        'args': ('monthly',),
+    },
+    'emotion-trends-quarterly-open': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=25),
+        'args': ('quarterly',),
+    },
+    'emotion-trends-weekly-closed': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=30, hour=0, day_of_week='mon'),
+        'args': ('weekly',),
+        'kwargs': {'closed': True},
+    },
+    'emotion-trends-monthly-closed': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=40, hour=0, day_of_month=1),
+        'args': ('monthly',),
+        'kwargs': {'closed': True},
+    },
+    'emotion-trends-quarterly-closed': {
+        'task': 'emotion_tracker.tasks.materialize_emotion_trends',
+        'schedule': crontab(minute=50, hour=0, day_of_month=1, month_of_year='1,4,7,10'),
+        'args': ('quarterly',),
+        'kwargs': {'closed': True},
+    },
+}
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -217,11 +316,49 @@ os.makedirs(os.path.join(BASE_DIR, 'logs'), exist_ok=True)
 # Cache configuration
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        # RedisCache qui compte les hits/misses par requête (métriques Prometheus)
+        'BACKEND': 'emotion_tracker.metrics.InstrumentedRedisCache',
         'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
     }
 }
 
+# Durée de vie (secondes) des réponses du dashboard en cache ;
+# les écritures les invalident immédiatement via les versions de périmètre
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))
+
+# Threads (donc connexions PostgreSQL) par processus ASGI pour les sections du dashboard
+# asynchrone ; au-delà, les sections attendent un thread libre
+DASHBOARD_ASYNC_MAX_CONNECTIONS = int(os.environ.get('DASHBOARD_ASYNC_MAX_CONNECTIONS', 6))
+
+# Durée de vie (secondes) des périmètres utilisateur en cache ;
+# tout changement de hiérarchie les invalide immédiatement
+USER_SCOPE_CACHE_TIMEOUT = int(os.environ.get('USER_SCOPE_CACHE_TIMEOUT', 3600))
+# Au-delà de ce nombre de membres, les requêtes filtrent sur le rattachement (équipe, service,
+# cluster) plutôt que sur la liste des identifiants des collaborateurs
+SCOPE_INLINE_IDS_MAX = int(os.environ.get('SCOPE_INLINE_IDS_MAX', 200))
+
+# Cache d'authentification par jeton (authentication.py) : durée de vie dans Redis,
+# puis durée de vie et taille du LRU local à chaque processus (chaque entrée locale est
+# revalidée dans Redis avant usage ; 0 désactive le niveau local)
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300))
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = float(os.environ.get('AUTH_TOKEN_LOCAL_CACHE_TIMEOUT', 5))
+AUTH_TOKEN_LOCAL_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_LOCAL_CACHE_SIZE', 1024))
+
+# Durée de vie (secondes) des valeurs proposées par les filtres de l'admin
+ADMIN_FACET_CACHE_TIMEOUT = int(os.environ.get('ADMIN_FACET_CACHE_TIMEOUT', 3600))
+
+# Métriques Prometheus par route (metrics.py), exposées sur /metrics.
+# Sous gunicorn, définir PROMETHEUS_MULTIPROC_DIR pour agréger tous les workers.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+# Jeton Bearer exigé pour lire /metrics (vide : /metrics répond 404)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Profilage à la demande (profiling.py) : en-tête X-Profile: 1 ou ?_profile=1, administrateurs uniquement
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True').lower() == 'true'
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILING_SAMPLE_INTERVAL_MS', '5'))
+PROFILING_MAX_STORED = int(os.environ.get('PROFILING_MAX_STORED', '200'))
+
 # Session configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
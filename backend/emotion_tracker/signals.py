@@ -0,0 +1,149 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .alerting import AlertEngine
+from .authentication import invalidate_all, invalidate_collaborators, invalidate_tokens
+from .models import Collaborator, Emotion, EmotionDailyAggregate, EmotionRollup, Service
+from .cache import TRENDS_SCOPE, invalidate_scopes, scopes_for_collaborator
+from .scopes import HIERARCHY_FIELDS, HIERARCHY_SCOPE
+
+
+@receiver(post_delete, sender=Emotion)
+def forget_deleted_emotion(sender, instance, **kwargs):
+    """Retire une déclaration supprimée des agrégats de son collaborateur"""
+    EmotionRollup.objects.forget_emotion(instance)
+
+
+@receiver(post_delete, sender=Emotion)
+def remove_deleted_emotion_from_aggregates(sender, instance, **kwargs):
+    """Retire une déclaration supprimée de la cellule du cube dans laquelle elle a été comptée"""
+    organization = EmotionDailyAggregate.objects.get_declared_organization(instance)
+    EmotionDailyAggregate.objects.record(
+        organization, instance.date, instance.period, instance.half_day,
+        instance.emotion_type.emotion, instance.emotion_degree, sign=-1
+    )
+
+
+@receiver(post_delete, sender=Emotion)
+def refresh_collaborator_moods_on_emotion_delete(sender, instance, **kwargs):
+    """Recalcule les champs d'humeur du collaborateur (après mise à jour de ses agrégats)"""
+    Collaborator.objects.refresh_moods([instance.collaborator_id])
+
+
+@receiver(post_save, sender=Emotion)
+def update_alert_states_on_emotion_save(sender, instance, **kwargs):
+    """Met à jour les états d'alerte, dans la transaction de Emotion.save"""
+    organization = EmotionDailyAggregate.objects.get_organization(instance.collaborator)
+    AlertEngine().record(instance, organization, previous=getattr(instance, '_previous_values', None))
+
+
+@receiver(post_delete, sender=Emotion)
+def remove_deleted_emotion_from_alert_states(sender, instance, **kwargs):
+    """Retire une déclaration supprimée des états d'alerte dans lesquels elle a été comptée"""
+    organization = EmotionDailyAggregate.objects.get_declared_organization(instance)
+    AlertEngine().forget(instance, organization)
+
+
+# Invalidation du cache du dashboard
+
+def _collaborator_scopes(collaborator):
+    return scopes_for_collaborator(
+        collaborator.pk, collaborator.manager_id, collaborator.service_id, collaborator.cluster_id
+    )
+
+
+@receiver(post_save, sender=Emotion)
+@receiver(post_delete, sender=Emotion)
+def invalidate_dashboard_on_emotion_change(sender, instance, **kwargs):
+    invalidate_scopes(_collaborator_scopes(instance.collaborator))
+
+
+@receiver(post_save, sender='emotion_tracker.Alert')
+@receiver(post_delete, sender='emotion_tracker.Alert')
+def invalidate_dashboard_on_alert_change(sender, instance, **kwargs):
+    if instance.collaborator_id:
+        invalidate_scopes(_collaborator_scopes(instance.collaborator))
+
+
+@receiver(post_save, sender='emotion_tracker.EmotionTrend')
+@receiver(post_delete, sender='emotion_tracker.EmotionTrend')
+def invalidate_dashboard_on_trend_change(sender, instance, **kwargs):
+    invalidate_scopes([TRENDS_SCOPE])
+
+
+@receiver(pre_save, sender=Collaborator)
+def remember_collaborator_hierarchy(sender, instance, update_fields=None, **kwargs):
+    """
+    Mémorise le rattachement avant modification, pour invalider aussi l'ancien
+    périmètre et détecter un changement de hiérarchie
+    """
+    instance._previous_hierarchy = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {field[:-3] for field in HIERARCHY_FIELDS} & set(update_fields):
+        # Ex. mise à jour de last_login : rattachement inchangé
+        instance._previous_hierarchy = {field: getattr(instance, field) for field in HIERARCHY_FIELDS}
+        return
+    instance._previous_hierarchy = Collaborator.objects.filter(pk=instance.pk).values(*HIERARCHY_FIELDS).first()
+
+
+@receiver(post_save, sender=Collaborator)
+@receiver(post_delete, sender=Collaborator)
+def invalidate_on_collaborator_change(sender, instance, created=False, **kwargs):
+    scopes = _collaborator_scopes(instance)
+    previous = getattr(instance, '_previous_hierarchy', None)
+    if previous:
+        scopes += scopes_for_collaborator(
+            instance.pk, previous['manager_id'], previous['service_id'], previous['cluster_id']
+        )
+
+    # Création, suppression ou changement de rattachement : périmètres des utilisateurs à recalculer
+    hierarchy_changed = (
+        created or kwargs.get('signal') is post_delete or previous is None
+        or any(previous[field] != getattr(instance, field) for field in HIERARCHY_FIELDS)
+    )
+    if hierarchy_changed:
+        scopes.append(HIERARCHY_SCOPE)
+    invalidate_scopes(scopes)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_hierarchy_on_service_change(sender, instance, **kwargs):
+    """Le rattachement des services aux clusters fait partie du périmètre des directeurs de pôle"""
+    invalidate_scopes([HIERARCHY_SCOPE])
+
+
+# Invalidation du cache d'authentification (CachedTokenAuthentication)
+
+@receiver(post_delete, sender=Token)
+def invalidate_auth_on_token_delete(sender, instance, **kwargs):
+    """Déconnexion ou révocation du jeton"""
+    invalidate_tokens([instance.key], user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=Collaborator)
+@receiver(post_delete, sender=Collaborator)
+def invalidate_auth_on_collaborator_change(sender, instance, **kwargs):
+    """Désactivation, changement de rattachement ou de profil : l'utilisateur en cache est périmé"""
+    invalidate_collaborators([instance.pk])
+
+
+@receiver(post_save, sender=Emotion)
+@receiver(post_delete, sender=Emotion)
+def invalidate_auth_on_emotion_change(sender, instance, **kwargs):
+    """Les champs d'humeur du collaborateur sont mis à jour par la déclaration"""
+    invalidate_collaborators([instance.collaborator_id])
+
+
+@receiver(post_save, sender='emotion_tracker.Company')
+@receiver(post_delete, sender='emotion_tracker.Company')
+@receiver(post_save, sender='emotion_tracker.Cluster')
+@receiver(post_delete, sender='emotion_tracker.Cluster')
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender='emotion_tracker.Team')
+@receiver(post_delete, sender='emotion_tracker.Team')
+def invalidate_auth_on_organization_change(sender, instance, **kwargs):
+    """L'équipe, le service, le cluster et l'entreprise sont mis en cache avec l'utilisateur"""
+    invalidate_all()
@@ -0,0 +1,346 @@
+"""
+Génération d'une organisation synthétique à grande échelle (tests de charge).
+
+La structure (entreprises, clusters, services, équipes, collaborateurs et
+hiérarchie de managers) est créée par bulk_create dans le processus principal ;
+l'historique des déclarations est généré équipe par équipe dans un pool de
+processus et écrit par COPY (PostgreSQL) ou bulk_create.
+
+Le modèle d'humeur combine une humeur propre à chaque équipe (marche aléatoire
+partagée par ses membres), un décalage individuel, un effet du jour de la
+semaine et un bruit quotidien ; la participation de chaque collaborateur
+décroît avec le temps vers un plancher. Tout est dérivé de la graine :
+deux exécutions sur une base vide produisent les mêmes données
+(aux horodatages de création près).
+"""
+import io
+import math
+import multiprocessing
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .models import Cluster, Collaborator, Company, Emotion, EmotionType, Service, Team, get_date_period
+
+# Types d'émotion générés : codes reconnus par EmotionType.save (degré dérivé du code)
+EMOTION_TYPES = [
+    ('Angry', 'En colère'),
+    ('Anxious', 'Anxieux'),
+    ('Sad', 'Triste'),
+    ('Neutral', 'Neutre'),
+    ('happy', 'Heureux'),
+    ('Excited', 'Excité'),
+]
+
+# Score d'humeur maximal de chaque type (le dernier couvre le reste)
+MOOD_THRESHOLDS = [(-2.0, 'Angry'), (-1.0, 'Anxious'), (-0.3, 'Sad'), (0.4, 'Neutral'), (1.6, 'happy')]
+MOOD_ABOVE = 'Excited'
+
+# Effet du jour de la semaine sur l'humeur (lundi = 0)
+WEEKDAY_EFFECTS = [-0.4, -0.15, 0.0, 0.1, 0.5, 0.3, 0.3]
+WEEKEND_PARTICIPATION = 0.02
+
+EMOTION_COLUMNS = [
+    'id', 'emotion_id', 'collaborator_id', 'emotion_type_id', 'date', 'period', 'week_number', 'month',
+    'year', 'team', 'company', 'cluster', 'full_name', 'weekly_emotion_summary', 'monthly_emotion_insights',
+    'emotion_degree', 'creation_date', 'half_day', 'date_period', 'emotion_illustration', 'comment',
+    'declared_team_id', 'declared_service_id', 'declared_cluster_id', 'declared_company_id',
+]
+
+FIRST_NAMES = ['Marie', 'Jean', 'Sophie', 'Pierre', 'Claire', 'Thomas', 'Anne', 'Michel', 'Julie', 'Nicolas',
+               'Camille', 'Lucas', 'Emma', 'Hugo', 'Léa', 'Louis', 'Chloé', 'Paul', 'Manon', 'Arthur']
+LAST_NAMES = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau',
+              'Simon', 'Laurent', 'Lefebvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux', 'Vincent', 'Fournier']
+
+
+@dataclass
+class OrganizationSpec:
+    """Paramètres de l'organisation générée (nombres par niveau parent)"""
+    companies: int = 1
+    clusters: int = 2
+    services: int = 3
+    teams: int = 4
+    employees: int = 10
+    manager_depth: int = 2
+    years: float = 1
+    seed: int = 42
+    prefix: str = 'GEN'
+    password: str = 'password123'
+
+    @property
+    def collaborators(self):
+        per_service = self.teams * self.employees + 1
+        per_cluster = self.services * per_service + 1
+        return self.companies * self.clusters * per_cluster
+
+
+def _rng(*parts):
+    """Générateur déterministe pour une composante (graine, entité, ...)"""
+    return random.Random(':'.join(str(part) for part in parts))
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _fan_out(size, depth):
+    """Nombre de subordonnés directs par manager pour une hiérarchie de `depth` niveaux"""
+    if depth <= 1 or size <= 2:
+        return max(1, size - 1)
+    return max(2, math.ceil((size - 1) ** (1 / (depth - 1))))
+
+
+class OrganizationGenerator:
+    """Crée la structure de l'organisation et les collaborateurs"""
+
+    def __init__(self, spec, batch_size=2000):
+        self.spec = spec
+        self.batch_size = batch_size
+        self.rng = _rng(spec.seed, 'organization')
+        self.counter = 0
+        self.password = make_password(spec.password)
+        self.collaborators = []
+        # Équipes générées : identifiant, noms dénormalisés et membres (pk, code, nom complet)
+        self.teams = []
+
+    def _collaborator(self, role, company, **fields):
+        self.counter += 1
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        email = f'{self.spec.prefix.lower()}{self.counter:07d}@{company.pk.hex[:8]}.example.com'
+        collaborator = Collaborator(
+            id=_uuid(self.rng),
+            collaborator_id=f'{self.spec.prefix}{self.counter:07d}',
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            username=email,
+            password=self.password,
+            role=role,
+            company=company,
+            **fields
+        )
+        self.collaborators.append(collaborator)
+        return collaborator
+
+    def generate(self):
+        spec = self.spec
+        companies, clusters, services, teams = [], [], [], []
+
+        for company_index in range(spec.companies):
+            company = Company(id=_uuid(self.rng), name=f'{spec.prefix} Entreprise {company_index + 1}')
+            companies.append(company)
+            for cluster_index in range(spec.clusters):
+                cluster_label = f'{company_index + 1}.{cluster_index + 1}'
+                cluster = Cluster(id=_uuid(self.rng), name=f'Pôle {cluster_label}', company=company)
+                clusters.append(cluster)
+                pole_director = self._collaborator('pole_director', company, cluster=cluster)
+                for service_index in range(spec.services):
+                    service_label = f'{cluster_label}.{service_index + 1}'
+                    service = Service(
+                        id=_uuid(self.rng), service_name=f'Service {service_label}', cluster=cluster, company=company
+                    )
+                    services.append(service)
+                    director = self._collaborator(
+                        'director', company, cluster=cluster, service=service, manager=pole_director
+                    )
+                    for team_index in range(spec.teams):
+                        team = Team(
+                            id=_uuid(self.rng), team_name=f'Équipe {service_label}.{team_index + 1}',
+                            service=service, company=company
+                        )
+                        teams.append(team)
+                        self._create_team_members(team, service, cluster, company, director)
+
+        with transaction.atomic():
+            Company.objects.bulk_create(companies, batch_size=self.batch_size)
+            Cluster.objects.bulk_create(clusters, batch_size=self.batch_size)
+            Service.objects.bulk_create(services, batch_size=self.batch_size)
+            Team.objects.bulk_create(teams, batch_size=self.batch_size)
+            # Les managers sont créés avant leurs subordonnés (ordre de génération)
+            Collaborator.objects.bulk_create(self.collaborators, batch_size=self.batch_size)
+
+        return {
+            'companies': len(companies),
+            'clusters': len(clusters),
+            'services': len(services),
+            'teams': len(teams),
+            'collaborators': len(self.collaborators),
+        }
+
+    def _create_team_members(self, team, service, cluster, company, director):
+        size = self.spec.employees
+        fan_out = _fan_out(size, self.spec.manager_depth)
+        members = []
+        for index in range(size):
+            # Hiérarchie en arbre : le membre i rapporte au membre (i - 1) // fan_out
+            manager = director if index == 0 else members[(index - 1) // fan_out]
+            has_reports = index * fan_out + 1 < size
+            role = 'manager' if index == 0 or has_reports else 'employee'
+            members.append(self._collaborator(
+                role, company, team=team, service=service, cluster=cluster, manager=manager
+            ))
+
+        self.teams.append({
+            'team_id': team.pk,
+            'team_name': team.team_name,
+            'company_name': company.name,
+            'cluster_name': cluster.name,
+            # Rattachement enregistré sur les déclarations (voir Emotion.assign_organization)
+            'organization': (team.pk, service.pk, cluster.pk, company.pk),
+            'members': [
+                (member.pk, member.collaborator_id, member.full_name) for member in members
+            ],
+        })
+
+
+def _mood_label(score):
+    for maximum, code in MOOD_THRESHOLDS:
+        if score <= maximum:
+            return code
+    return MOOD_ABOVE
+
+
+def _escape(value):
+    if value is None:
+        return '\\N'
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def generate_team_rows(team, emotion_types, start_date, end_date, seed, today, now):
+    """
+    Déclarations d'une équipe entre start_date et end_date (tuples dans l'ordre d'EMOTION_COLUMNS).
+    emotion_types associe chaque code à (id, degré).
+    """
+    team_rng = _rng(seed, 'team', team['team_id'])
+    team_base = team_rng.gauss(0.3, 0.6)
+    days = (end_date - start_date).days + 1
+
+    # Humeur partagée par l'équipe : marche aléatoire rappelée vers l'humeur de base
+    team_mood, team_walk = team_base, []
+    for _ in range(days):
+        team_mood += 0.15 * (team_base - team_mood) + team_rng.gauss(0, 0.25)
+        team_walk.append(team_mood)
+
+    rows = []
+    for collaborator_pk, collaborator_code, full_name in team['members']:
+        rng = _rng(seed, 'collaborator', collaborator_pk)
+        offset = rng.gauss(0, 0.7)
+        engagement = rng.uniform(0.85, 0.99)
+        floor = rng.uniform(0.35, 0.75)
+        decay_days = rng.uniform(60, 400)
+
+        for day_index in range(days):
+            current = start_date + timedelta(days=day_index)
+            weekday = current.weekday()
+            participation = floor + (engagement - floor) * math.exp(-day_index / decay_days)
+            if weekday >= 5:
+                participation = WEEKEND_PARTICIPATION
+            morning_score = team_walk[day_index] + offset + WEEKDAY_EFFECTS[weekday] + rng.gauss(0, 1)
+
+            for period, score, probability in (
+                ('morning', morning_score, participation),
+                ('evening', morning_score + rng.gauss(0.1, 0.6), participation * 0.9),
+            ):
+                if rng.random() >= probability:
+                    continue
+                emotion_type_id, degree = emotion_types[_mood_label(score)]
+                rows.append((
+                    _uuid(rng), f'{collaborator_code}-{current}-{period}', collaborator_pk, emotion_type_id,
+                    current, period, current.isocalendar()[1], current.month, current.year,
+                    team['team_name'], team['company_name'], team['cluster_name'], full_name, '', '',
+                    degree, now, period == 'evening', get_date_period(current, today), '', None,
+                    *team['organization'],
+                ))
+    return rows
+
+
+def _write_copy(rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_escape(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(column) for column in EMOTION_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(Emotion._meta.db_table)} ({columns}) FROM STDIN', buffer
+        )
+
+
+def _write_bulk(rows, batch_size):
+    Emotion.objects.bulk_create(
+        [Emotion(**dict(zip(EMOTION_COLUMNS, row))) for row in rows], batch_size=batch_size
+    )
+
+
+def _write_team(arguments):
+    """Tâche du pool : génère et écrit l'historique d'une équipe, retourne le nombre de lignes"""
+    team, emotion_types, start_date, end_date, seed, today, now, method, batch_size = arguments
+    rows = generate_team_rows(team, emotion_types, start_date, end_date, seed, today, now)
+    if method == 'copy':
+        _write_copy(rows)
+    else:
+        _write_bulk(rows, batch_size)
+    return len(rows)
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+class DeclarationGenerator:
+    """Génère l'historique des déclarations des équipes dans un pool de processus"""
+
+    def __init__(self, spec, workers=None, method=None, batch_size=5000, end_date=None):
+        self.spec = spec
+        self.workers = workers or multiprocessing.cpu_count()
+        self.method = method or ('copy' if connection.vendor == 'postgresql' else 'bulk')
+        self.batch_size = batch_size
+        self.end_date = end_date or timezone.localdate() - timedelta(days=1)
+        self.start_date = self.end_date - timedelta(days=max(1, round(365 * spec.years)) - 1)
+
+    def emotion_types(self):
+        """Types d'émotion générés, créés via EmotionType.save si besoin : code -> (id, degré)"""
+        result = {}
+        for code, name in EMOTION_TYPES:
+            emotion_type = EmotionType.objects.filter(emotion=code).first()
+            if emotion_type is None:
+                emotion_type = EmotionType(name=name, emotion=code)
+                emotion_type.save()
+            result[code] = (emotion_type.pk, emotion_type.degree)
+        return result
+
+    def generate(self, teams, progress=None):
+        emotion_types = self.emotion_types()
+        today = timezone.localdate()
+        now = timezone.now()
+        tasks = [
+            (team, emotion_types, self.start_date, self.end_date, self.spec.seed, today, now,
+             self.method, self.batch_size)
+            for team in teams
+        ]
+
+        total = 0
+        if self.workers <= 1:
+            for task in tasks:
+                total += _write_team(task)
+                if progress:
+                    progress(total)
+            return total
+
+        # Chaque processus ouvre sa propre connexion : ne pas hériter de celle du parent
+        connections.close_all()
+        with multiprocessing.Pool(self.workers, initializer=_init_worker) as pool:
+            for rows in pool.imap_unordered(_write_team, tasks):
+                total += rows
+                if progress:
+                    progress(total)
+        return total
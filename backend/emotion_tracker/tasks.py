@@ -0,0 +1,186 @@
+"""
+Tâches Celery : précalcul des tendances émotionnelles (EmotionTrend), bascule
+quotidienne des champs d'humeur des collaborateurs et création à l'avance des
+partitions mensuelles de la table Emotion.
+
+materialize_emotion_trends répartit le calcul d'une période sur les workers,
+une tâche par entité (équipe, service, cluster, entreprise), puis un callback
+de chord agrège les durées de l'exécution.
+"""
+import logging
+import statistics
+import time
+from datetime import date, timedelta
+
+from celery import chord, shared_task
+from django.core.cache import cache
+from django.utils import timezone
+
+from .analytics import get_bucket_start
+from .authentication import invalidate_all
+from .models import Cluster, Collaborator, Company, EmotionTrend, Service, Team
+
+logger = logging.getLogger(__name__)
+
+ENTITY_MODELS = {
+    'team': Team,
+    'service': Service,
+    'cluster': Cluster,
+    'company': Company,
+}
+
+# Type de période -> (méthode de calcul, méthode de bornage de la période)
+PERIODS = {
+    EmotionTrend.WEEKLY: ('calculate_weekly_emotion_trend', '_get_week_date_range'),
+    EmotionTrend.MONTHLY: ('calculate_monthly_emotion_trend', '_get_month_date_range'),
+    EmotionTrend.QUARTERLY: ('calculate_quarterly_emotion_trend', '_get_quarter_date_range'),
+}
+
+GRANULARITIES = {
+    EmotionTrend.WEEKLY: 'week',
+    EmotionTrend.MONTHLY: 'month',
+    EmotionTrend.QUARTERLY: 'quarter',
+}
+
+LAST_RUN_KEY = 'emotion_tracker:trends:last_run:{period_type}'
+
+
+def get_reference_date(period_type, closed=False, today=None):
+    """
+    Date de référence d'une exécution : aujourd'hui pour la période en cours,
+    la veille du début de la période en cours pour la période qui vient de se terminer
+    """
+    today = today or date.today()
+    if not closed:
+        return today
+    return get_bucket_start(today, GRANULARITIES[period_type]) - timedelta(days=1)
+
+
+@shared_task
+def compute_entity_trend(entity_type, entity_id, period_type, reference_date):
+    """Calcule et enregistre la tendance d'une entité pour une période"""
+    started = time.perf_counter()
+    calculate_method, bounds_method = PERIODS[period_type]
+    reference_date = date.fromisoformat(reference_date)
+
+    entity = ENTITY_MODELS[entity_type].objects.filter(pk=entity_id).first()
+    if entity is None:
+        # Entité supprimée depuis la planification
+        return {
+            'entity_type': entity_type, 'entity_id': entity_id, 'duration_ms': 0, 'skipped': True, 'failed': False
+        }
+
+    # Une entité en échec ne doit pas faire échouer le chord : les autres tendances sont enregistrées
+    failed = False
+    try:
+        stats = getattr(entity, calculate_method)(reference_date=reference_date)
+        start_date, end_date = getattr(entity, bounds_method)(reference_date)
+        EmotionTrend.objects.store(entity, period_type, start_date, end_date, stats)
+    except Exception:
+        logger.exception('Tendance %s de %s %s (%s) en échec', period_type, entity_type, entity_id, reference_date)
+        failed = True
+
+    return {
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'skipped': False,
+        'failed': failed,
+    }
+
+
+@shared_task
+def summarize_trend_run(results, period_type, reference_date, started_at):
+    """Callback du chord : durées de l'exécution, journalisées et conservées dans le cache"""
+    durations = sorted(result['duration_ms'] for result in results if not result['skipped'])
+    by_entity = {}
+    for result in results:
+        if not result['skipped']:
+            by_entity.setdefault(result['entity_type'], []).append(result['duration_ms'])
+
+    failed = [
+        f"{result['entity_type']}:{result['entity_id']}" for result in results if result.get('failed')
+    ]
+    summary = {
+        'period_type': period_type,
+        'reference_date': reference_date,
+        'entities': len(durations),
+        'skipped': len(results) - len(durations),
+        'failed': failed,
+        'wall_clock_s': round(time.time() - started_at, 2),
+        'task_total_s': round(sum(durations) / 1000, 2),
+        'task_p50_ms': round(statistics.median(durations), 2) if durations else 0,
+        'task_p95_ms': durations[min(len(durations) - 1, int(0.95 * len(durations)))] if durations else 0,
+        'task_max_ms': durations[-1] if durations else 0,
+        'by_entity_type_ms': {
+            entity_type: round(sum(values), 2) for entity_type, values in by_entity.items()
+        },
+    }
+    cache.set(LAST_RUN_KEY.format(period_type=period_type), summary, timeout=None)
+    if failed:
+        logger.error('Tendances %s (%s) : %s entité(s) en échec', period_type, reference_date, len(failed))
+    logger.info('Tendances %s (%s) : %s', period_type, reference_date, summary)
+    return summary
+
+
+@shared_task
+def materialize_emotion_trends(period_type, closed=False, reference_date=None):
+    """
+    Planifie le calcul des tendances de toutes les entités pour une période :
+    la période en cours (exécution horaire) ou celle qui vient de se terminer (closed)
+    """
+    if reference_date:
+        reference_date = date.fromisoformat(reference_date)
+    else:
+        reference_date = get_reference_date(period_type, closed=closed)
+
+    signatures = [
+        compute_entity_trend.s(entity_type, str(entity_id), period_type, reference_date.isoformat())
+        for entity_type, model in ENTITY_MODELS.items()
+        for entity_id in model.objects.values_list('pk', flat=True)
+    ]
+    if not signatures:
+        return None
+
+    result = chord(signatures)(
+        summarize_trend_run.s(period_type, reference_date.isoformat(), time.time())
+    )
+    return result.id
+
+
+@shared_task
+def rollover_collaborator_moods(today=None):
+    """
+    Bascule de minuit des champs d'humeur des collaborateurs : émotions du jour
+    chaque nuit, semaine en cours le lundi, mois en cours le 1er
+    """
+    today = date.fromisoformat(today) if today else timezone.localdate()
+    periods = ['today']
+    if today.weekday() == 0:
+        periods.append('week')
+    if today.day == 1:
+        periods.append('month')
+
+    updated = Collaborator.objects.refresh_moods(periods=periods, today=today)
+    # Champs d'humeur modifiés par UPDATE : utilisateurs en cache d'authentification périmés
+    invalidate_all()
+    logger.info('Humeurs des collaborateurs (%s, %s) : %s ligne(s)', today, ', '.join(periods), updated)
+    return {'date': today.isoformat(), 'periods': periods, 'updated': updated}
+
+
+@shared_task
+def ensure_emotion_partitions():
+    """Crée à l'avance les partitions mensuelles de la table Emotion (si elle est partitionnée)"""
+    from .partitioning import ensure_partitions, is_partitioned
+
+    if not is_partitioned():
+        return []
+    created = ensure_partitions()
+    if created:
+        logger.info('Partitions créées : %s', ', '.join(created))
+    return created
+
+
+def get_last_run(period_type):
+    """Résumé de la dernière exécution pour un type de période"""
+    return cache.get(LAST_RUN_KEY.format(period_type=period_type))
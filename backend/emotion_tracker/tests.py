@@ -0,0 +1,1044 @@
+"""
+Tests de l'application emotion_tracker.
+
+Exécution : python manage.py test emotion_tracker
+(PostgreSQL et Redis de settings.py, base de test créée puis supprimée par Django)
+"""
+import csv
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import Avg, Count, F, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from emotion_tracker.alerting import rebuild_alert_states
+from emotion_tracker.analytics import daily_emotion_stats
+from emotion_tracker.authentication import AUTH_USER_FIELDS, _digest, _token_key, local_cache
+from emotion_tracker.exports import DEFAULT_COLUMNS
+from emotion_tracker.heatmap import build_heatmap
+from emotion_tracker.models import (
+    Cluster, Collaborator, CollaboratorAlertState, Company, Emotion, EmotionDailyAggregate, EmotionRollup,
+    EmotionTrend, EmotionType, GroupAlertState, Service, Team, get_mood_label
+)
+from emotion_tracker.partitioning import (
+    convert_to_partitioned, create_partitions, detach_partitions, ensure_partitions, is_partitioned,
+    list_partitions, partition_name
+)
+from emotion_tracker.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfileStore
+from emotion_tracker.scopes import _resolve
+from emotion_tracker.serializers import EmotionReadProjection, EmotionSerializer
+from emotion_tracker.synthetic import OrganizationSpec
+from emotion_tracker.tasks import compute_entity_trend
+
+EMOTION_TYPES = [
+    ('Heureux', 'happy', 8),
+    ('Triste', 'sad', 2),
+    ('Neutre', 'neutral', 5),
+    ('Stressé', 'stressed', 3),
+    ('Excité', 'excited', 9),
+    ('Fatigué', 'tired', 4),
+]
+
+
+def create_emotion_types():
+    # bulk_create : EmotionType.save() recalcule le degré à partir du code
+    return EmotionType.objects.bulk_create([
+        EmotionType(name=name, emotion=code, degree=degree) for name, code, degree in EMOTION_TYPES
+    ])
+
+
+def create_collaborator(company, code, role='employee', **fields):
+    return Collaborator.objects.create(
+        collaborator_id=code,
+        email=f'{code.lower()}@test.local',
+        first_name=fields.pop('first_name', 'Test'),
+        last_name=fields.pop('last_name', code),
+        role=role,
+        company=company,
+        **fields
+    )
+
+
+def seed_emotions(collaborator, emotion_types, end_date, days, offset=0):
+    """Déclarations matin et soir des `days` jours se terminant à end_date (insérées sans save())"""
+    emotions = []
+    for index in range(days * 2):
+        day = end_date - timedelta(days=index // 2)
+        period = 'morning' if index % 2 == 0 else 'evening'
+        emotion_type = emotion_types[(index + offset) % len(emotion_types)]
+        emotions.append(Emotion(
+            emotion_id=f'{collaborator.collaborator_id}-{day}-{period}',
+            collaborator=collaborator,
+            emotion_type=emotion_type,
+            date=day,
+            period=period,
+            week_number=day.isocalendar()[1],
+            month=day.month,
+            year=day.year,
+            full_name=collaborator.full_name,
+            emotion_degree=emotion_type.degree,
+            half_day=period == 'evening',
+        ))
+    return Emotion.objects.bulk_create(emotions)
+
+
+class EmotionTrackerTestCase(TestCase):
+    """Organisation de test : une entreprise, une équipe et ses collaborateurs"""
+
+    def setUp(self):
+        cache.clear()
+        self.emotion_types = create_emotion_types()
+        self.company = Company.objects.create(name='Test')
+        self.team = Team.objects.create(team_name='Équipe test', company=self.company)
+
+
+class OrganizationTestCase(EmotionTrackerTestCase):
+    """
+    Deux clusters, trois services et quatre équipes ; déclarations du jour et de la veille,
+    dont des demi-journées (half_day) qui ne correspondent pas à la période déclarée
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.clusters = [Cluster.objects.create(name=f'Cluster {index}', company=self.company) for index in range(2)]
+        self.services = [
+            Service.objects.create(service_name=f'Service {index}', cluster=cluster, company=self.company)
+            for index, cluster in enumerate([self.clusters[0], self.clusters[0], self.clusters[1]])
+        ]
+        self.teams = [self.team] + [
+            Team.objects.create(team_name=f'Équipe {index}', company=self.company) for index in range(1, 4)
+        ]
+        for team, service in zip(self.teams, [self.services[0], self.services[0], self.services[1], self.services[2]]):
+            team.service = service
+            team.save()
+
+        self.collaborators = []
+        for index in range(12):
+            team = self.teams[index % len(self.teams)]
+            self.collaborators.append(create_collaborator(
+                self.company, f'ORG{index:02d}', role='manager' if index < 4 else 'employee',
+                team=team, service=team.service, cluster=team.service.cluster,
+                is_active=index != 11
+            ))
+
+        for index, collaborator in enumerate(self.collaborators):
+            if index % 5 == 4:
+                # Sans déclaration aujourd'hui
+                seed_emotions(collaborator, self.emotion_types, self.today - timedelta(days=1), days=1, offset=index)
+                continue
+            seed_emotions(collaborator, self.emotion_types, self.today, days=2, offset=index)
+        # Demi-journée enregistrée selon l'heure de saisie, différente de la période déclarée
+        Emotion.objects.filter(collaborator__in=self.collaborators[:3], date=self.today, period='morning').update(
+            half_day=True
+        )
+
+    def entities(self):
+        return {
+            'company': self.company,
+            'cluster': self.clusters[0],
+            'service': self.services[0],
+            'team': self.team,
+        }
+
+
+def legacy_base_emotion_stats(daily_emotions):
+    """
+    Ancien calcul des statistiques journalières (une requête par compteur, distribution,
+    moyenne et période), conservé comme référence ; le code émotion est emotion_type__emotion
+    """
+    stats = {
+        'total_emotions': daily_emotions.count(),
+        'morning_emotions': daily_emotions.filter(half_day=False).count(),
+        'evening_emotions': daily_emotions.filter(half_day=True).count(),
+        'participation_rate': 0,
+        'emotion_distribution': {},
+        'average_emotion_degree': 0,
+        'emotion_trends': {
+            'morning': {},
+            'evening': {}
+        }
+    }
+    for emotion in daily_emotions.values('emotion_type__emotion').annotate(count=Count('emotion_type__emotion')):
+        stats['emotion_distribution'][emotion['emotion_type__emotion']] = emotion['count']
+
+    avg_degree = daily_emotions.aggregate(Avg('emotion_degree'))['emotion_degree__avg']
+    stats['average_emotion_degree'] = round(avg_degree if avg_degree else 0, 2)
+
+    for period, half_day in [('morning', False), ('evening', True)]:
+        emotion_trend = daily_emotions.filter(half_day=half_day).values('emotion_type__emotion').annotate(
+            count=Count('emotion_type__emotion')
+        )
+        for emotion in emotion_trend:
+            stats['emotion_trends'][period][emotion['emotion_type__emotion']] = emotion['count']
+    return stats
+
+
+def legacy_daily_emotion_trend(entity, lookup, breakdowns):
+    """Ancienne tendance journalière d'une entité : statistiques, participation et répartitions"""
+    daily_emotions = Emotion.objects.filter(**{lookup: entity, 'date': timezone.now().date()})
+    stats = legacy_base_emotion_stats(daily_emotions)
+
+    total_collaborators = entity.collaborators.filter(is_active=True).count()
+    if total_collaborators > 0:
+        stats['participation_rate'] = (
+            daily_emotions.values('collaborator').distinct().count() / total_collaborators
+        ) * 100
+
+    for key, field in breakdowns.items():
+        stats[key] = dict(daily_emotions.values(field).annotate(count=Count('id')).values_list(field, 'count'))
+    return stats
+
+
+LEGACY_BREAKDOWNS = {
+    'company': {
+        'service_breakdown': 'collaborator__service__service_name',
+        'cluster_breakdown': 'collaborator__cluster__name',
+    },
+    'cluster': {'service_breakdown': 'collaborator__service__service_name'},
+    'service': {},
+    'team': {'role_breakdown': 'collaborator__role'},
+}
+
+
+class RollupWriteTests(EmotionTrackerTestCase):
+    """Les agrégats maintenus à l'écriture sont ceux reconstruits depuis l'historique"""
+
+    def snapshot(self):
+        return {
+            (rollup.period_type, rollup.period_start): (
+                rollup.total_emotions, rollup.degree_sum, rollup.emotion_type_breakdown,
+                sorted(rollup.progression, key=lambda entry: (entry['date'], entry['id']))
+            )
+            for rollup in EmotionRollup.objects.filter(collaborator=self.collaborator, total_emotions__gt=0)
+        }
+
+    def test_add_update_delete_match_rebuild(self):
+        self.collaborator = create_collaborator(self.company, 'ROLL01', team=self.team)
+        start = date(2024, 1, 29)
+        emotions = []
+        for index in range(10):
+            emotion = Emotion(
+                collaborator=self.collaborator, emotion_type=self.emotion_types[index % 3],
+                date=start + timedelta(days=index // 2), period='morning' if index % 2 == 0 else 'evening'
+            )
+            emotion.save()
+            emotions.append(emotion)
+        self.assertEqual(self.snapshot()[('monthly', date(2024, 1, 1))][0], 6)
+
+        # Modification (type et date, changement de semaine et de mois) puis suppressions
+        emotions[0].emotion_type = self.emotion_types[4]
+        emotions[0].date = date(2024, 2, 10)
+        emotions[0].save()
+        emotions[3].delete()
+        emotions[9].delete()
+
+        incremental = self.snapshot()
+        self.assertEqual(sum(total for total, *_ in incremental.values()), 2 * 8)
+        EmotionRollup.objects.rebuild([self.collaborator.pk])
+        self.assertEqual(self.snapshot(), incremental)
+
+
+class CollaboratorMoodTests(EmotionTrackerTestCase):
+    """Les champs d'humeur du collaborateur suivent les créations, modifications et suppressions"""
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.collaborator = create_collaborator(self.company, 'MOOD01', team=self.team)
+
+    def declare(self, day, period, emotion_type):
+        emotion = Emotion(collaborator=self.collaborator, emotion_type=emotion_type, date=day, period=period)
+        emotion.save()
+        return emotion
+
+    def expected_moods(self):
+        """Champs recalculés depuis les déclarations, comme l'ancien Collaborator.save()"""
+        emotions = Emotion.objects.filter(collaborator=self.collaborator)
+        todays = {emotion.period: emotion.emotion_type.emotion for emotion in emotions.filter(date=self.today)}
+        start_of_week = self.today - timedelta(days=self.today.weekday())
+        week = emotions.filter(date__range=[start_of_week, start_of_week + timedelta(days=6)])
+        month = emotions.filter(date__year=self.today.year, date__month=self.today.month)
+        week_degree = week.aggregate(total=Sum('emotion_degree'))['total'] or 0
+        month_degree = month.aggregate(total=Sum('emotion_degree'))['total'] or 0
+        return {
+            'emotion_today_morning': todays.get('morning'),
+            'emotion_today_evening': todays.get('evening'),
+            'emotion_degree_this_week': week_degree,
+            'emotion_this_week': get_mood_label(week_degree),
+            'emotion_degree_this_month': month_degree,
+            'emotion_this_month': get_mood_label(month_degree),
+        }
+
+    def assertMoodsCurrent(self):
+        expected = self.expected_moods()
+        stored = Collaborator.objects.filter(pk=self.collaborator.pk).values(*expected).get()
+        self.assertEqual(stored, expected)
+
+    def test_create_update_delete(self):
+        # Déclaration hors de la semaine et du mois : sans effet sur les champs
+        self.declare(self.today - timedelta(days=40), 'morning', self.emotion_types[1])
+        morning = self.declare(self.today, 'morning', self.emotion_types[0])
+        self.assertMoodsCurrent()
+        evening = self.declare(self.today, 'evening', self.emotion_types[1])
+        self.assertMoodsCurrent()
+
+        morning.emotion_type = self.emotion_types[4]
+        morning.save()
+        self.assertMoodsCurrent()
+
+        # Déclaration déplacée hors du jour
+        evening.date = self.today - timedelta(days=40)
+        evening.save()
+        self.assertMoodsCurrent()
+
+        morning.delete()
+        self.assertMoodsCurrent()
+        self.assertIsNone(Collaborator.objects.get(pk=self.collaborator.pk).emotion_today_morning)
+
+
+class DailyStatsEngineTests(OrganizationTestCase):
+    """Le moteur d'agrégation groupée produit exactement les statistiques de l'ancien calcul"""
+
+    def test_daily_emotion_stats_matches_legacy(self):
+        for label, entity in self.entities().items():
+            with self.subTest(entity=label):
+                emotions = Emotion.objects.filter(**{f'collaborator__{label}': entity, 'date': self.today})
+                with self.assertNumQueries(2):
+                    stats, participants = daily_emotion_stats(emotions)
+
+                self.assertEqual(stats, legacy_base_emotion_stats(emotions))
+                self.assertEqual(participants, emotions.values('collaborator').distinct().count())
+
+    def test_daily_emotion_trend_matches_legacy(self):
+        for label, entity in self.entities().items():
+            with self.subTest(entity=label):
+                expected = legacy_daily_emotion_trend(entity, f'collaborator__{label}', LEGACY_BREAKDOWNS[label])
+                self.assertGreater(expected['total_emotions'], 0)
+                self.assertEqual(entity.calculate_daily_emotion_trend(use_aggregates=False), expected)
+
+
+class DailyAggregateTests(OrganizationTestCase):
+    """Le cube journalier produit les statistiques des déclarations et reste cohérent à l'écriture"""
+
+    def test_aggregate_source_matches_emotions(self):
+        EmotionRollup.objects.rebuild()
+        EmotionDailyAggregate.objects.rebuild()
+        for label, entity in self.entities().items():
+            for trend in ('daily', 'weekly', 'monthly'):
+                with self.subTest(entity=label, trend=trend):
+                    calculate = getattr(entity, f'calculate_{trend}_emotion_trend')
+                    self.assertEqual(calculate(use_aggregates=True), calculate(use_aggregates=False))
+
+    def test_null_organization_cells_are_unique(self):
+        cell = {
+            'company': self.company, 'date': self.today, 'period': 'morning',
+            'half_day': False, 'emotion_type': 'happy'
+        }
+        EmotionDailyAggregate.objects.create(**cell)
+        with self.assertRaises(IntegrityError):
+            EmotionDailyAggregate.objects.create(**cell)
+
+    def test_moved_collaborator_updates_original_cells(self):
+        collaborator = self.collaborators[4]
+        old_team, new_team = collaborator.team, self.teams[2]
+        emotion = Emotion(
+            collaborator=collaborator, emotion_type=self.emotion_types[0],
+            date=self.today + timedelta(days=1), period='morning'
+        )
+        emotion.save()
+
+        collaborator.team, collaborator.service, collaborator.cluster = new_team, new_team.service, new_team.service.cluster
+        collaborator.save()
+
+        def cells(team):
+            return dict(
+                EmotionDailyAggregate.objects.filter(team=team, date=emotion.date)
+                .values_list('emotion_type', 'emotion_count')
+            )
+
+        def window_count(team):
+            return GroupAlertState.objects.get(team=team).mood_average()[1]
+
+        emotion.emotion_type = self.emotion_types[1]
+        emotion.save()
+        self.assertEqual(cells(old_team), {'happy': 0})
+        self.assertEqual(cells(new_team), {'sad': 1})
+        self.assertEqual((window_count(old_team), window_count(new_team)), (0, 1))
+
+        emotion.delete()
+        self.assertEqual(cells(new_team), {'sad': 0})
+        self.assertEqual(window_count(new_team), 0)
+
+    def test_moved_collaborator_participates_in_declared_team(self):
+        collaborator = self.collaborators[4]
+        old_team, new_team = collaborator.team, self.teams[2]
+        Emotion(
+            collaborator=collaborator, emotion_type=self.emotion_types[0], date=self.today, period='morning'
+        ).save()
+        collaborator.team, collaborator.service, collaborator.cluster = new_team, new_team.service, new_team.service.cluster
+        collaborator.save()
+
+        def participants(team):
+            source = team._get_emotion_source(self.today, self.today, use_aggregates=True)
+            return source.count_participants()
+
+        # Mêmes cellules que le cube : la déclaration reste comptée dans l'équipe d'origine
+        self.assertEqual(participants(old_team), 3)
+        self.assertEqual(participants(new_team), 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitionnement PostgreSQL uniquement')
+class PartitioningTests(OrganizationTestCase):
+    """Conversion, partitions à venir et détachement (DDL annulé avec la transaction du test)"""
+
+    def setUp(self):
+        super().setUp()
+        self.month = self.today.replace(day=1)
+        self.total = Emotion.objects.count()
+        self.assertEqual(convert_to_partitioned(months_ahead=0), self.total)
+
+    def partition_rows(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(name)}')
+            return cursor.fetchone()[0]
+
+    def month_after(self, month, count=1):
+        for _ in range(count):
+            month = (month + timedelta(days=32)).replace(day=1)
+        return month
+
+    def test_convert_keeps_rows_and_writes(self):
+        self.assertTrue(is_partitioned())
+        names = {name for name, _, _ in list_partitions()}
+        self.assertIn(partition_name(self.month), names)
+        self.assertIn('emotion_tracker_emotion_default', names)
+        self.assertEqual(Emotion.objects.count(), self.total)
+        self.assertEqual(self.partition_rows(partition_name(self.month)), Emotion.objects.filter(
+            date__gte=self.month
+        ).count())
+
+        Emotion(
+            collaborator=self.collaborators[4], emotion_type=self.emotion_types[0], date=self.today, period='morning'
+        ).save()
+        self.assertEqual(Emotion.objects.count(), self.total + 1)
+        # Déjà converties : sans effet
+        self.assertEqual(convert_to_partitioned(), 0)
+
+    def test_ensure_partitions_ahead(self):
+        created = ensure_partitions(months_ahead=2, today=self.today)
+        self.assertEqual(created, [
+            partition_name(self.month_after(self.month)), partition_name(self.month_after(self.month, 2))
+        ])
+        self.assertEqual(ensure_partitions(months_ahead=2, today=self.today), [])
+
+    def test_rows_in_default_partition_move_to_new_partition(self):
+        future = self.month_after(self.month, 13)
+        Emotion(
+            collaborator=self.collaborators[4], emotion_type=self.emotion_types[0], date=future, period='morning'
+        ).save()
+        self.assertEqual(self.partition_rows('emotion_tracker_emotion_default'), 1)
+
+        self.assertEqual(create_partitions(future, future), [partition_name(future)])
+        self.assertEqual(self.partition_rows('emotion_tracker_emotion_default'), 0)
+        self.assertEqual(self.partition_rows(partition_name(future)), 1)
+        self.assertEqual(Emotion.objects.count(), self.total + 1)
+
+    def test_detach_keeps_table(self):
+        detached = detach_partitions(self.month_after(self.month))
+        self.assertIn(partition_name(self.month), detached)
+        self.assertNotIn(partition_name(self.month), {name for name, _, _ in list_partitions()})
+        self.assertFalse(Emotion.objects.filter(date=self.today).exists())
+        # Table détachée toujours interrogeable
+        self.assertGreater(self.partition_rows(partition_name(self.month)), 0)
+
+    def test_command_ensures_and_drops(self):
+        out = StringIO()
+        call_command(
+            'partition_emotions', '--months-ahead', '1', '--detach-before', self.month.strftime('%Y-%m'), '--drop',
+            stdout=out
+        )
+        output = out.getvalue()
+        self.assertIn(f'Partition créée : {partition_name(self.month_after(self.month))}', output)
+        names = {name for name, _, _ in list_partitions()}
+        self.assertIn(partition_name(self.month), names)
+        self.assertFalse(any(upper and upper <= self.month for _, _, upper in list_partitions()))
+
+
+class UserScopeTests(OrganizationTestCase):
+    """Périmètres filtrés sur le rattachement, identifiants explicites pour les petits périmètres"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.collaborators[0]
+        Collaborator.objects.filter(pk__in=[collaborator.pk for collaborator in self.collaborators[4:8]]).update(
+            manager=self.manager
+        )
+        self.director = self.collaborators[1]
+        self.director.role = 'director'
+        self.director.save()
+
+    def visible(self, scope):
+        return (
+            set(scope.filter_collaborators(Collaborator.objects.all()).values_list('pk', flat=True)),
+            set(scope.filter_emotions(Emotion.objects.all()).values_list('collaborator_id', flat=True)),
+        )
+
+    def test_manager_sees_reports_emotions_only(self):
+        reports = {collaborator.pk for collaborator in self.collaborators[4:8]}
+        collaborators, emotions = self.visible(_resolve(self.manager))
+        self.assertEqual(collaborators, reports | {self.manager.pk})
+        # Comme avant les périmètres en cache : pas ses propres déclarations
+        self.assertEqual(emotions, {pk for pk in reports if Emotion.objects.filter(collaborator_id=pk).exists()})
+
+    def test_large_scope_filters_on_organization(self):
+        with self.settings(SCOPE_INLINE_IDS_MAX=1000):
+            small = _resolve(self.director)
+        with self.settings(SCOPE_INLINE_IDS_MAX=2):
+            large = _resolve(self.director)
+        self.assertIsNotNone(small.member_ids)
+        self.assertIsNone(large.member_ids)
+        self.assertEqual(large.member_count, small.member_count)
+        self.assertEqual(self.visible(large), self.visible(small))
+
+        sql = str(large.filter_emotions(Emotion.objects.all()).query)
+        self.assertIn('service_id', sql)
+        self.assertNotIn(str(self.collaborators[4].pk).replace('-', ''), sql.replace('-', ''))
+
+
+class BulkEmotionScopeTests(OrganizationTestCase):
+    """La création en masse est limitée au périmètre de l'appelant"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager, self.employee, self.outsider = self.collaborators[0], self.collaborators[4], self.collaborators[5]
+        self.employee.manager = self.manager
+        self.employee.save()
+        self.api = APIClient()
+
+    def post(self, user, collaborators):
+        self.api.force_authenticate(user)
+        tomorrow = self.today + timedelta(days=1)
+        return self.api.post('/api/emotions/bulk/', [
+            {
+                'collaborator': str(collaborator.pk), 'emotion_type': str(self.emotion_types[0].pk),
+                'date': tomorrow.isoformat(), 'period': 'morning',
+            }
+            for collaborator in collaborators
+        ], format='json')
+
+    def test_employee_declares_only_for_themselves(self):
+        response = self.post(self.employee, [self.outsider])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['errors'][0]['status'], 403)
+
+        response = self.post(self.employee, [self.employee, self.outsider])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual([(error['index'], error['status']) for error in response.json()['errors']], [(1, 403)])
+        self.assertFalse(Emotion.objects.filter(collaborator=self.outsider, date__gt=self.today).exists())
+
+    def test_manager_declares_for_their_reports(self):
+        response = self.post(self.manager, [self.employee, self.outsider])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(error['index'], error['status']) for error in response.json()['errors']], [(1, 403)])
+        self.assertTrue(Emotion.objects.filter(collaborator=self.employee, date__gt=self.today).exists())
+
+
+class DashboardCacheTests(OrganizationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.collaborators[0]
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.manager).key}')
+
+    def test_warm_cache_request_hits_no_database(self):
+        first = self.api.get('/api/dashboard/data/', {'days': 30})
+        self.assertEqual(first.status_code, 200)
+
+        # Jeton, périmètre et réponse servis par le cache
+        with self.assertNumQueries(0):
+            second = self.api.get('/api/dashboard/data/', {'days': 30})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+
+    def test_days_is_clamped_to_an_allowed_window(self):
+        self.assertEqual(self.api.get('/api/dashboard/data/', {'days': 10}).status_code, 200)
+        # days=10 partage l'entrée de cache de la fenêtre de 14 jours
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api.get('/api/dashboard/data/', {'days': 14}).status_code, 200)
+        # Au-delà de la plus grande fenêtre : fenêtre de 90 jours
+        self.assertEqual(self.api.get('/api/dashboard/data/', {'days': 90}).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api.get('/api/dashboard/data/', {'days': 100000}).status_code, 200)
+
+    def test_invalid_days_is_rejected(self):
+        # Même validation pour la vue DRF et la vue asynchrone
+        for path in ('/api/dashboard/data/', '/api/dashboard/data-async/'):
+            for value in ('abc', '0', '-3'):
+                with self.subTest(path=path, days=value):
+                    response = self.api.get(path, {'days': value})
+                    self.assertEqual(response.status_code, 400)
+
+
+class EmotionExportTests(OrganizationTestCase):
+    """L'export en flux produit les mêmes lignes que l'ancien export (EmotionSerializer)"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = create_collaborator(self.company, 'ADM01', role='admin')
+        # Caractères à échapper en CSV et en JSON
+        Emotion.objects.filter(collaborator=self.collaborators[0]).update(
+            comment='Réunion "difficile", puis\nretour au calme', weekly_emotion_summary='{"total": 2}'
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def legacy_export(self, **filters):
+        """Ancien export : EmotionSerializer sur le queryset du périmètre, rendu par JSONRenderer"""
+        queryset = Emotion.objects.filter(**filters).order_by('-date', '-creation_date')
+        rows = json.loads(JSONRenderer().render(EmotionSerializer(queryset, many=True).data))
+        # creation_date peut être égale entre deux lignes : comparaison dans l'ordre des identifiants
+        return sorted(rows, key=lambda row: row['id'])
+
+    def export(self, **params):
+        response = self.api.get('/api/emotions/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_json_matches_legacy_export(self):
+        legacy = self.legacy_export()
+        self.assertEqual(len(legacy), Emotion.objects.count())
+        self.assertEqual(sorted(json.loads(self.export(format='json')), key=lambda row: row['id']), legacy)
+
+    def test_ndjson_matches_legacy_export(self):
+        legacy = [{column: row[column] for column in DEFAULT_COLUMNS} for row in self.legacy_export()]
+        lines = self.export(format='ndjson').splitlines()
+        self.assertEqual(sorted((json.loads(line) for line in lines), key=lambda row: row['id']), legacy)
+
+    def test_csv_matches_legacy_export(self):
+        legacy = [
+            ['' if row[column] is None else str(row[column]) for column in DEFAULT_COLUMNS]
+            for row in self.legacy_export()
+        ]
+        rows = list(csv.reader(StringIO(self.export(format='csv'), newline='')))
+        self.assertEqual(rows[0], DEFAULT_COLUMNS)
+        self.assertEqual(sorted(rows[1:]), legacy)
+
+    def test_date_range_and_columns(self):
+        legacy = [
+            {'id': row['id'], 'comment': row['comment']}
+            for row in self.legacy_export(date=self.today)
+        ]
+        today = self.today.isoformat()
+        body = self.export(format='json', start=today, end=today, columns='id,comment')
+        self.assertEqual(sorted(json.loads(body), key=lambda row: row['id']), legacy)
+
+
+class EmotionReadProjectionTests(OrganizationTestCase):
+    """La projection values() des listes rend chaque champ comme EmotionSerializer"""
+
+    def setUp(self):
+        super().setUp()
+        # Déclaration passée par Emotion.save : résumés JSON, rattachement et creation_date renseignés
+        Emotion(
+            collaborator=self.collaborators[0], emotion_type=self.emotion_types[4],
+            date=self.today + timedelta(days=1), period='morning', comment='Après-midi chargée'
+        ).save()
+        Emotion.objects.filter(collaborator=self.collaborators[1]).update(comment=None)
+
+    def rendered(self, data):
+        return json.loads(JSONRenderer().render(data))
+
+    def assertSameFields(self, projected, serialized):
+        self.assertEqual(len(projected), len(serialized))
+        for projected_row, serialized_row in zip(projected, serialized):
+            self.assertEqual(list(projected_row), list(serialized_row))
+            for field in EmotionSerializer.Meta.fields:
+                with self.subTest(emotion=serialized_row['emotion_id'], field=field):
+                    self.assertEqual(projected_row[field], serialized_row[field])
+
+    def test_projection_matches_serializer(self):
+        queryset = Emotion.objects.order_by('emotion_id')
+        self.assertSameFields(
+            self.rendered(EmotionReadProjection.serialize(queryset)),
+            self.rendered(EmotionSerializer(queryset, many=True).data)
+        )
+
+    def test_list_endpoint_matches_serializer(self):
+        api = APIClient()
+        api.force_authenticate(create_collaborator(self.company, 'ADM01', role='admin'))
+        response = api.get('/api/emotions/', {'pagination': 'cursor', 'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        results = sorted(response.json()['results'], key=lambda row: row['id'])
+        serialized = self.rendered(EmotionSerializer(Emotion.objects.order_by('id'), many=True).data)
+        self.assertSameFields(results, sorted(serialized, key=lambda row: row['id']))
+
+
+class TokenAuthenticationCacheTests(EmotionTrackerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_collaborator(self.company, 'AUTH01', role='manager', team=self.team)
+        self.token = Token.objects.create(user=self.user)
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        # Remplit le LRU local et Redis
+        self.assertEqual(self.api.get('/api/dashboard/data/').status_code, 200)
+
+    def other_process(self):
+        # Invalidation vue d'un autre processus : son LRU local n'est pas vidé
+        return mock.patch.object(local_cache, 'discard')
+
+    def test_cached_entry_holds_no_password(self):
+        entry = cache.get(_token_key(_digest(self.token.key)))
+        self.assertEqual(entry[2], self.user.pk)
+        self.assertEqual(len(entry[3]), len(AUTH_USER_FIELDS))
+        self.assertNotIn(self.user.password, entry[3])
+
+    def test_token_deletion_is_seen_by_other_processes(self):
+        with self.other_process():
+            self.token.delete()
+        self.assertEqual(self.api.get('/api/dashboard/data/').status_code, 401)
+
+    def test_deactivation_is_seen_by_other_processes(self):
+        self.user.is_active = False
+        with self.other_process():
+            self.user.save()
+        self.assertEqual(self.api.get('/api/dashboard/data/').status_code, 401)
+
+
+class ManagerTestCase(OrganizationTestCase):
+    """Un manager (ORG00) et ses quatre collaborateurs directs (ORG04 à ORG07, un par équipe)"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.collaborators[0]
+        self.reports = self.collaborators[4:8]
+        Collaborator.objects.filter(pk__in=[report.pk for report in self.reports]).update(manager=self.manager)
+        self.api = APIClient()
+        self.api.force_authenticate(self.manager)
+
+
+class MemberStatsTests(ManagerTestCase):
+    """Statistiques par membre du dashboard (/api/dashboard/members/)"""
+
+    def test_member_stats_match_declarations(self):
+        response = self.api.get('/api/dashboard/members/', {'days': 1})
+        self.assertEqual(response.status_code, 200)
+        members = {member['id']: member for member in response.json()['members']}
+        self.assertEqual(set(members), {str(report.pk) for report in self.reports})
+
+        for report in self.reports:
+            emotions = Emotion.objects.filter(collaborator=report, date__gte=self.today - timedelta(days=1))
+            member = members[str(report.pk)]
+            self.assertEqual(member['total'], emotions.count())
+            self.assertEqual(member['emotions'], dict(
+                emotions.values('emotion_type__emotion').annotate(count=Count('id'))
+                .values_list('emotion_type__emotion', 'count')
+            ))
+            self.assertEqual(member['participation_rate'], round(emotions.count() / 2 * 100, 1))
+            average = emotions.aggregate(average=Avg('emotion_degree'))['average']
+            self.assertEqual(member['average_score'], round(average, 1))
+
+    def test_days_out_of_bounds_is_rejected(self):
+        for value in ('abc', '0', '-3', '800000'):
+            with self.subTest(days=value):
+                self.assertEqual(self.api.get('/api/dashboard/members/', {'days': value}).status_code, 400)
+
+    def test_reserved_to_managers_and_directors(self):
+        self.api.force_authenticate(self.reports[0])
+        self.assertEqual(self.api.get('/api/dashboard/members/').status_code, 403)
+
+
+class HeatmapTests(ManagerTestCase):
+    """Carte de chaleur collaborateurs × jours × période (/api/dashboard/heatmap/)"""
+
+    def test_matrix_cells_and_participation(self):
+        response = self.api.get('/api/dashboard/heatmap/', {'days': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['rows']], [str(report.pk) for report in self.reports])
+        columns = [(self.today - timedelta(days=1)).isoformat(), self.today.isoformat()]
+        self.assertEqual(data['columns'], columns)
+        self.assertEqual(data['periods'], ['morning', 'evening'])
+
+        emotions = Emotion.objects.filter(collaborator__in=self.reports, date__gte=self.today - timedelta(days=1))
+        rows = [report.pk for report in self.reports]
+        expected = {
+            (rows.index(pk), columns.index(day.isoformat()), data['periods'].index(period), degree)
+            for pk, day, period, degree in emotions.values_list('collaborator_id', 'date', 'period', 'emotion_degree')
+        }
+        cells = data['cells']
+        self.assertEqual(set(zip(cells['row'], cells['column'], cells['period'], cells['value'])), expected)
+
+        counts = [emotions.filter(collaborator=report).count() for report in self.reports]
+        self.assertEqual(data['row_aggregates']['participation_rate'], [count / 4 * 100 for count in counts])
+        self.assertEqual(data['total']['declarations'], sum(counts))
+        self.assertEqual(data['total']['participation_rate'], round(sum(counts) / 16 * 100, 1))
+
+    def test_team_filter(self):
+        response = self.api.get('/api/dashboard/heatmap/', {'team': str(self.reports[1].team_id)})
+        self.assertEqual([row['id'] for row in response.json()['rows']], [str(self.reports[1].pk)])
+
+        self.assertEqual(self.api.get('/api/dashboard/heatmap/', {'team': 'abc'}).status_code, 400)
+        other = Team.objects.create(team_name='Hors périmètre', company=self.company)
+        self.assertEqual(self.api.get('/api/dashboard/heatmap/', {'team': str(other.pk)}).status_code, 404)
+
+    def test_declarations_are_filtered_by_subquery(self):
+        with CaptureQueriesContext(connection) as context:
+            build_heatmap(Collaborator.objects.filter(manager=self.manager), 2)
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertNotIn(str(self.reports[0].pk).replace('-', ''), context.captured_queries[-1]['sql'].replace('-', ''))
+
+
+class OrganizationListQueryTests(EmotionTrackerTestCase):
+    """Le nombre de requêtes des listes de l'organisation ne dépend pas du nombre de lignes"""
+    ENDPOINTS = ('companies', 'clusters', 'services', 'teams', 'collaborators', 'emotion-types')
+
+    def setUp(self):
+        super().setUp()
+        self.admin = create_collaborator(self.company, 'ADMIN', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.admin)
+        self.created = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            index = self.created
+            company = Company.objects.create(name=f'Entreprise {index}')
+            cluster = Cluster.objects.create(name=f'Cluster {index}', company=company)
+            service = Service.objects.create(service_name=f'Service {index}', cluster=cluster, company=company)
+            team = Team.objects.create(team_name=f'Équipe {index}', service=service, company=company)
+            manager = create_collaborator(
+                company, f'MGR{index:03d}', role='manager', team=team, service=service, cluster=cluster
+            )
+            create_collaborator(
+                company, f'EMP{index:03d}', team=team, service=service, cluster=cluster, manager=manager
+            )
+            EmotionType.objects.bulk_create([EmotionType(name=f'Émotion {index}', emotion='neutral', degree=5)])
+            self.created += 1
+
+    def list_queries(self, endpoint):
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.get(f'/api/{endpoint}/')
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        self.add_rows(2)
+        for endpoint in self.ENDPOINTS:
+            # Périmètre de l'utilisateur mis en cache au premier appel
+            self.list_queries(endpoint)
+        counts = {endpoint: self.list_queries(endpoint) for endpoint in self.ENDPOINTS}
+
+        self.add_rows(25)
+        for endpoint in self.ENDPOINTS:
+            with self.subTest(endpoint=endpoint):
+                # Comptage de la pagination et page de résultats
+                self.assertEqual(counts[endpoint], 2)
+                with self.assertNumQueries(counts[endpoint]):
+                    self.assertEqual(len(self.api.get(f'/api/{endpoint}/').json()['results']), 20)
+
+
+class TeamMonthlyTrendTests(EmotionTrackerTestCase):
+
+    def test_member_participation(self):
+        reference = date(2024, 5, 15)
+        alice = create_collaborator(self.company, 'ALICE', first_name='Alice', last_name='Martin', team=self.team)
+        bob = create_collaborator(self.company, 'BOB', first_name='Bob', last_name='Durand', team=self.team)
+        seed_emotions(alice, self.emotion_types, reference, days=3)
+        seed_emotions(bob, self.emotion_types, reference, days=1, offset=1)
+        # Hors du mois : non compté
+        seed_emotions(bob, self.emotion_types, date(2024, 4, 30), days=1)
+
+        trend = self.team.calculate_monthly_emotion_trend(reference_date=reference, use_aggregates=False)
+
+        self.assertEqual(trend['member_participation'], {
+            'Bob Durand': {'emotion_count': 2, 'avg_emotion': 3.5},
+            'Alice Martin': {'emotion_count': 6, 'avg_emotion': 5.17},
+        })
+        self.assertEqual(trend['total_emotions'], 8)
+
+
+class EntityTrendTaskTests(EmotionTrackerTestCase):
+
+    def test_team_monthly_trend_is_stored(self):
+        reference = date(2024, 5, 15)
+        member = create_collaborator(self.company, 'MEMBER', team=self.team)
+        seed_emotions(member, self.emotion_types, reference, days=2)
+
+        result = compute_entity_trend('team', str(self.team.pk), EmotionTrend.MONTHLY, reference.isoformat())
+
+        self.assertFalse(result['failed'])
+        trend = EmotionTrend.objects.get(team=self.team, period_type=EmotionTrend.MONTHLY)
+        self.assertEqual(trend.start_date, date(2024, 5, 1))
+
+    def test_failing_entity_is_reported_without_raising(self):
+        with mock.patch.object(Team, 'calculate_monthly_emotion_trend', side_effect=RuntimeError('panne')):
+            with self.assertLogs('emotion_tracker.tasks', level='ERROR'):
+                result = compute_entity_trend('team', str(self.team.pk), EmotionTrend.MONTHLY, '2024-05-15')
+
+        self.assertTrue(result['failed'])
+        self.assertFalse(EmotionTrend.objects.filter(team=self.team).exists())
+
+
+class SyntheticOrganizationTests(TestCase):
+    """Organisation générée (generate_organization) : structure, unicité et données dérivées"""
+    SPEC = OrganizationSpec(clusters=1, services=2, teams=2, employees=5, years=0.05, prefix='SYN')
+
+    def setUp(self):
+        cache.clear()
+        spec = self.SPEC
+        call_command(
+            'generate_organization', '--clusters', spec.clusters, '--services', spec.services, '--teams', spec.teams,
+            '--employees', spec.employees, '--years', spec.years, '--prefix', spec.prefix, '--workers', 1,
+            stdout=StringIO()
+        )
+        self.collaborators = Collaborator.objects.filter(collaborator_id__startswith='SYN')
+
+    def test_organization_tree_sizes(self):
+        self.assertEqual(self.collaborators.count(), self.SPEC.collaborators)
+        self.assertEqual(Cluster.objects.filter(company__name__startswith='SYN').count(), 1)
+        self.assertEqual(Service.objects.filter(company__name__startswith='SYN').count(), 2)
+        self.assertEqual(Team.objects.filter(company__name__startswith='SYN').count(), 4)
+        roles = dict(self.collaborators.values('role').annotate(count=Count('id')).values_list('role', 'count'))
+        self.assertEqual((roles['pole_director'], roles['director']), (1, 2))
+        # Chaque équipe : un manager rattaché au directeur de son service, les autres à un membre de l'équipe
+        for collaborator in self.collaborators.filter(team__isnull=False).select_related('manager'):
+            self.assertTrue(
+                collaborator.manager.team_id == collaborator.team_id
+                or (collaborator.manager.role, collaborator.manager.service_id) == ('director', collaborator.service_id)
+            )
+
+    def test_one_declaration_per_collaborator_date_period(self):
+        emotions = Emotion.objects.filter(collaborator__in=self.collaborators)
+        self.assertTrue(emotions.exists())
+        self.assertFalse(
+            emotions.values('collaborator', 'date', 'period').annotate(count=Count('id')).filter(count__gt=1).exists()
+        )
+        # Rattachement déclaré : celui du collaborateur
+        self.assertFalse(emotions.exclude(declared_team=F('collaborator__team')).exists())
+
+    def test_derived_data_match_rebuild(self):
+        emotions = Emotion.objects.filter(collaborator__in=self.collaborators)
+        raw = {
+            (row['collaborator__team'], row['date'], row['period'], row['half_day'], row['emotion_type__emotion']):
+                (row['count'], row['degree_sum'])
+            for row in emotions.values(
+                'collaborator__team', 'date', 'period', 'half_day', 'emotion_type__emotion'
+            ).annotate(count=Count('id'), degree_sum=Sum('emotion_degree'))
+        }
+        cells = {
+            (cell.team_id, cell.date, cell.period, cell.half_day, cell.emotion_type):
+                (cell.emotion_count, cell.degree_sum)
+            for cell in EmotionDailyAggregate.objects.filter(team__isnull=False, emotion_count__gt=0)
+        }
+        self.assertEqual(cells, raw)
+
+        def rollups():
+            return {
+                (rollup.collaborator_id, rollup.period_type, rollup.period_start):
+                    (rollup.total_emotions, rollup.degree_sum, rollup.emotion_type_breakdown)
+                for rollup in EmotionRollup.objects.filter(total_emotions__gt=0)
+            }
+
+        def alert_states():
+            return (
+                set(CollaboratorAlertState.objects.values_list(
+                    'collaborator', 'negative_streak', 'last_date', 'last_period'
+                )),
+                {
+                    state.team_id: [getattr(state, field) for field in GroupAlertState.STATE_FIELDS]
+                    for state in GroupAlertState.objects.filter(team__isnull=False)
+                },
+            )
+
+        generated = rollups(), alert_states()
+        self.assertEqual(
+            sum(total for (_, period_type, _), (total, _, _) in generated[0].items() if period_type == 'weekly'),
+            emotions.count()
+        )
+        self.assertEqual(len(generated[1][1]), 4)
+
+        EmotionRollup.objects.rebuild()
+        rebuild_alert_states()
+        self.assertEqual((rollups(), alert_states()), generated)
+
+
+class MetricsEndpointTests(TestCase):
+    """/metrics n'est exposé qu'avec un jeton configuré"""
+
+    @override_settings(METRICS_TOKEN='')
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requires_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer other').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class AsyncDashboardTests(TransactionTestCase):
+    """
+    Requêtes traitées par le handler ASGI (middlewares en mode asynchrone) ; données validées
+    en base, car les sections du dashboard lisent depuis les connexions de leurs threads
+    """
+
+    def setUp(self):
+        cache.clear()
+        emotion_types = create_emotion_types()
+        company = Company.objects.create(name='Test')
+        team = Team.objects.create(team_name='Équipe test', company=company)
+        self.manager = create_collaborator(company, 'ASYNC00', role='manager', team=team)
+        seed_emotions(self.manager, emotion_types, timezone.now().date(), days=3)
+        for index in range(1, 4):
+            report = create_collaborator(company, f'ASYNC{index:02d}', team=team, manager=self.manager)
+            seed_emotions(report, emotion_types, timezone.now().date(), days=3, offset=index)
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.manager).key}'}
+
+    async def test_async_response_matches_sync(self):
+        def queries():
+            return REGISTRY.get_sample_value(
+                'emotion_tracker_http_db_queries_sum', {'route': 'dashboard-data-async', 'method': 'GET'}
+            ) or 0
+
+        before = queries()
+        response = await self.async_client.get('/api/dashboard/data-async/', {'days': 30}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        # Requêtes SQL des threads de sections comptées par le middleware en mode asynchrone
+        self.assertGreater(queries(), before)
+
+        # Réponse synchrone recalculée (même clé de cache)
+        await sync_to_async(cache.clear)()
+        expected = await sync_to_async(self.client.get)('/api/dashboard/data/', {'days': 30}, headers=self.headers)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        self.assertTrue(response.json()['recent_emotions'])
+
+    @override_settings(PROFILING_DIR=os.path.join(tempfile.gettempdir(), 'emotion_tracker_test_profiles'))
+    async def test_async_request_is_profiled(self):
+        await Collaborator.objects.filter(pk=self.manager.pk).aupdate(is_staff=True)
+        # Vue DRF synchrone sous ASGI : exécutée dans le thread profilé
+        response = await self.async_client.get(
+            '/api/dashboard/data/', {'days': 30}, headers={**self.headers, PROFILE_HEADER: '1'}
+        )
+        self.assertEqual(response.status_code, 200)
+        profile = ProfileStore().get(response[PROFILE_ID_HEADER])
+        self.assertGreater(profile['sql']['count'], 0)
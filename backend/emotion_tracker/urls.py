@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CompanyViewSet, ClusterViewSet, ServiceViewSet, TeamViewSet,
     CollaboratorViewSet, EmotionTypeViewSet, EmotionViewSet,
-    EmotionTrendViewSet, AlertViewSet, AuthViewSet, DashboardViewSet
+    EmotionTrendViewSet, AlertViewSet, AuthViewSet, DashboardViewSet, ProfileViewSet, dashboard_data_async, metrics
 )
 
 router = DefaultRouter()
@@ -18,8 +18,12 @@ router.register(r'emotion-trends', EmotionTrendViewSet)
 router.register(r'alerts', AlertViewSet)
 router.register(r'auth', AuthViewSet, basename='auth')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'profiles', ProfileViewSet, basename='profile')
 
 urlpatterns = [
+    # Dashboard asynchrone (servi par ASGI, voir gunicorn_asgi.conf.py)
+    path('api/dashboard/data-async/', dashboard_data_async, name='dashboard-data-async'),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
\ No newline at end of file
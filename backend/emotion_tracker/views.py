@@ -1,11 +1,18 @@
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate, login
-from django.db.models import Q, Count, Avg
+from django.db.models import Avg
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed
+from django.utils.crypto import constant_time_compare
 from django.utils import timezone
 from datetime import datetime, timedelta
+import tempfile
+import uuid
 from .models import (
     Company, Cluster, Service, Team, Collaborator,
     EmotionType, Emotion, EmotionTrend, Alert
@@ -13,19 +20,43 @@ from .models import (
 from .serializers import (
     CompanySerializer, ClusterSerializer, ServiceSerializer, TeamSerializer,
     CollaboratorSerializer, EmotionTypeSerializer, EmotionSerializer,
-    EmotionCreateSerializer, EmotionTrendSerializer, AlertSerializer,
+    EmotionCreateSerializer, EmotionReadProjection, EmotionTrendSerializer, AlertSerializer,
     LoginSerializer, DashboardDataSerializer
 )
+from .analytics import count_subquery
+from .ingestion import BulkEmotionIngestor
+from .tasks import get_last_run as get_last_trend_run
+from . import cache as dashboard_cache
+from .scopes import get_user_scope
+from .metrics import render_metrics
+from .profiling import ProfileStore
+from .authentication import authenticate_request
+from .dashboard import (
+    TEAM_ROLES, abuild_dashboard_data, bounded_days, build_dashboard_data, dashboard_days, get_member_stats
+)
+from .heatmap import build_heatmap, scoped_collaborators
+from .parquet import ParquetEmotionExporter
+from .pagination import SelectablePaginationMixin, EmotionCursorPagination, AlertCursorPagination
+from .exports import (
+    EXPORT_COLUMNS, CSVExportRenderer, NDJSONExportRenderer,
+    StreamingEmotionExport, parse_columns
+)
 
 
 class CompanyViewSet(viewsets.ModelViewSet):
-    queryset = Company.objects.all()
+    queryset = Company.objects.annotate(
+        clusters_count=count_subquery(Cluster, 'company'),
+        services_count=count_subquery(Service, 'company'),
+        collaborators_count=count_subquery(Collaborator, 'company'),
+    )
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
 class ClusterViewSet(viewsets.ModelViewSet):
-    queryset = Cluster.objects.all()
+    queryset = Cluster.objects.select_related('company').annotate(
+        services_count=count_subquery(Service, 'cluster'),
+    )
     serializer_class = ClusterSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -38,7 +69,10 @@ class ClusterViewSet(viewsets.ModelViewSet):
 
 
 class ServiceViewSet(viewsets.ModelViewSet):
-    queryset = Service.objects.all()
+    queryset = Service.objects.select_related('cluster', 'company').annotate(
+        teams_count=count_subquery(Team, 'service'),
+        collaborators_count=count_subquery(Collaborator, 'service'),
+    )
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -56,7 +90,9 @@ class ServiceViewSet(viewsets.ModelViewSet):
 
 
 class TeamViewSet(viewsets.ModelViewSet):
-    queryset = Team.objects.all()
+    queryset = Team.objects.select_related('service', 'company').annotate(
+        collaborators_count=count_subquery(Collaborator, 'team'),
+    )
     serializer_class = TeamSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -74,27 +110,15 @@ class TeamViewSet(viewsets.ModelViewSet):
 
 
 class CollaboratorViewSet(viewsets.ModelViewSet):
-    queryset = Collaborator.objects.all()
+    queryset = Collaborator.objects.select_related('manager', 'team', 'service', 'company')
     serializer_class = CollaboratorSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        user = self.request.user
         
-        # Filtrer selon le rôle de l'utilisateur
-        if user.role == 'employee':
-            queryset = queryset.filter(id=user.id)
-        elif user.role == 'manager':
-            queryset = queryset.filter(
-                Q(manager=user) | Q(id=user.id)
-            )
-        elif user.role == 'director':
-            queryset = queryset.filter(service=user.service)
-        elif user.role == 'pole_director':
-            queryset = queryset.filter(cluster=user.cluster)
-        
-        return queryset
+        # Filtrer selon le périmètre de l'utilisateur
+        return get_user_scope(self.request.user).filter_collaborators(queryset)
     
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -107,10 +131,7 @@ class CollaboratorViewSet(viewsets.ModelViewSet):
         """Retourne les membres de l'équipe de l'utilisateur"""
         user = request.user
         if user.role in ['manager', 'director']:
-            if user.role == 'manager':
-                members = Collaborator.objects.filter(manager=user)
-            else:
-                members = Collaborator.objects.filter(service=user.service)
+            members = get_user_scope(user).members(self.queryset)
             
             serializer = self.get_serializer(members, many=True)
             return Response(serializer.data)
@@ -119,32 +140,24 @@ class CollaboratorViewSet(viewsets.ModelViewSet):
 
 
 class EmotionTypeViewSet(viewsets.ModelViewSet):
-    queryset = EmotionType.objects.all()
+    queryset = EmotionType.objects.annotate(
+        usage_count=count_subquery(Emotion, 'emotion_type'),
+    )
     serializer_class = EmotionTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class EmotionViewSet(viewsets.ModelViewSet):
+class EmotionViewSet(SelectablePaginationMixin, viewsets.ModelViewSet):
     queryset = Emotion.objects.all()
     serializer_class = EmotionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_pagination_class = EmotionCursorPagination
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        user = self.request.user
         
-        # Filtrer selon le rôle de l'utilisateur
-        if user.role == 'employee':
-            queryset = queryset.filter(collaborator=user)
-        elif user.role == 'manager':
-            team_members = Collaborator.objects.filter(manager=user)
-            queryset = queryset.filter(collaborator__in=team_members)
-        elif user.role == 'director':
-            service_members = Collaborator.objects.filter(service=user.service)
-            queryset = queryset.filter(collaborator__in=service_members)
-        elif user.role == 'pole_director':
-            cluster_members = Collaborator.objects.filter(cluster=user.cluster)
-            queryset = queryset.filter(collaborator__in=cluster_members)
+        # Filtrer selon le périmètre de l'utilisateur
+        queryset = get_user_scope(self.request.user).filter_emotions(queryset)
         
         # Filtres par paramètres
         days = self.request.query_params.get('days', None)
@@ -167,6 +180,15 @@ class EmotionViewSet(viewsets.ModelViewSet):
             return EmotionCreateSerializer
         return EmotionSerializer
     
+    def list(self, request, *args, **kwargs):
+        """Liste via la projection values() (même rendu que EmotionSerializer)"""
+        queryset = EmotionReadProjection.project(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(EmotionReadProjection.to_representation(page))
+        return Response(EmotionReadProjection.to_representation(queryset))
+    
     @action(detail=False, methods=['get'])
     def today(self, request):
         """Retourne les émotions du jour pour l'utilisateur connecté"""
@@ -181,11 +203,38 @@ class EmotionViewSet(viewsets.ModelViewSet):
             'evening': None
         }
         
-        for emotion in emotions:
-            result[emotion.period] = EmotionSerializer(emotion).data
+        for emotion in EmotionReadProjection.serialize(emotions):
+            result[emotion['period']] = emotion
         
         return Response(result)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Crée un lot de déclarations d'émotions (bornes, rattrapage hors ligne, imports SIRH)"""
+        items = request.data.get('emotions') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Une liste de déclarations est attendue'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_items = getattr(settings, 'EMOTION_BULK_MAX_ITEMS', 5000)
+        if len(items) > max_items:
+            return Response(
+                {'error': f'Un lot ne peut pas dépasser {max_items} déclarations'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Un employé ne déclare que pour lui-même, un manager ou directeur pour son périmètre
+        result = BulkEmotionIngestor().ingest(items, scope=get_user_scope(request.user))
+        if result['created']:
+            response_status = status.HTTP_201_CREATED
+        elif result['errors'] and all(error['status'] == 403 for error in result['errors']):
+            response_status = status.HTTP_403_FORBIDDEN
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Retourne les statistiques d'émotions"""
@@ -219,22 +268,69 @@ class EmotionViewSet(viewsets.ModelViewSet):
         
         return Response(stats)
     
-    @action(detail=False, methods=['get'])
+    @action(
+        detail=False, methods=['get'],
+        renderer_classes=[JSONRenderer, CSVExportRenderer, NDJSONExportRenderer]
+    )
     def export(self, request):
-        """Exporte les données d'émotions"""
+        """
+        Exporte les données d'émotions en flux (format=csv, ndjson ou json).
+        Paramètres optionnels : start et end (AAAA-MM-JJ), columns (liste séparée par des virgules).
+        """
         queryset = self.get_queryset()
         format_type = request.query_params.get('format', 'json')
+        if format_type not in ['csv', 'ndjson', 'json']:
+            return Response({'error': f'Format non supporté: {format_type}'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if format_type == 'csv':
-            # Logique d'export CSV
-            pass
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        try:
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            if start:
+                queryset = queryset.filter(date__gte=datetime.strptime(start, '%Y-%m-%d').date())
+            if end:
+                queryset = queryset.filter(date__lte=datetime.strptime(end, '%Y-%m-%d').date())
+        except ValueError:
+            return Response({'error': 'Format de date invalide (AAAA-MM-JJ)'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        columns, error = parse_columns(request.query_params.get('columns'))
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        if format_type == 'json' and not request.query_params.get('columns'):
+            # Mêmes champs que la liste des émotions
+            columns = list(EXPORT_COLUMNS)
+        
+        return StreamingEmotionExport(queryset, columns).response(format_type)
+    
+    @action(detail=False, methods=['get'])
+    def parquet(self, request):
+        """
+        Export analytique Parquet du périmètre de l'utilisateur, avec les colonnes
+        de dimension (équipe, service, cluster, entreprise). Paramètres : year, month.
+        """
+        try:
+            year = int(request.query_params.get('year', timezone.now().year))
+            month = request.query_params.get('month')
+            month = int(month) if month else None
+        except ValueError:
+            return Response({'error': 'year et month doivent être des entiers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = get_user_scope(request.user).filter_emotions(Emotion.objects.all()).filter(year=year)
+        if month:
+            queryset = queryset.filter(month=month)
+        
+        sink = tempfile.TemporaryFile()
+        ParquetEmotionExporter().export_file(queryset, sink)
+        sink.seek(0)
+        
+        filename = f'emotions_{year}' + (f'_{month:02d}' if month else '') + '.parquet'
+        return FileResponse(
+            sink, as_attachment=True, filename=filename,
+            content_type='application/vnd.apache.parquet'
+        )
 
 
 class EmotionTrendViewSet(viewsets.ModelViewSet):
-    queryset = EmotionTrend.objects.all()
+    queryset = EmotionTrend.objects.select_related('team', 'service')
     serializer_class = EmotionTrendSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -242,45 +338,43 @@ class EmotionTrendViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         user = self.request.user
         
-        # Filtrer selon le rôle
-        if user.role == 'manager':
-            queryset = queryset.filter(team__collaborators__manager=user)
-        elif user.role == 'director':
-            queryset = queryset.filter(service=user.service)
-        elif user.role == 'pole_director':
-            queryset = queryset.filter(service__cluster=user.cluster)
+        # Filtrer selon le périmètre (les employés voient toutes les tendances)
+        if user.role in ['manager', 'director', 'pole_director']:
+            queryset = get_user_scope(user).filter_trends(queryset)
+        
+        # Filtres par paramètres (tendances précalculées : lectures indexées)
+        for field in ['period_type', *EmotionTrend.ENTITY_FIELDS]:
+            value = self.request.query_params.get(field, None)
+            if value:
+                queryset = queryset.filter(**{field: value})
         
         return queryset
+    
+    @action(detail=False, methods=['get'])
+    def runs(self, request):
+        """Durées de la dernière exécution du précalcul, par type de période (administrateurs)"""
+        if not (request.user.is_staff or request.user.role == 'admin'):
+            return Response(
+                {'error': 'Accès réservé aux administrateurs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response({
+            period_type: get_last_trend_run(period_type)
+            for period_type, _ in EmotionTrend.PERIOD_TYPE_CHOICES
+        })
 
 
-class AlertViewSet(viewsets.ModelViewSet):
+class AlertViewSet(SelectablePaginationMixin, viewsets.ModelViewSet):
     queryset = Alert.objects.all()
     serializer_class = AlertSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_pagination_class = AlertCursorPagination
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        user = self.request.user
         
-        # Filtrer selon le rôle
-        if user.role == 'employee':
-            queryset = queryset.filter(collaborator=user)
-        elif user.role == 'manager':
-            team_members = Collaborator.objects.filter(manager=user)
-            queryset = queryset.filter(
-                Q(collaborator__in=team_members) | 
-                Q(team__collaborators__manager=user)
-            )
-        elif user.role == 'director':
-            queryset = queryset.filter(
-                Q(collaborator__service=user.service) |
-                Q(service=user.service)
-            )
-        elif user.role == 'pole_director':
-            queryset = queryset.filter(
-                Q(collaborator__cluster=user.cluster) |
-                Q(service__cluster=user.cluster)
-            )
+        # Filtrer selon le périmètre de l'utilisateur
+        queryset = get_user_scope(self.request.user).filter_alerts(queryset)
         
         # Filtrer par statut
         resolved = self.request.query_params.get('resolved', None)
@@ -308,6 +402,32 @@ class AlertViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class ProfileViewSet(viewsets.ViewSet):
+    """Profils de requêtes enregistrés par le profilage à la demande (administrateurs)"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def _forbidden(self, request):
+        if not (request.user.is_staff or request.user.role == 'admin'):
+            return Response(
+                {'error': 'Accès réservé aux administrateurs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return None
+    
+    def list(self, request):
+        """Résumés des profils enregistrés, du plus récent au plus ancien"""
+        return self._forbidden(request) or Response(ProfileStore().list())
+    
+    def retrieve(self, request, pk=None):
+        """Profil complet : échantillons, répartition du temps et chronologie SQL"""
+        forbidden = self._forbidden(request)
+        if forbidden:
+            return forbidden
+        profile = ProfileStore().get(pk)
+        if profile is None:
+            return Response({'error': 'Profil introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(profile)
+
 class AuthViewSet(viewsets.ViewSet):
     """ViewSet pour l'authentification"""
     
@@ -329,10 +449,9 @@ class AuthViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['post'])
     def logout(self, request):
         """Déconnexion utilisateur"""
-        try:
-            request.user.auth_token.delete()
-        except:
-            pass
+        if request.user.is_authenticated:
+            # Le signal post_delete du jeton invalide l'utilisateur en cache d'authentification
+            Token.objects.filter(user=request.user).delete()
         
         return Response({'message': 'Déconnexion réussie'})
 
@@ -345,112 +464,112 @@ class DashboardViewSet(viewsets.ViewSet):
     def data(self, request):
         """Retourne toutes les données nécessaires pour le dashboard"""
         user = request.user
-        days = int(request.query_params.get('days', 7))
-        
-        # Données utilisateur
-        user_data = CollaboratorSerializer(user).data
-        
-        # Émotions récentes
-        recent_emotions = Emotion.objects.filter(
-            collaborator=user,
-            date__gte=timezone.now().date() - timedelta(days=days)
-        ).order_by('-date', '-creation_date')[:10]
-        
-        # Statistiques personnelles
-        personal_stats = self._get_emotion_stats(user, days)
-        
-        # Statistiques d'équipe (si manager ou plus)
-        team_stats = None
-        if user.role in ['manager', 'director', 'pole_director']:
-            team_stats = self._get_team_stats(user, days)
-        
-        # Alertes
-        alerts = Alert.objects.filter(
-            collaborator=user,
-            is_resolved=False
-        )[:5]
-        
-        # Tendances
-        trends = EmotionTrend.objects.filter(
-            start_date__gte=timezone.now().date() - timedelta(days=30)
-        )[:5]
-        
-        data = {
-            'user_info': user_data,
-            'recent_emotions': EmotionSerializer(recent_emotions, many=True).data,
-            'emotion_stats': personal_stats,
-            'team_stats': team_stats,
-            'alerts': AlertSerializer(alerts, many=True).data,
-            'trends': EmotionTrendSerializer(trends, many=True).data
-        }
+        try:
+            days = dashboard_days(request.query_params.get('days'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
+        data = dashboard_cache.get_or_build_dashboard(user, days, lambda: build_dashboard_data(user, days))
         return Response(data)
     
-    def _get_emotion_stats(self, user, days):
-        """Calcule les statistiques d'émotions pour un utilisateur"""
-        emotions = Emotion.objects.filter(
-            collaborator=user,
-            date__gte=timezone.now().date() - timedelta(days=days)
-        )
-        
-        stats = {
-            'total': emotions.count(),
-            'happy': emotions.filter(emotion_type__emotion='happy').count(),
-            'sad': emotions.filter(emotion_type__emotion='sad').count(),
-            'neutral': emotions.filter(emotion_type__emotion='neutral').count(),
-            'stressed': emotions.filter(emotion_type__emotion='stressed').count(),
-            'excited': emotions.filter(emotion_type__emotion='excited').count(),
-            'tired': emotions.filter(emotion_type__emotion='tired').count(),
-        }
-        
-        expected = days * 2
-        participation_rate = (stats['total'] / expected * 100) if expected > 0 else 0
-        avg_score = emotions.aggregate(avg=Avg('emotion_degree'))['avg'] or 0
+    @action(detail=False, methods=['get'])
+    def members(self, request):
+        """Statistiques de chaque collaborateur du périmètre (managers, directeurs), en une requête"""
+        if request.user.role not in TEAM_ROLES:
+            return Response(
+                {'error': 'Accès réservé aux managers et directeurs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            days = bounded_days(request.query_params.get('days'), 30, settings.MEMBER_STATS_MAX_DAYS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        stats.update({
-            'participation_rate': round(participation_rate, 1),
-            'average_score': round(avg_score, 1),
-            'period_start': timezone.now().date() - timedelta(days=days),
-            'period_end': timezone.now().date()
+        today = timezone.now().date()
+        return Response({
+            'period_start': today - timedelta(days=days),
+            'period_end': today,
+            'members': get_member_stats(request.user, days),
         })
-        
-        return stats
     
-    def _get_team_stats(self, user, days):
-        """Calcule les statistiques d'équipe selon le rôle"""
-        if user.role == 'manager':
-            team_members = Collaborator.objects.filter(manager=user)
-        elif user.role == 'director':
-            team_members = Collaborator.objects.filter(service=user.service)
-        elif user.role == 'pole_director':
-            team_members = Collaborator.objects.filter(cluster=user.cluster)
-        else:
-            return None
-        
-        emotions = Emotion.objects.filter(
-            collaborator__in=team_members,
-            date__gte=timezone.now().date() - timedelta(days=days)
+    @action(detail=False, methods=['get'])
+    def heatmap(self, request):
+        """
+        Carte de chaleur collaborateurs × jours (humeur et participation, matin et soir)
+        des membres du périmètre. Paramètres : days (30 par défaut), team (optionnel).
+        """
+        if request.user.role not in TEAM_ROLES:
+            return Response(
+                {'error': 'Accès réservé aux managers et directeurs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            days = bounded_days(request.query_params.get('days'), 30, settings.EMOTION_HEATMAP_MAX_DAYS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        team_id = request.query_params.get('team')
+        if team_id:
+            try:
+                team_id = uuid.UUID(team_id)
+            except ValueError:
+                return Response({'error': 'team doit être un identifiant valide'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        collaborators = scoped_collaborators(get_user_scope(request.user), team_id)
+        if team_id and not collaborators.exists():
+            return Response({'error': 'Équipe introuvable dans votre périmètre'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(build_heatmap(collaborators, days))
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Compteurs du cache du dashboard (administrateurs uniquement)"""
+        if not (request.user.is_staff or request.user.role == 'admin'):
+            return Response(
+                {'error': 'Accès réservé aux administrateurs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(dashboard_cache.get_metrics())
+
+
+async def dashboard_data_async(request):
+    """
+    Version asynchrone (ASGI) de /api/dashboard/data/ : même réponse et même cache,
+    sections calculées en parallèle (dashboard.abuild_dashboard_data)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None or not user.is_authenticated:
+        return _json_response(
+            {'detail': "Informations d'authentification non fournies."}, status.HTTP_401_UNAUTHORIZED
         )
-        
-        stats = {
-            'total': emotions.count(),
-            'happy': emotions.filter(emotion_type__emotion='happy').count(),
-            'sad': emotions.filter(emotion_type__emotion='sad').count(),
-            'neutral': emotions.filter(emotion_type__emotion='neutral').count(),
-            'stressed': emotions.filter(emotion_type__emotion='stressed').count(),
-            'excited': emotions.filter(emotion_type__emotion='excited').count(),
-            'tired': emotions.filter(emotion_type__emotion='tired').count(),
-        }
-        
-        expected = team_members.count() * days * 2
-        participation_rate = (stats['total'] / expected * 100) if expected > 0 else 0
-        avg_score = emotions.aggregate(avg=Avg('emotion_degree'))['avg'] or 0
-        
-        stats.update({
-            'participation_rate': round(participation_rate, 1),
-            'average_score': round(avg_score, 1),
-            'period_start': timezone.now().date() - timedelta(days=days),
-            'period_end': timezone.now().date()
-        })
-        
-        return stats
\ No newline at end of file
+
+    try:
+        days = dashboard_days(request.GET.get('days'))
+    except ValueError as exc:
+        return _json_response({'error': str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+    data = await dashboard_cache.aget_or_build_dashboard(
+        user, days, lambda: abuild_dashboard_data(user, days)
+    )
+    return _json_response(data)
+
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    # Même rendu que les vues DRF (dates, décimaux, UUID)
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+def metrics(request):
+    """
+    Métriques Prometheus (format texte). Le collecteur doit présenter l'en-tête
+    Authorization: Bearer <METRICS_TOKEN> ; sans jeton configuré, la route n'est pas exposée.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
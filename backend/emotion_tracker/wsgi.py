@@ -0,0 +1,10 @@
+"""
+Point d'entrée WSGI (gunicorn.conf.py).
+"""
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emotion_tracker.settings')
+
+application = get_wsgi_application()
@@ -0,0 +1,24 @@
+"""
+Configuration gunicorn : métriques Prometheus agrégées sur tous les workers.
+
+PROMETHEUS_MULTIPROC_DIR doit pointer vers un répertoire vide au démarrage
+(les fichiers d'un lancement précédent fausseraient les compteurs).
+"""
+import os
+import shutil
+
+wsgi_app = 'emotion_tracker.wsgi:application'
+
+
+def on_starting(server):
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Les jauges du worker terminé ne doivent plus être agrégées
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
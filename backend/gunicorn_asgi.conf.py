@@ -0,0 +1,19 @@
+"""
+Configuration gunicorn du service ASGI (workers uvicorn), à côté du service WSGI
+(gunicorn.conf.py) dont elle reprend les hooks des métriques Prometheus.
+
+Chaque worker exécute les sections du dashboard asynchrone dans un pool de
+DASHBOARD_ASYNC_MAX_CONNECTIONS threads, une connexion PostgreSQL par thread, plus
+celle du thread des vues synchrones : prévoir DB_CONN_MAX_AGE > 0 et
+max_connections >= workers x (DASHBOARD_ASYNC_MAX_CONNECTIONS + 1).
+"""
+import os
+import runpy
+
+wsgi_app = 'emotion_tracker.asgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+
+_hooks = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))
+on_starting = _hooks['on_starting']
+child_exit = _hooks['child_exit']